@@ -26,7 +26,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise + páginas pré-renderizadas (home.prerender)
+    'home.prerender.PrerenderMiddleware',
+    # Antes de Session/CSRF/Messages: ajusta as respostas depois deles
+    'home.respostas_publicas.RespostaPublicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -73,6 +76,48 @@ else:
         }
     }
 
+# O banco de testes do SQLite fica em memória por padrão, onde escritas
+# concorrentes falham na hora com "table is locked" em vez de esperar a
+# vez. Em arquivo os testes de reserva concorrente rodam como em produção.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+# ===== CACHE =====
+# Com REDIS_URL (requer o pacote redis) o cache é compartilhado entre os
+# workers; sem ele cada processo usa o próprio cache em memória.
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=2000, cast=int)},
+        }
+    }
+
+# Cache de página inteira das views públicas para visitantes anônimos
+CACHE_PAGINAS = config('CACHE_PAGINAS', default=True, cast=bool)
+CACHE_PAGINAS_TTL = config('CACHE_PAGINAS_TTL', default=300, cast=int)
+
+# Páginas públicas sem cookies, com ETag/Last-Modified e cache na borda da Vercel
+RESPOSTAS_PUBLICAS = config('RESPOSTAS_PUBLICAS', default=True, cast=bool)
+CDN_S_MAXAGE = config('CDN_S_MAXAGE', default=60, cast=int)
+CDN_STALE_WHILE_REVALIDATE = config('CDN_STALE_WHILE_REVALIDATE', default=600, cast=int)
+
+# HTML estático das páginas públicas (manage.py prerenderizar), entregue pelo PrerenderMiddleware.
+# Alterações tiram as páginas do ar e `prerenderizar --pendentes` (agendado) gera de novo. Com a pasta
+# só leitura (runtime da Vercel) nada é regenerado: cada página é servida só enquanto as tags de cache
+# dela (notícias, workshops, vagas) estão na versão do build; depois o Django responde por ela.
+PRERENDER_DIR = config('PRERENDER_DIR', default=str(BASE_DIR / 'prerender'))
+
+# CSS crítico de cada template (manage.py css_critico), inlinado pelo {% estilos %} do base.html
+CSS_CRITICO_ARQUIVO = config('CSS_CRITICO_ARQUIVO', default=str(BASE_DIR / 'css_critico.json'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -90,8 +135,9 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = []
 
-# ✅ WhiteNoise - desabilitar compressão para evitar erros no Render
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+# ✅ WhiteNoise - nomes com hash + .gz/.br gerados no collectstatic, servidos com cache immutable.
+# Referências a arquivos ausentes não derrubam o build (home/estaticos.py)
+STATICFILES_STORAGE = 'home.estaticos.EstaticosComHash'
 
 # ===== CLOUDINARY =====
 CLOUDINARY_STORAGE = {
@@ -107,9 +153,11 @@ if CLOUDINARY_STORAGE['CLOUD_NAME']:
         api_secret=CLOUDINARY_STORAGE['API_SECRET'],
         secure=True
     )
-    DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+    # Uploads com nome = hash do conteúdo: reenvios reaproveitam o mesmo objeto (home/armazenamento.py)
+    DEFAULT_FILE_STORAGE = 'home.armazenamento.CloudinaryPorConteudo'
     MEDIA_URL = '/media/'
 else:
+    DEFAULT_FILE_STORAGE = 'home.armazenamento.ArquivosPorConteudo'
     MEDIA_URL = '/media/'
     MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -117,6 +165,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'mulheresdsg@gmail.com'
 
+# URL pública usada nos links dos emails
+SITE_URL = config('SITE_URL', default='https://mulheresdosulglobal.com')
+
+# Contador de visualizações: cada worker grava seu buffer ao acumular M visualizações ou, ao fim
+# de qualquer requisição, quando a última gravação tem mais de N segundos
+VISUALIZACOES_INTERVALO_DESCARGA = config('VISUALIZACOES_INTERVALO_DESCARGA', default=30, cast=int)
+VISUALIZACOES_LIMITE_BUFFER = config('VISUALIZACOES_LIMITE_BUFFER', default=500, cast=int)
+
+# Listagem de notícias paginada por cursor (anterior/próxima, sem COUNT nem OFFSET)
+NOTICIAS_PAGINACAO_CURSOR = config('NOTICIAS_PAGINACAO_CURSOR', default=False, cast=bool)
+
 if not DEBUG:
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
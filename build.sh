@@ -5,12 +5,33 @@ echo "🔨 Iniciando build..."
 # Instalar dependências
 pip install -r requirements.txt
 
-# Coletar arquivos estáticos
+# Conferir se todo ícone usado nos templates está na fonte gerada
+echo "🔣 Verificando ícones..."
+python manage.py gerar_icones --verificar || exit 1
+
+# Coletar arquivos estáticos (com hash no nome e versões .gz/.br)
 echo "📦 Coletando arquivos estáticos..."
 python manage.py collectstatic --noinput --clear
+python manage.py relatorio_estaticos
 
 # Executar migrações
 echo "🗄️ Executando migrações..."
 python manage.py migrate --noinput
 
+# Versões responsivas das imagens enviadas antes do pipeline (as novas são geradas no upload)
+echo "🖼️ Gerando versões das imagens..."
+python manage.py gerar_imagens
+
+# Recalcular notícias relacionadas (o save de cada notícia só atualiza as afetadas)
+echo "🔗 Calculando notícias relacionadas..."
+python manage.py calcular_relacionadas
+
+# CSS da primeira tela de cada template (inline; o resto carrega sem bloquear)
+echo "🎨 Extraindo CSS crítico..."
+python manage.py css_critico
+
+# Pré-renderizar as páginas públicas (servidas pelo WhiteNoise)
+echo "🖨️ Pré-renderizando páginas públicas..."
+python manage.py prerenderizar
+
 echo "✅ Build concluído!"
\ No newline at end of file
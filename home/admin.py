@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
 from django.utils import timezone
 from .models import (
@@ -7,8 +8,18 @@ from .models import (
     VagaVoluntariado, 
     CandidaturaVoluntariado, 
     NewsletterSubscriber, 
-    Noticia
+    Noticia,
+    VisualizacaoDiaria,
+    CampanhaNewsletter,
+    EnvioNewsletter,
+    EmailSaida,
 )
+from .busca import buscar_noticias
+from .cache import TAG_VOLUNTARIADO, TAG_WORKSHOPS, invalidar, invalidar_noticias
+from .newsletter import reenviar_falhas
+from .prerender import adiar_noticias
+from .relacionadas import atualizar_relacionadas
+from .transicoes import transicionar_candidaturas, transicionar_inscricoes
 
 
 # ========================================
@@ -68,6 +79,10 @@ class WorkshopAdmin(admin.ModelAdmin):
         'marcar_encerrado'
     ]
     
+    def get_queryset(self, request):
+        # Ocupação anotada em uma única query para toda a changelist
+        return super().get_queryset(request).com_ocupacao()
+    
     # ✅ MÉTODOS PARA EXIBIR PROPRIEDADES CALCULADAS
     @admin.display(description='Vagas Disponíveis')
     def get_vagas_disponiveis(self, obj):
@@ -115,22 +130,26 @@ class WorkshopAdmin(admin.ModelAdmin):
     # ✅ ACTIONS
     @admin.action(description="✅ Marcar como Disponível")
     def marcar_disponivel(self, request, queryset):
-        updated = queryset.update(status='disponivel')
+        updated = queryset.update(status='disponivel', atualizado_em=timezone.now())
+        invalidar(TAG_WORKSHOPS)
         self.message_user(request, f"✅ {updated} workshop(s) marcado(s) como Disponível.")
     
     @admin.action(description="❌ Marcar como Esgotado")
     def marcar_esgotado(self, request, queryset):
-        updated = queryset.update(status='esgotado')
+        updated = queryset.update(status='esgotado', atualizado_em=timezone.now())
+        invalidar(TAG_WORKSHOPS)
         self.message_user(request, f"❌ {updated} workshop(s) marcado(s) como Esgotado.")
     
     @admin.action(description="🕐 Marcar como Em Breve")
     def marcar_em_breve(self, request, queryset):
-        updated = queryset.update(status='em_breve')
+        updated = queryset.update(status='em_breve', atualizado_em=timezone.now())
+        invalidar(TAG_WORKSHOPS)
         self.message_user(request, f"🕐 {updated} workshop(s) marcado(s) como Em Breve.")
     
     @admin.action(description="📦 Marcar como Encerrado")
     def marcar_encerrado(self, request, queryset):
-        updated = queryset.update(status='encerrado')
+        updated = queryset.update(status='encerrado', atualizado_em=timezone.now())
+        invalidar(TAG_WORKSHOPS)
         self.message_user(request, f"📦 {updated} workshop(s) encerrado(s).")
 
 
@@ -173,17 +192,17 @@ class InscricaoWorkshopAdmin(admin.ModelAdmin):
     
     @admin.action(description='✅ Confirmar inscrições selecionadas')
     def confirmar_inscricoes(self, request, queryset):
-        count = queryset.update(status='confirmado')
+        count = transicionar_inscricoes(queryset, 'confirmado')
         self.message_user(request, f'✅ {count} inscrição(ões) confirmada(s).')
     
     @admin.action(description='❌ Recusar inscrições selecionadas')
     def recusar_inscricoes(self, request, queryset):
-        count = queryset.update(status='recusado')
+        count = transicionar_inscricoes(queryset, 'recusado')
         self.message_user(request, f'❌ {count} inscrição(ões) recusada(s).')
     
     @admin.action(description='⏳ Marcar como pendente')
     def marcar_pendente(self, request, queryset):
-        count = queryset.update(status='pendente')
+        count = transicionar_inscricoes(queryset, 'pendente')
         self.message_user(request, f'⏳ {count} inscrição(ões) marcada(s) como pendente.')
 
 
@@ -238,17 +257,20 @@ class VagaVoluntariadoAdmin(admin.ModelAdmin):
     
     @admin.action(description='✅ Abrir vagas')
     def abrir_vagas(self, request, queryset):
-        count = queryset.update(status='aberta')
+        count = queryset.update(status='aberta', atualizada_em=timezone.now())
+        invalidar(TAG_VOLUNTARIADO)
         self.message_user(request, f'✅ {count} vaga(s) aberta(s).')
     
     @admin.action(description='❌ Fechar vagas')
     def fechar_vagas(self, request, queryset):
-        count = queryset.update(status='fechada')
+        count = queryset.update(status='fechada', atualizada_em=timezone.now())
+        invalidar(TAG_VOLUNTARIADO)
         self.message_user(request, f'❌ {count} vaga(s) fechada(s).')
     
     @admin.action(description='⏸️ Pausar vagas')
     def pausar_vagas(self, request, queryset):
-        count = queryset.update(status='pausada')
+        count = queryset.update(status='pausada', atualizada_em=timezone.now())
+        invalidar(TAG_VOLUNTARIADO)
         self.message_user(request, f'⏸️ {count} vaga(s) pausada(s).')
 
 
@@ -295,17 +317,17 @@ class CandidaturaVoluntariadoAdmin(admin.ModelAdmin):
     
     @admin.action(description='✅ Aprovar candidaturas selecionadas')
     def aprovar_candidaturas(self, request, queryset):
-        count = queryset.update(status='aprovado')
+        count = transicionar_candidaturas(queryset, 'aprovado')
         self.message_user(request, f'✅ {count} candidatura(s) aprovada(s).')
     
     @admin.action(description='❌ Recusar candidaturas selecionadas')
     def recusar_candidaturas(self, request, queryset):
-        count = queryset.update(status='recusado')
+        count = transicionar_candidaturas(queryset, 'recusado')
         self.message_user(request, f'❌ {count} candidatura(s) recusada(s).')
     
     @admin.action(description='🔍 Colocar em análise')
     def analisar_candidaturas(self, request, queryset):
-        count = queryset.update(status='em_analise')
+        count = transicionar_candidaturas(queryset, 'em_analise')
         self.message_user(request, f'🔍 {count} candidatura(s) em análise.')
 
 
@@ -361,36 +383,65 @@ class NoticiaAdmin(admin.ModelAdmin):
     
     @admin.action(description="📢 Publicar agora")
     def publicar_agora(self, request, queryset):
-        updated = queryset.update(publicado=True, data_publicacao=timezone.now())
+        ids = list(queryset.values_list('id', flat=True))
+        agora = timezone.now()
+        updated = queryset.update(publicado=True, data_publicacao=agora, data_atualizacao=agora)
+        invalidar_noticias()
+        transaction.on_commit(lambda: atualizar_relacionadas(ids))
+        transaction.on_commit(lambda: adiar_noticias(ids))
         self.message_user(request, f"✅ {updated} notícia(s) publicada(s)!")
     
     @admin.action(description="⚫ Marcar como rascunho")
     def marcar_como_rascunho(self, request, queryset):
-        updated = queryset.update(publicado=False)
+        ids = list(queryset.values_list('id', flat=True))
+        updated = queryset.update(publicado=False, data_atualizacao=timezone.now())
+        invalidar_noticias()
+        transaction.on_commit(lambda: atualizar_relacionadas(ids))
+        transaction.on_commit(lambda: adiar_noticias(ids))
         self.message_user(request, f"⚫ {updated} notícia(s) como rascunho.")
     
     @admin.action(description="⭐ Marcar como destaque")
     def marcar_como_destaque(self, request, queryset):
-        updated = queryset.update(destaque=True)
+        ids = list(queryset.values_list('id', flat=True))
+        updated = queryset.update(destaque=True, data_atualizacao=timezone.now())
+        invalidar_noticias()
+        transaction.on_commit(lambda: adiar_noticias(ids))
         self.message_user(request, f"⭐ {updated} notícia(s) como destaque.")
     
     @admin.action(description="☆ Desmarcar destaque")
     def desmarcar_destaque(self, request, queryset):
-        updated = queryset.update(destaque=False)
+        ids = list(queryset.values_list('id', flat=True))
+        updated = queryset.update(destaque=False, data_atualizacao=timezone.now())
+        invalidar_noticias()
+        transaction.on_commit(lambda: adiar_noticias(ids))
         self.message_user(request, f"☆ {updated} notícia(s) desmarcada(s).")
     
+    def get_search_results(self, request, queryset, search_term):
+        """Usa o índice de texto completo em vez de ILIKE em titulo/conteudo/autor"""
+        if not search_term.strip():
+            return queryset, False
+        return buscar_noticias(queryset, search_term), False
+    
     def save_model(self, request, obj, form, change):
-        """Envia newsletter ao criar nova notícia em destaque"""
+        """Avisa que a newsletter foi agendada (o disparo acontece em Noticia.save)"""
         is_new = obj.pk is None
         super().save_model(request, obj, form, change)
         
         if is_new and obj.destaque and obj.publicado:
-            from .views import enviar_newsletter_nova_noticia
-            try:
-                enviar_newsletter_nova_noticia(obj)
-                self.message_user(request, "✅ Newsletter enviada para todos os inscritos!", level='success')
-            except Exception as e:
-                self.message_user(request, f"⚠️ Notícia salva, mas erro ao enviar newsletter: {e}", level='warning')
+            self.message_user(request, "✅ Newsletter agendada para todos os inscritos!", level='success')
+
+
+@admin.register(VisualizacaoDiaria)
+class VisualizacaoDiariaAdmin(admin.ModelAdmin):
+    list_display = ['noticia', 'data', 'total']
+    list_filter = ['data']
+    search_fields = ['noticia__titulo']
+    date_hierarchy = 'data'
+    list_select_related = ['noticia']
+    readonly_fields = ['noticia', 'data', 'total']
+
+    def has_add_permission(self, request):
+        return False
 
 
 # ========================================
@@ -431,6 +482,133 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
                 enviar_email_boas_vindas(inscrito.email)
                 count += 1
             except Exception as e:
-                self.message_user(request, f"❌ Erro ao enviar para {inscrito.email}: {e}", level='error')
+                self.message_user(request, f"❌ Erro ao enfileirar para {inscrito.email}: {e}", level='error')
         
-        self.message_user(request, f"📧 Email de teste enviado para {count} inscrito(s).")
\ No newline at end of file
+        self.message_user(request, f"📧 Email de teste enfileirado para {count} inscrito(s).")
+
+# ========================================
+# CAMPANHAS DE NEWSLETTER ADMIN
+# ========================================
+
+@admin.register(CampanhaNewsletter)
+class CampanhaNewsletterAdmin(admin.ModelAdmin):
+    list_display = ['noticia', 'status_badge', 'progresso', 'total_falhas', 'get_taxa_envio', 'criada_em', 'concluida_em']
+    list_filter = ['status', 'criada_em']
+    search_fields = ['noticia__titulo']
+    date_hierarchy = 'criada_em'
+    list_select_related = ['noticia']
+    readonly_fields = [
+        'noticia',
+        'status',
+        'total_destinatarios',
+        'total_enviados',
+        'total_falhas',
+        'progresso',
+        'get_taxa_envio',
+        'criada_em',
+        'iniciada_em',
+        'ultimo_envio_em',
+        'concluida_em',
+    ]
+    actions = ['reenviar_falhas']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Status')
+    def status_badge(self, obj):
+        cores = {
+            'pendente': ('#F59E0B', '⏳ Pendente'),
+            'enviando': ('#3B82F6', '📨 Enviando'),
+            'concluida': ('#10B981', '✅ Concluída'),
+        }
+        cor, texto = cores.get(obj.status, ('#6B7280', obj.status))
+        return format_html('<span style="color: {}; font-weight: bold;">{}</span>', cor, texto)
+
+    @admin.display(description='Progresso')
+    def progresso(self, obj):
+        processados = obj.total_enviados + obj.total_falhas
+        return format_html(
+            '<span style="font-weight: bold;">{}/{} ({}%)</span>',
+            processados,
+            obj.total_destinatarios,
+            obj.percentual_progresso
+        )
+
+    @admin.display(description='Taxa (emails/s)')
+    def get_taxa_envio(self, obj):
+        return obj.taxa_envio
+
+    @admin.action(description='🔁 Reenviar falhas')
+    def reenviar_falhas(self, request, queryset):
+        count = reenviar_falhas(queryset)
+        self.message_user(request, f'🔁 {count} envio(s) recolocado(s) na fila.')
+
+
+@admin.register(EnvioNewsletter)
+class EnvioNewsletterAdmin(admin.ModelAdmin):
+    list_display = ['email', 'campanha', 'status', 'tentativas', 'proxima_tentativa_em', 'enviado_em']
+    list_filter = ['status', 'campanha']
+    search_fields = ['email']
+    list_select_related = ['campanha__noticia']
+    readonly_fields = [
+        'campanha', 'inscrito', 'email', 'token', 'status', 'tentativas',
+        'proxima_tentativa_em', 'reservado_em', 'enviado_em', 'erro',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+
+# ========================================
+# CAIXA DE SAÍDA ADMIN
+# ========================================
+
+@admin.register(EmailSaida)
+class EmailSaidaAdmin(admin.ModelAdmin):
+    list_display = ['assunto', 'get_destinatarios', 'status_badge', 'tentativas', 'proxima_tentativa_em', 'criado_em', 'enviado_em']
+    list_filter = ['status', 'criado_em']
+    search_fields = ['assunto', 'destinatarios']
+    date_hierarchy = 'criado_em'
+    readonly_fields = [
+        'assunto',
+        'corpo_texto',
+        'corpo_html',
+        'remetente',
+        'destinatarios',
+        'status',
+        'tentativas',
+        'proxima_tentativa_em',
+        'reservado_em',
+        'ultimo_erro',
+        'criado_em',
+        'enviado_em',
+    ]
+    actions = ['reenviar_emails']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Destinatários')
+    def get_destinatarios(self, obj):
+        return ', '.join(obj.destinatarios)
+
+    @admin.display(description='Status')
+    def status_badge(self, obj):
+        cores = {
+            'pendente': ('#F59E0B', '⏳ Pendente'),
+            'enviado': ('#10B981', '✅ Enviado'),
+            'falhou': ('#EF4444', '❌ Falhou'),
+        }
+        cor, texto = cores.get(obj.status, ('#6B7280', obj.status))
+        return format_html('<span style="color: {}; font-weight: bold;">{}</span>', cor, texto)
+
+    @admin.action(description='🔁 Reenviar emails selecionados')
+    def reenviar_emails(self, request, queryset):
+        count = queryset.exclude(status='enviado').update(
+            status='pendente',
+            tentativas=0,
+            proxima_tentativa_em=timezone.now(),
+            reservado_em=None,
+        )
+        self.message_user(request, f'🔁 {count} email(s) recolocado(s) na fila.')
@@ -0,0 +1,191 @@
+import hashlib
+import posixpath
+import re
+from datetime import timedelta
+
+import cloudinary.api
+import cloudinary.uploader
+from cloudinary_storage.storage import MediaCloudinaryStorage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Noticia, Workshop
+
+
+# ========================================
+# MÍDIA ENDEREÇADA POR CONTEÚDO
+# ========================================
+# Cada arquivo enviado é gravado com o nome igual ao hash do conteúdo, na
+# pasta pedida pelo campo: noticias/<sha256>.png. Um reenvio do mesmo
+# arquivo acha o nome já existente e reaproveita o objeto, sem gravar (nem
+# subir para o Cloudinary) outra cópia; navegadores e CDN também guardam
+# uma vez só. Arquivos que ninguém mais referencia são apagados pelo
+# comando limpar_midia; deduplicar_midia converte a mídia antiga.
+
+TAMANHO_HASH = 32
+_NOME_POR_CONTEUDO = re.compile(r'[0-9a-f]{%d}(\.\w+)?' % TAMANHO_HASH)
+
+# Extensões que o Cloudinary não guarda no public_id (comparação de nomes no limpar_midia)
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff'}
+
+# Models com ImageField `imagem` + ImagemResponsiva
+MODELOS_COM_MIDIA = (Noticia, Workshop)
+
+
+def hash_conteudo(conteudo):
+    digest = hashlib.sha256()
+    for pedaco in conteudo.chunks():
+        digest.update(pedaco)
+    if hasattr(conteudo, 'seek'):
+        conteudo.seek(0)
+    return digest.hexdigest()[:TAMANHO_HASH]
+
+
+def ja_enderecado(nome):
+    return bool(_NOME_POR_CONTEUDO.fullmatch(posixpath.basename(nome)))
+
+
+def nome_por_conteudo(nome, digest):
+    """noticias/foto final (2).PNG -> noticias/<digest>.png"""
+    pasta, arquivo = posixpath.split(nome.replace('\\', '/'))
+    extensao = posixpath.splitext(arquivo)[1].lower()
+    return posixpath.join(pasta, digest + extensao)
+
+
+class ConteudoEnderecadoMixin:
+    """Mixin para um Storage: o nome vem do conteúdo e conteúdos repetidos são gravados uma vez"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        nome = nome_por_conteudo(name, hash_conteudo(content))
+        if self.exists(nome):
+            return nome
+        return super().save(nome, content, max_length)
+
+    def arquivos(self, pasta):
+        """(nome, data de modificação) de todos os arquivos abaixo de `pasta`"""
+        try:
+            subpastas, nomes = self.listdir(pasta)
+        except FileNotFoundError:
+            return
+        for nome in nomes:
+            caminho = posixpath.join(pasta, nome)
+            yield caminho, self.get_modified_time(caminho)
+        for subpasta in subpastas:
+            yield from self.arquivos(posixpath.join(pasta, subpasta))
+
+    def chave(self, nome):
+        """Nome comparável entre o banco e a listagem do storage"""
+        raiz, extensao = posixpath.splitext(nome)
+        return raiz if extensao.lower() in EXTENSOES_IMAGEM else nome
+
+
+class ArquivosPorConteudo(ConteudoEnderecadoMixin, FileSystemStorage):
+    """MEDIA_ROOT local"""
+
+
+class CloudinaryPorConteudo(ConteudoEnderecadoMixin, MediaCloudinaryStorage):
+    """
+    Cloudinary com public_id fixo (o hash), sem o sufixo aleatório que o
+    MediaCloudinaryStorage acrescenta. O nome guardado no banco mantém a
+    extensão, como no armazenamento local; a URL com extensão entrega o
+    mesmo objeto.
+    """
+
+    def _raiz(self):
+        return self._normalize_path(self._prepend_prefix(''))
+
+    def _public_id(self, name):
+        return posixpath.splitext(self._prepend_prefix(self._normalise_name(name)))[0]
+
+    def _upload(self, name, content):
+        return cloudinary.uploader.upload(
+            content,
+            public_id=self._public_id(name),
+            overwrite=False,
+            unique_filename=False,
+            resource_type=self._get_resource_type(name),
+            tags=self.TAG,
+        )
+
+    def _save(self, name, content):
+        super()._save(name, content)
+        return self._normalise_name(name)
+
+    def delete(self, name):
+        response = cloudinary.uploader.destroy(
+            self._public_id(name), invalidate=True, resource_type=self._get_resource_type(name)
+        )
+        return response['result'] == 'ok'
+
+    def arquivos(self, pasta):
+        cursor = None
+        while True:
+            opcoes = {'next_cursor': cursor} if cursor else {}
+            resposta = cloudinary.api.resources(
+                type='upload', prefix=self._normalize_path(self._prepend_prefix(pasta)),
+                resource_type=self.RESOURCE_TYPE, max_results=500, **opcoes,
+            )
+            for recurso in resposta['resources']:
+                nome = recurso['public_id'][len(self._raiz()):]
+                yield f"{nome}.{recurso['format']}", parse_datetime(recurso['created_at'])
+            cursor = resposta.get('next_cursor')
+            if not cursor:
+                break
+
+    def chave(self, nome):
+        # Nomes antigos (MediaCloudinaryStorage) são o public_id com o prefixo, sem extensão
+        if nome.startswith(self._raiz()):
+            nome = nome[len(self._raiz()):]
+        return super().chave(nome)
+
+
+# ========================================
+# ARQUIVOS EM USO E ÓRFÃOS
+# ========================================
+
+def pastas_midia():
+    return sorted({
+        modelo._meta.get_field('imagem').upload_to.strip('/') for modelo in MODELOS_COM_MIDIA
+    })
+
+
+def nomes_em_uso(objeto):
+    """A imagem e as derivadas de um objeto"""
+    nomes = [objeto.imagem.name] if objeto.imagem else []
+    for versoes in objeto.imagem_derivadas.values():
+        if isinstance(versoes, list):
+            nomes.extend(nome for _, nome in versoes)
+    return nomes
+
+
+def nomes_referenciados():
+    nomes = set()
+    for modelo in MODELOS_COM_MIDIA:
+        for objeto in modelo.objects.only('id', 'imagem', 'imagem_derivadas').iterator():
+            nomes.update(nomes_em_uso(objeto))
+    return nomes
+
+
+def arquivos_orfaos(horas=24, storage=default_storage):
+    """
+    Arquivos das pastas de mídia que nenhuma linha referencia. Os mais novos
+    que `horas` ficam de fora: o upload é gravado antes do commit da linha.
+    """
+    if not hasattr(storage, 'arquivos'):
+        raise TypeError(f'{type(storage).__name__} não é um storage endereçado por conteúdo')
+    em_uso = {storage.chave(nome) for nome in nomes_referenciados()}
+    limite = timezone.now() - timedelta(hours=horas)
+    for pasta in pastas_midia():
+        for nome, modificado in storage.arquivos(pasta):
+            if storage.chave(nome) in em_uso:
+                continue
+            if modificado is not None and timezone.is_naive(modificado):
+                modificado = timezone.make_aware(modificado)
+            if modificado is None or modificado <= limite:
+                yield nome
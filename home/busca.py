@@ -0,0 +1,179 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+
+# Configuração de busca criada pela migração 0008 (portuguese + unaccent)
+CONFIGURACAO_POSTGRES = 'portugues_sem_acento'
+
+# Tabela FTS5 espelho de home_noticia no SQLite (rowid = id da notícia)
+TABELA_FTS = 'home_noticia_busca'
+
+# Colunas indexadas e seus pesos no bm25 do SQLite (mesma ordem do CREATE)
+COLUNAS_FTS = ('titulo', 'subtitulo', 'autor', 'conteudo')
+PESOS_FTS = (10.0, 5.0, 3.0, 1.0)
+
+
+# ========================================
+# NORMALIZAÇÃO E RADICALIZAÇÃO
+# ========================================
+# No Postgres o dicionário portuguese_stem faz esse trabalho. No SQLite o
+# texto é reduzido aqui, antes de ir para o FTS5, e os termos da busca
+# passam pela mesma função, então "formações" encontra "formação".
+
+# Sufixos removidos do fim da palavra, do mais longo para o mais curto
+SUFIXOS_PLURAL = [('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'), ('ns', 'm'), ('res', 'r'), ('s', '')]
+SUFIXOS = [
+    'amentos', 'imentos', 'amento', 'imento', 'acoes', 'icoes', 'mente', 'idades', 'idade',
+    'acao', 'icao', 'ismo', 'ista', 'avel', 'ivel', 'ando', 'endo', 'indo', 'ador', 'ante',
+    'ar', 'er', 'ir', 'ao', 'a', 'o', 'e',
+]
+TAMANHO_MINIMO_RADICAL = 3
+
+_PALAVRA = re.compile(r'\w+')
+
+# Marcas combinantes que o NFKD separa das letras latinas (acentos, til, cedilha)
+_SEM_COMBINANTES = dict.fromkeys(range(0x0300, 0x0370))
+
+
+def sem_acentos(texto):
+    """'Formação' -> 'formacao'"""
+    return unicodedata.normalize('NFKD', texto.lower()).translate(_SEM_COMBINANTES)
+
+
+@lru_cache(maxsize=100000)
+def radical(palavra):
+    """Redução leve de sufixos do português (plural, gênero e derivações comuns)"""
+    for sufixo, troca in SUFIXOS_PLURAL:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= TAMANHO_MINIMO_RADICAL:
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+    for sufixo in SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= TAMANHO_MINIMO_RADICAL:
+            return palavra[:-len(sufixo)]
+    return palavra
+
+
+def termos(texto):
+    """Lista de radicais sem acento do texto"""
+    return [radical(p) for p in _PALAVRA.findall(sem_acentos(texto or ''))]
+
+
+def texto_indexavel(texto):
+    return ' '.join(termos(texto))
+
+
+# ========================================
+# ÍNDICE FTS5 (SQLITE)
+# ========================================
+
+# Se a tabela existe, por banco: conferido uma vez por processo e de novo depois de um migrate
+_fts_por_banco = {}
+
+
+def _fts_disponivel():
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _fts_por_banco:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABELA_FTS])
+            _fts_por_banco[connection.alias] = cursor.fetchone() is not None
+    return _fts_por_banco[connection.alias]
+
+
+@receiver(post_migrate)
+def _esquecer_fts(sender, **kwargs):
+    _fts_por_banco.clear()
+
+
+def indexar_noticias(noticias):
+    """Regrava as notícias na tabela FTS5. No Postgres o trigger já mantém a coluna"""
+    if not _fts_disponivel():
+        return 0
+    linhas = [
+        (noticia.id, *(texto_indexavel(getattr(noticia, coluna)) for coluna in COLUNAS_FTS))
+        for noticia in noticias
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [(linha[0],) for linha in linhas])
+        cursor.executemany(
+            f"INSERT INTO {TABELA_FTS} (rowid, {', '.join(COLUNAS_FTS)}) VALUES (%s, %s, %s, %s, %s)",
+            linhas,
+        )
+    return len(linhas)
+
+
+def remover_noticia(noticia_id):
+    if _fts_disponivel():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABELA_FTS} WHERE rowid = %s", [noticia_id])
+
+
+def reindexar_busca(tamanho_lote=2000):
+    """Reconstrói o índice inteiro (SQLite) ou recalcula a coluna busca (Postgres)"""
+    from .models import Noticia
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # Reatribuir o título dispara o trigger de atualização da coluna
+            cursor.execute("UPDATE home_noticia SET titulo = titulo")
+            return cursor.rowcount
+
+    if not _fts_disponivel():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_FTS}")
+    total = 0
+    lote = []
+    for noticia in Noticia.objects.only('id', *COLUNAS_FTS).order_by('id').iterator(chunk_size=tamanho_lote):
+        lote.append(noticia)
+        if len(lote) >= tamanho_lote:
+            total += indexar_noticias(lote)
+            lote = []
+    return total + indexar_noticias(lote)
+
+
+# ========================================
+# CONSULTA
+# ========================================
+
+def _consulta_fts(busca):
+    """Termos entre aspas (sem sintaxe FTS5 do usuário), com prefixo, todos obrigatórios"""
+    return ' '.join(f'"{t}"*' for t in termos(busca))
+
+
+def buscar_noticias(queryset, busca):
+    """
+    Filtra o queryset pelas notícias que casam com a busca e anota
+    `relevancia` (maior = mais relevante). Postgres usa o campo busca
+    (tsvector com índice GIN); SQLite usa a tabela FTS5; outros bancos
+    caem no icontains.
+    """
+    busca = (busca or '').strip()
+    if not termos(busca):
+        return queryset.none().annotate(relevancia=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == 'postgresql':
+        consulta = SearchQuery(busca, config=CONFIGURACAO_POSTGRES, search_type='websearch')
+        return queryset.filter(busca=consulta).annotate(
+            relevancia=SearchRank(F('busca'), consulta, cover_density=True)
+        )
+
+    if _fts_disponivel():
+        # JOIN com a tabela FTS5: o MATCH roda uma vez e o bm25 (rank, com os pesos das colunas) sai da mesma varredura
+        pesos = ', '.join(str(p) for p in PESOS_FTS)
+        return queryset.filter(
+            indice_busca__consulta__match=_consulta_fts(busca),
+            indice_busca__rank__match=f'bm25({pesos})',
+        ).annotate(relevancia=-F('indice_busca__rank'))
+
+    filtro = Q()
+    for palavra in busca.split():
+        filtro &= Q(titulo__icontains=palavra) | Q(subtitulo__icontains=palavra) | Q(conteudo__icontains=palavra)
+    return queryset.filter(filtro).annotate(relevancia=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,319 @@
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.dispatch import Signal, receiver
+from django.db.models import Max
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import Noticia, NoticiaRelacionada, VagaVoluntariado, Workshop
+
+
+# Tempo máximo de vida dos dados derivados de notícias e das versões. Com
+# LocMemCache cada worker tem o próprio cache e só vê a invalidação feita por
+# ele mesmo; esse limite garante que os demais se atualizem logo. Com Redis
+# vale para todos.
+TTL_NOTICIAS = 300
+
+# Grupos de conteúdo com versão própria. Cada um é invalidado quando as
+# linhas de que depende mudam (ver signals.py).
+TAG_NOTICIAS = 'noticias'
+TAG_WORKSHOPS = 'workshops'
+TAG_VOLUNTARIADO = 'voluntariado'
+
+# De onde sai a versão de cada grupo: (model, campo que muda a cada alteração)
+FONTES_VERSAO = {
+    TAG_NOTICIAS: [(Noticia, 'data_atualizacao'), (NoticiaRelacionada, 'id')],
+    TAG_WORKSHOPS: [(Workshop, 'atualizado_em')],
+    TAG_VOLUNTARIADO: [(VagaVoluntariado, 'atualizada_em')],
+}
+
+
+# ========================================
+# VERSÕES POR TAG
+# ========================================
+# Todas as chaves derivadas de um grupo carregam o número de versão dele.
+# Salvar ou excluir uma linha muda a versão e as chaves antigas deixam de
+# ser lidas (expiram sozinhas), sem precisar saber quais existem.
+#
+# A versão é calculada dos próprios dados (última alteração e número de
+# linhas de cada fonte), então workers com caches separados (LocMemCache)
+# e o comando que pré-renderiza as páginas chegam ao mesmo número para o
+# mesmo conteúdo: mesmas chaves e ETags. Cada worker guarda a versão por
+# TTL_NOTICIAS e depois a recalcula, o que leva a invalidação feita em
+# outro processo até ele.
+
+def _chave_versao(tag):
+    return f'{tag}:versao'
+
+
+def versao_do_banco(tag):
+    partes = []
+    for model, campo in FONTES_VERSAO[tag]:
+        # Consultas separadas: o MAX sai do índice do campo e o COUNT do índice da chave
+        ultima = model.objects.aggregate(ultima=Max(campo))['ultima']
+        partes.append(f'{ultima}:{model.objects.count()}')
+    return int(hashlib.md5('|'.join(partes).encode()).hexdigest()[:12], 16)
+
+
+def campos_alteracao(model):
+    """{campo auto_now: agora} para UPDATEs em lote, que não preenchem auto_now sozinhos"""
+    agora = timezone.now()
+    return {campo.name: agora for campo in model._meta.concrete_fields if getattr(campo, 'auto_now', False)}
+
+
+def versao(tag):
+    chave = _chave_versao(tag)
+    valor = cache.get(chave)
+    if valor is None:
+        valor = versao_do_banco(tag)
+        cache.add(chave, valor, TTL_NOTICIAS)
+        valor = cache.get(chave, valor)
+    return valor
+
+
+def versoes(tags):
+    """Versões de vários grupos com uma só ida ao cache"""
+    chaves = {tag: _chave_versao(tag) for tag in tags}
+    valores = cache.get_many(chaves.values())
+    return [valores[chaves[tag]] if chaves[tag] in valores else versao(tag) for tag in tags]
+
+
+# Enviado depois de cada invalidação, com o argumento `tag`
+versao_invalidada = Signal()
+
+
+def invalidar(tag):
+    """Recalcula a versão do grupo (todo UPDATE em lote precisa gravar o campo de FONTES_VERSAO)"""
+    cache.set(_chave_versao(tag), versao_do_banco(tag), TTL_NOTICIAS)
+    versao_invalidada.send(sender=invalidar, tag=tag)
+
+
+# ========================================
+# VERSÃO DO DEPLOY
+# ========================================
+# O HTML guardado (cache de páginas, ETag) depende também dos templates e
+# das URLs com hash dos estáticos. Um deploy que muda qualquer um deles não
+# reaproveita páginas antigas, que apontariam para CSS já apagado.
+
+_DIRETORIO_TEMPLATES = Path(__file__).resolve().parent / 'templates'
+_versao_deploy = None
+
+
+def versao_deploy():
+    global _versao_deploy
+    if _versao_deploy is None:
+        templates = max(
+            (arquivo.stat().st_mtime_ns for arquivo in _DIRETORIO_TEMPLATES.rglob('*.html')), default=0
+        )
+        _versao_deploy = f"{templates}-{getattr(staticfiles_storage, 'manifest_hash', '')}"
+    return _versao_deploy
+
+
+def versao_noticias():
+    return versao(TAG_NOTICIAS)
+
+
+def invalidar_noticias():
+    """Chamado em todo save/delete de Noticia e nas ações em lote do admin"""
+    invalidar(TAG_NOTICIAS)
+
+
+def chave(tag, nome, *partes):
+    return ':'.join([tag, str(versao(tag)), nome, *(str(p) for p in partes)])
+
+
+def chave_noticias(nome, *partes):
+    return chave(TAG_NOTICIAS, nome, *partes)
+
+
+def timeout_ate(horizonte, maximo=TTL_NOTICIAS):
+    """
+    Segundos até o horizonte de publicação (a próxima notícia agendada), limitado
+    a `maximo`. Assim uma notícia agendada aparece no minuto em que é publicada.
+    """
+    if horizonte is None:
+        return maximo
+    restante = (horizonte - timezone.now()).total_seconds()
+    return max(1, min(maximo, int(restante) + 1))
+
+
+def em_cache(tag, nome, calcular, *partes):
+    """
+    Lê do cache ou calcula. `calcular()` retorna (valor, horizonte), onde
+    horizonte é o datetime a partir do qual o valor deixa de valer (ou None).
+    """
+    chave_valor = chave(tag, nome, *partes)
+    valor = cache.get(chave_valor)
+    if valor is None:
+        valor, horizonte = calcular()
+        cache.set(chave_valor, valor, timeout_ate(horizonte))
+    return valor
+
+
+def em_cache_noticias(nome, calcular, *partes):
+    return em_cache(TAG_NOTICIAS, nome, calcular, *partes)
+
+
+# ========================================
+# CONSULTAS EM CACHE
+# ========================================
+
+TAMANHO_FEED_HOME = 4
+
+
+def _calcular_feed_home():
+    noticias = list(
+        Noticia.objects.publicadas().order_by('-destaque', '-data_publicacao')[:TAMANHO_FEED_HOME]
+    )
+    return noticias, Noticia.objects.proxima_publicacao()
+
+
+def feed_home():
+    """Notícias do bloco da home: destaques primeiro, completando com as mais recentes"""
+    return em_cache_noticias('feed_home', _calcular_feed_home)
+
+
+# ========================================
+# NOTÍCIAS PUBLICADAS (IDS EM CACHE)
+# ========================================
+# publicadas() compara com timezone.now(), então o SQL muda a cada
+# requisição, mas o resultado só muda quando uma notícia é salva ou quando
+# chega a próxima data agendada. O índice abaixo guarda os ids visíveis até
+# esse instante; as views filtram e paginam sobre ele e só vão ao banco
+# para carregar as notícias da página pelo id.
+#
+# O índice desempacotado fica também na memória do processo, junto com as
+# listas de ids já filtradas (por categoria/ano/mês), enquanto a versão de
+# notícias não muda e o horizonte não chega. Dentro de uma requisição nem a
+# versão é consultada de novo: o índice é resolvido uma vez e reaproveitado
+# por esta_publicada, ids_publicadas e ids_relacionadas.
+
+_indice_processo = {}
+_requisicao = threading.local()
+
+
+def _calcular_indice_publicadas():
+    linhas = list(
+        Noticia.objects.publicadas()
+        .annotate(ano=ExtractYear('data_publicacao'), mes=ExtractMonth('data_publicacao'))
+        .order_by('-data_publicacao', '-id')
+        .values_list('id', 'categoria', 'ano', 'mes', 'data_publicacao', 'data_atualizacao')
+    )
+    ordem = [linha[:4] for linha in linhas]
+    # Última mudança visível de cada notícia: edição ou o momento em que foi publicada
+    alteracoes = {linha[0]: max(linha[4], linha[5]) for linha in linhas}
+    horizonte = Noticia.objects.proxima_publicacao()
+    indice = {
+        'ordem': ordem,
+        'categorias': {noticia_id: categoria for noticia_id, categoria, _, _ in ordem},
+        'alteracoes': alteracoes,
+        'ultima_alteracao': max(alteracoes.values(), default=None),
+        'horizonte': horizonte,
+    }
+    return indice, horizonte
+
+
+def _entrada_indice():
+    """{'indice', 'listas'} válido agora: da requisição, da memória do processo ou do cache"""
+    entrada = getattr(_requisicao, 'entrada', None)
+    if entrada is not None:
+        return entrada
+
+    chave_indice = chave_noticias('indice_publicadas')
+    entrada = _indice_processo.get('atual')
+    if entrada is None or entrada['chave'] != chave_indice or entrada['expira'] <= time.monotonic():
+        indice = cache.get(chave_indice)
+        if indice is None:
+            indice, _ = _calcular_indice_publicadas()
+            cache.set(chave_indice, indice, timeout_ate(indice['horizonte']))
+        entrada = {
+            'chave': chave_indice,
+            'expira': time.monotonic() + timeout_ate(indice['horizonte']),
+            'indice': indice,
+            'listas': {},
+        }
+        _indice_processo['atual'] = entrada
+
+    if getattr(_requisicao, 'ativa', False):
+        _requisicao.entrada = entrada
+    return entrada
+
+
+@receiver(request_started)
+def _inicio_requisicao(sender, **kwargs):
+    _requisicao.entrada = None
+    _requisicao.ativa = True
+
+
+@receiver(request_finished)
+def _fim_requisicao(sender, **kwargs):
+    _requisicao.entrada = None
+    _requisicao.ativa = False
+
+
+@receiver(versao_invalidada)
+def _descartar_indice_da_requisicao(sender, tag, **kwargs):
+    # Um save no meio da requisição (admin, on_commit) volta a ler a versão nova
+    if tag == TAG_NOTICIAS:
+        _requisicao.entrada = None
+
+
+def indice_publicadas():
+    return _entrada_indice()['indice']
+
+
+def _inteiro(valor):
+    try:
+        return int(valor) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+def ids_publicadas(categoria=None, ano=None, mes=None):
+    """
+    Ids das notícias publicadas, da mais recente para a mais antiga, com os
+    filtros da listagem. A lista é compartilhada entre chamadas: não alterar.
+    """
+    filtro = (categoria or None, _inteiro(ano), _inteiro(mes))
+    entrada = _entrada_indice()
+    ids = entrada['listas'].get(filtro)
+    if ids is None:
+        categoria, ano, mes = filtro
+        ids = [
+            noticia_id for noticia_id, c, a, m in entrada['indice']['ordem']
+            if (not categoria or c == categoria) and (ano is None or a == ano) and (mes is None or m == mes)
+        ]
+        entrada['listas'][filtro] = ids
+    return ids
+
+
+def esta_publicada(noticia_id):
+    return noticia_id in indice_publicadas()['categorias']
+
+
+def _calcular_relacionadas(noticia_id):
+    ids = list(
+        NoticiaRelacionada.objects.filter(noticia_id=noticia_id)
+        .order_by('posicao').values_list('relacionada_id', flat=True)
+    )
+    return ids, None
+
+
+def ids_relacionadas(noticia_id, quantidade=3):
+    """
+    Relacionadas pré-calculadas (home.relacionadas), só as publicadas. Enquanto
+    a tabela não tem a notícia, usa as mais recentes da mesma categoria.
+    """
+    categorias = indice_publicadas()['categorias']
+    guardadas = em_cache_noticias('relacionadas', lambda: _calcular_relacionadas(noticia_id), noticia_id)
+    relacionadas = [outro_id for outro_id in guardadas if outro_id in categorias][:quantidade]
+    if relacionadas or noticia_id not in categorias:
+        return relacionadas
+    mesma_categoria = ids_publicadas(categorias[noticia_id])
+    return [outro_id for outro_id in mesma_categoria[:quantidade + 1] if outro_id != noticia_id][:quantidade]
@@ -0,0 +1,157 @@
+import hashlib
+import re
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .cache import timeout_ate, versao_deploy, versoes
+
+
+# Parâmetros que não mudam a página (campanhas, links de redes sociais)
+PARAMETROS_IGNORADOS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+PREFIXOS_IGNORADOS = ('utm_',)
+
+# O token CSRF dos formulários (newsletter no rodapé, inscrição, candidatura)
+# é de cada visitante: fica guardado como marcador e é trocado na entrega.
+# Com RESPOSTAS_PUBLICAS o campo já vem vazio (csrf_publico) e fica como está.
+MARCADOR_CSRF = b'__csrf_pagina_em_cache__'
+_CAMPO_CSRF = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]+(")')
+
+CHAVE_ACERTOS = 'paginas:acertos'
+CHAVE_FALTAS = 'paginas:faltas'
+CHAVE_IGNORADAS = 'paginas:ignoradas'
+
+
+# ========================================
+# CONTADORES
+# ========================================
+
+def _contar(chave):
+    try:
+        cache.incr(chave)
+    except ValueError:
+        if not cache.add(chave, 1, None):
+            cache.incr(chave)
+
+
+def estatisticas_cache_paginas():
+    """Acertos, faltas, requisições que não podiam usar o cache e taxa de acerto"""
+    valores = cache.get_many([CHAVE_ACERTOS, CHAVE_FALTAS, CHAVE_IGNORADAS])
+    acertos = valores.get(CHAVE_ACERTOS, 0)
+    faltas = valores.get(CHAVE_FALTAS, 0)
+    return {
+        'acertos': acertos,
+        'faltas': faltas,
+        'ignoradas': valores.get(CHAVE_IGNORADAS, 0),
+        'taxa_acerto': acertos / (acertos + faltas) if acertos + faltas else 0.0,
+    }
+
+
+def zerar_estatisticas_cache_paginas():
+    cache.delete_many([CHAVE_ACERTOS, CHAVE_FALTAS, CHAVE_IGNORADAS])
+
+
+# ========================================
+# CHAVE E ELEGIBILIDADE
+# ========================================
+
+def query_normalizada(request):
+    """Parâmetros em ordem, sem vazios nem rastreadores: ?b=2&a=1&utm_source=x == ?a=1&b=2"""
+    pares = sorted(
+        (nome, valor)
+        for nome, valores in request.GET.lists()
+        if nome not in PARAMETROS_IGNORADOS and not nome.startswith(PREFIXOS_IGNORADOS)
+        for valor in valores if valor
+    )
+    return urlencode(pares)
+
+
+def _chave_pagina(request, tags):
+    partes = [
+        request.path, query_normalizada(request), versao_deploy(),
+        *(f'{t}={v}' for t, v in zip(tags, versoes(tags))),
+    ]
+    return 'pagina:' + hashlib.md5('|'.join(partes).encode()).hexdigest()
+
+
+def visitante_anonimo(request):
+    """
+    Sem sessão e sem mensagens pendentes: a página é a mesma para todos. Quem
+    tem sessão pode ter mensagens guardadas nela ou estar logado no admin.
+    """
+    return (
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def em_prerenderizacao(request):
+    """Requisição montada por home.prerender para gerar o HTML estático"""
+    return getattr(request, 'prerenderizacao', False)
+
+
+def pode_usar_cache(request):
+    return (
+        settings.CACHE_PAGINAS
+        and request.method == 'GET'
+        and visitante_anonimo(request)
+        and not em_prerenderizacao(request)
+    )
+
+
+# ========================================
+# DECORATOR
+# ========================================
+
+def cache_pagina(*tags, horizonte=None, ao_servir=None):
+    """
+    Guarda o HTML da view para visitantes anônimos. A página deixa de valer
+    quando qualquer uma das `tags` é invalidada; `horizonte()` (opcional)
+    retorna o datetime em que ela expira sozinha (próxima notícia agendada).
+    `ao_servir(request, *args, **kwargs)` roda também nos acertos, para
+    efeitos que a view teria (contar visualização).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not pode_usar_cache(request):
+                if request.method == 'GET' and not em_prerenderizacao(request):
+                    _contar(CHAVE_IGNORADAS)
+                return view(request, *args, **kwargs)
+
+            chave = _chave_pagina(request, tags)
+            guardada = cache.get(chave)
+            if guardada is not None:
+                _contar(CHAVE_ACERTOS)
+                if ao_servir:
+                    ao_servir(request, *args, **kwargs)
+                conteudo = guardada['conteudo']
+                if MARCADOR_CSRF in conteudo:
+                    conteudo = conteudo.replace(MARCADOR_CSRF, get_token(request).encode())
+                resposta = HttpResponse(conteudo, content_type=guardada['content_type'])
+                resposta['X-Cache'] = 'HIT'
+                return resposta
+
+            _contar(CHAVE_FALTAS)
+            resposta = view(request, *args, **kwargs)
+            sessao = getattr(request, 'session', None)
+            if (
+                resposta.status_code == 200
+                and not resposta.streaming
+                and not resposta.cookies
+                and not (sessao is not None and sessao.modified)
+            ):
+                timeout = timeout_ate(horizonte(), settings.CACHE_PAGINAS_TTL) if horizonte else settings.CACHE_PAGINAS_TTL
+                cache.set(chave, {
+                    'conteudo': _CAMPO_CSRF.sub(rb'\1' + MARCADOR_CSRF + rb'\2', resposta.content),
+                    'content_type': resposta['Content-Type'],
+                }, timeout)
+            resposta['X-Cache'] = 'MISS'
+            return resposta
+        return wrapper
+    return decorator
@@ -0,0 +1,288 @@
+import json
+import math
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from urllib.parse import urljoin
+
+import cssselect2
+import html5lib
+import tinycss2
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+from .cache import ids_publicadas
+
+
+# ========================================
+# CSS CRÍTICO
+# ========================================
+# Todo o CSS do site fica em arquivos estáticos (com hash no nome e cache
+# immutable). No build, o comando css_critico renderiza uma página de cada
+# template, estima quais elementos aparecem na primeira tela e guarda, por
+# template, só as regras que valem para eles. O {% estilos %} do base.html
+# coloca esse CSS num <style> e troca os <link rel="stylesheet"> por preload
+# que vira stylesheet no onload: a primeira pintura não espera nenhum CSS.
+#
+# Sem o arquivo gerado, ou se os arquivos de CSS da página mudaram depois
+# do build (outro hash), o bloco sai como está, com os links bloqueantes.
+#
+# A primeira tela é estimada pela ordem do documento (sem navegador):
+# altura aproximada de cada elemento numa tela de celular, onde o texto
+# quebra em mais linhas, até ALTURA_DOBRA. As regras casam por classe, então
+# um card acima da dobra já traz as regras de todos os outros.
+
+ALTURA_DOBRA = 1000
+LARGURA_TELA = 400
+CARACTERES_POR_LINHA = 45
+ALTURA_LINHA = 26
+ALTURA_MIDIA = 220
+ALTURA_CONTROLE = 44
+
+TITULOS = {'h1', 'h2', 'h3'}
+INLINE = {'a', 'span', 'strong', 'em', 'b', 'i', 'small', 'label', 'abbr', 'code', 'sup', 'sub', 'br'}
+MIDIA = {'img', 'video', 'iframe', 'canvas', 'svg'}
+CONTROLES = {'input', 'select', 'textarea', 'button'}
+NAO_RENDERIZADOS = {'head', 'script', 'style', 'noscript', 'template', 'link', 'meta', 'title'}
+
+_LINK_CSS = re.compile(r'''<link\b[^>]*\brel=["']stylesheet["'][^>]*>''')
+_HREF = re.compile(r'''\bhref=["']([^"']+)["']''')
+_URL = re.compile(r'''url\(\s*(["']?)([^"')]+)\1\s*\)''')
+_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_ESCONDIDO = re.compile(r'display\s*:\s*none')
+
+_coleta = ContextVar('css_critico_coleta', default=None)
+_cache = {'modificado': None, 'dados': {}}
+
+
+# ========================================
+# NA RENDERIZAÇÃO ({% estilos %})
+# ========================================
+
+def arquivo():
+    return Path(settings.CSS_CRITICO_ARQUIVO)
+
+
+def _dados():
+    """Conteúdo do arquivo gerado, relido só quando ele muda"""
+    try:
+        modificado = os.stat(arquivo()).st_mtime_ns
+    except OSError:
+        return {}
+    if _cache['modificado'] != modificado:
+        try:
+            _cache['dados'] = json.loads(arquivo().read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            _cache['dados'] = {}
+        _cache['modificado'] = modificado
+    return _cache['dados']
+
+
+def folhas_locais(html):
+    """hrefs dos <link rel="stylesheet"> servidos pelo próprio site, em ordem"""
+    hrefs = (_HREF.search(link) for link in _LINK_CSS.findall(html))
+    return [href.group(1) for href in hrefs if href and href.group(1).startswith(settings.STATIC_URL)]
+
+
+@contextmanager
+def coletando():
+    """Renderização para o comando css_critico: o {% estilos %} anota (template, folhas) e não altera nada"""
+    coleta = []
+    token = _coleta.set(coleta)
+    try:
+        yield coleta
+    finally:
+        _coleta.reset(token)
+
+
+def aplicar(html, pagina):
+    """HTML do bloco {% estilos %} com o CSS crítico do template inline e os links sem bloquear"""
+    folhas = folhas_locais(html)
+    coleta = _coleta.get()
+    if coleta is not None:
+        coleta.append((pagina, folhas))
+        return html
+
+    critico = _dados().get(pagina)
+    if not critico or critico['folhas'] != folhas:
+        return html
+
+    def adiar(link):
+        href = _HREF.search(link.group(0))
+        if not href or href.group(1) not in folhas:
+            return link.group(0)
+        return (
+            f'''<link rel="preload" href="{href.group(1)}" as="style" onload="this.onload=null;this.rel='stylesheet'">'''
+            f'<noscript>{link.group(0)}</noscript>'
+        )
+
+    return f"<style>{critico['css']}</style>\n" + _LINK_CSS.sub(adiar, html)
+
+
+# ========================================
+# PRIMEIRA TELA
+# ========================================
+
+def _altura(elemento):
+    """Altura aproximada (px) que o próprio elemento ocupa, sem os filhos"""
+    altura = 0
+    texto = ' '.join(' '.join(filter(None, [elemento.text, *(filho.tail for filho in elemento)])).split())
+    if texto:
+        linhas = len(texto) / CARACTERES_POR_LINHA
+        if elemento.tag not in INLINE:
+            linhas = math.ceil(linhas)
+        altura += linhas * ALTURA_LINHA * (1.6 if elemento.tag in TITULOS else 1)
+    if elemento.tag in MIDIA:
+        largura, alta = elemento.get('width', ''), elemento.get('height', '')
+        if largura.isdigit() and alta.isdigit() and int(largura):
+            altura += int(alta) * min(1, LARGURA_TELA / int(largura))
+        else:
+            altura += ALTURA_LINHA if elemento.tag == 'svg' else ALTURA_MIDIA
+    elif elemento.tag in CONTROLES and elemento.get('type') != 'hidden':
+        altura += ALTURA_CONTROLE
+    return altura
+
+
+def acima_da_dobra(html, dobra=ALTURA_DOBRA):
+    """Elementos (cssselect2) da primeira tela, em ordem, com html/body e os ancestrais"""
+    raiz = cssselect2.ElementWrapper.from_html_root(html5lib.parse(html, namespaceHTMLElements=False))
+    elementos, escondidos = [], set()
+    altura = 0
+    for elemento in raiz.iter_subtree():
+        no = elemento.etree_element
+        if (
+            (elemento.parent is not None and elemento.parent.etree_element in escondidos)
+            or no.tag in NAO_RENDERIZADOS or not isinstance(no.tag, str)
+            or no.get('hidden') is not None or _ESCONDIDO.search(no.get('style', ''))
+        ):
+            escondidos.add(no)
+            continue
+        if altura >= dobra:
+            break
+        elementos.append(elemento)
+        altura += _altura(no)
+    return elementos
+
+
+# ========================================
+# EXTRAÇÃO
+# ========================================
+
+def ler_folha(href):
+    """Conteúdo de um CSS do site pela URL (a cópia com hash do collectstatic ou o arquivo do app)"""
+    nome = href[len(settings.STATIC_URL):].split('?')[0]
+    if staticfiles_storage.exists(nome):
+        with staticfiles_storage.open(nome) as css:
+            return css.read().decode('utf-8')
+    caminho = finders.find(nome)
+    if caminho is None:
+        raise FileNotFoundError(nome)
+    return Path(caminho).read_text(encoding='utf-8')
+
+
+def _casa(prelude, elementos):
+    try:
+        seletores = cssselect2.compile_selector_list(prelude)
+    except cssselect2.SelectorError:
+        # Seletor que o cssselect2 não entende (::-webkit-...): fica, por garantia
+        return True
+    # :hover/:focus nunca casam, então regras de interação ficam para o arquivo completo
+    return any(seletor.test(elemento) for seletor in seletores for elemento in elementos)
+
+
+def _filtrar(regras, elementos, extras):
+    """Regras que valem para algum elemento; @font-face e @keyframes vão para `extras` e são decididas no fim"""
+    saida = []
+    for regra in regras:
+        if regra.type == 'qualified-rule':
+            if _casa(regra.prelude, elementos):
+                saida.append(regra.serialize())
+        elif regra.type == 'at-rule' and regra.content is not None:
+            nome = regra.lower_at_keyword
+            if nome in ('media', 'supports'):
+                internas = _filtrar(
+                    tinycss2.parse_rule_list(regra.content, skip_comments=True, skip_whitespace=True), elementos, extras
+                )
+                if internas:
+                    saida.append(f"@{nome} {tinycss2.serialize(regra.prelude).strip()}{{{''.join(internas)}}}")
+            elif nome == 'font-face' or nome.endswith('keyframes'):
+                extras.append(regra)
+        # @import (a fonte do Google já está no <head>) e @charset ficam só no arquivo completo
+    return saida
+
+
+def _nome_extra(regra):
+    """font-family de um @font-face ou nome de um @keyframes"""
+    if regra.lower_at_keyword != 'font-face':
+        return tinycss2.serialize(regra.prelude).strip()
+    for declaracao in tinycss2.parse_declaration_list(regra.content, skip_comments=True, skip_whitespace=True):
+        if declaracao.type == 'declaration' and declaracao.lower_name == 'font-family':
+            return tinycss2.serialize(declaracao.value).strip().strip('"\'')
+    return None
+
+
+def _absolutizar(css, href):
+    """url() relativas ao arquivo de CSS passam a valer dentro do HTML"""
+    def trocar(achado):
+        destino = achado.group(2).strip()
+        if destino.startswith(('data:', '#', '/')) or '://' in destino:
+            return achado.group(0)
+        return f'url("{urljoin(href, destino)}")'
+    return _URL.sub(trocar, css)
+
+
+def _compactar(css):
+    partes = _STRING.split(css)
+    for i, parte in enumerate(partes):
+        if i % 2:
+            # O tinycss2 devolve content:"\e000" como o caractere; volta a ser escape ASCII
+            partes[i] = re.sub(r'[^\x00-\x7f]', lambda c: f'\\{ord(c.group(0)):x} ', parte)
+        else:
+            parte = re.sub(r'\s*([{};,])\s*', r'\1', re.sub(r'\s+', ' ', parte))
+            partes[i] = re.sub(r':\s+', ':', parte).replace(';}', '}')
+    return ''.join(partes).strip()
+
+
+def css_critico(folhas, html, dobra=ALTURA_DOBRA):
+    """CSS das `folhas` (hrefs, na ordem da página) que vale para a primeira tela do `html`"""
+    elementos = acima_da_dobra(html, dobra)
+    partes, extras = [], []
+    for href in folhas:
+        regras = tinycss2.parse_stylesheet(ler_folha(href), skip_comments=True, skip_whitespace=True)
+        da_folha = []
+        partes += [_absolutizar(regra, href) for regra in _filtrar(regras, elementos, da_folha)]
+        extras += [(regra, href) for regra in da_folha]
+    usado = ''.join(partes)
+    # Fontes e animações só se alguma regra crítica usa
+    incluidos = []
+    for regra, href in extras:
+        nome = _nome_extra(regra)
+        if nome and nome in usado:
+            incluidos.append(_absolutizar(regra.serialize(), href))
+    css = _compactar(''.join(incluidos) + usado)
+    # Um "</style>" dentro de um valor fecharia a tag antes da hora
+    return css.replace('</', '<\\/')
+
+
+def urls_representativas():
+    """Uma URL por template público; o detalhe usa a notícia mais recente"""
+    urls = ['/', '/noticias/', '/workshops/', '/voluntariado/', '/contato/', '/doacao/']
+    publicadas = ids_publicadas()
+    if publicadas:
+        urls.insert(2, f'/noticia/{publicadas[0]}/')
+    return urls
+
+
+def gravar(dados):
+    """Escrita atômica: páginas renderizadas no meio da troca leem o arquivo antigo ou o novo"""
+    destino = arquivo()
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=destino.parent, prefix='.tmp-')
+    with os.fdopen(descritor, 'w', encoding='utf-8') as saida:
+        json.dump(dados, saida, ensure_ascii=False)
+    os.chmod(temporario, 0o644)
+    os.replace(temporario, destino)
@@ -0,0 +1,195 @@
+import re
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .imagens import url_imagem
+
+
+# Marcador substituído pelo token de cada inscrito depois da renderização
+MARCADOR_TOKEN = '__TOKEN_INSCRITO__'
+
+ELEMENTOS_VAZIOS = {'area', 'base', 'br', 'col', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'}
+
+
+# ========================================
+# CSS INLINE
+# ========================================
+
+def _parse_css(css):
+    """Converte o CSS em uma lista de (especificidade, ordem, seletor, declarações)"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    regras = []
+    for ordem, (seletores, corpo) in enumerate(re.findall(r'([^{}]+)\{([^{}]*)\}', css)):
+        declaracoes = ' '.join(corpo.split()).strip().rstrip(';')
+        for seletor in seletores.split(','):
+            partes = seletor.split()
+            if not partes:
+                continue
+            compostos = [_parse_composto(p) for p in partes]
+            classes = sum(len(c) for _, c in compostos)
+            tags = sum(1 for t, _ in compostos if t)
+            regras.append(((classes, tags), ordem, compostos, declaracoes))
+    regras.sort(key=lambda r: (r[0], r[1]))
+    return regras
+
+
+def _parse_composto(seletor):
+    """'p.subtitle' -> ('p', {'subtitle'})"""
+    tag, *classes = seletor.split('.')
+    return tag.lower(), set(classes)
+
+
+def _casa(composto, elemento):
+    tag, classes = composto
+    elemento_tag, elemento_classes = elemento
+    return (not tag or tag == elemento_tag) and classes <= elemento_classes
+
+
+def _seletor_casa(compostos, pilha):
+    """Verifica seletores simples com combinador descendente contra a pilha de ancestrais"""
+    if not _casa(compostos[-1], pilha[-1]):
+        return False
+    restantes = compostos[:-1]
+    ancestrais = pilha[:-1]
+    while restantes and ancestrais:
+        if _casa(restantes[-1], ancestrais[-1]):
+            restantes = restantes[:-1]
+        ancestrais = ancestrais[:-1]
+    return not restantes
+
+
+class _InlinerCSS(HTMLParser):
+    """Move as regras dos blocos <style> para o atributo style de cada elemento"""
+
+    def __init__(self, regras):
+        super().__init__(convert_charrefs=False)
+        self.regras = regras
+        self.pilha = []
+        self.saida = []
+        self.dentro_style = False
+
+    def _abre(self, tag, attrs, fecha):
+        attrs = dict(attrs)
+        elemento = (tag, set((attrs.get('class') or '').split()))
+        pilha = self.pilha + [elemento]
+
+        estilos = [d for _, _, compostos, d in self.regras if d and _seletor_casa(compostos, pilha)]
+        if attrs.get('style'):
+            estilos.append(attrs['style'].strip().rstrip(';'))
+        if estilos:
+            attrs['style'] = '; '.join(estilos) + ';'
+
+        texto = ''.join(
+            f' {nome}' if valor is None else f' {nome}="{escape(valor, quote=True)}"'
+            for nome, valor in attrs.items()
+        )
+        self.saida.append(f"<{tag}{texto}{' /' if fecha else ''}>")
+
+        if not fecha and tag not in ELEMENTOS_VAZIOS:
+            self.pilha.append(elemento)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'style':
+            self.dentro_style = True
+            return
+        self._abre(tag, attrs, fecha=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._abre(tag, attrs, fecha=True)
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self.dentro_style = False
+            return
+        self.saida.append(f'</{tag}>')
+        for i in range(len(self.pilha) - 1, -1, -1):
+            if self.pilha[i][0] == tag:
+                del self.pilha[i:]
+                break
+
+    def handle_data(self, data):
+        if not self.dentro_style:
+            self.saida.append(data)
+
+    def handle_entityref(self, name):
+        self.saida.append(f'&{name};')
+
+    def handle_charref(self, name):
+        self.saida.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        self.saida.append(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self.saida.append(f'<!{decl}>')
+
+
+def inline_css(html):
+    """Aplica os blocos <style> do documento como estilos inline e remove os blocos"""
+    css = '\n'.join(re.findall(r'<style[^>]*>(.*?)</style>', html, flags=re.S | re.I))
+    parser = _InlinerCSS(_parse_css(css))
+    parser.feed(html)
+    parser.close()
+    return ''.join(parser.saida)
+
+
+# ========================================
+# EMAILS PRÉ-COMPILADOS
+# ========================================
+
+class EmailPreCompilado:
+    """
+    Email renderizado uma única vez. Apenas o token do inscrito varia entre
+    destinatários, então cada envio é só uma junção de strings.
+    """
+
+    def __init__(self, assunto, html, texto):
+        self.assunto = assunto
+        self.partes_html = html.split(MARCADOR_TOKEN)
+        self.partes_texto = texto.split(MARCADOR_TOKEN)
+
+    def renderizar(self, token=''):
+        """Retorna (html, texto) para um destinatário"""
+        return token.join(self.partes_html), token.join(self.partes_texto)
+
+    def mensagem(self, email, token='', connection=None):
+        html, texto = self.renderizar(token)
+        msg = EmailMultiAlternatives(self.assunto, texto, settings.DEFAULT_FROM_EMAIL, [email], connection=connection)
+        msg.attach_alternative(html, "text/html")
+        return msg
+
+
+def compilar_email(template, assunto, contexto):
+    """Renderiza o par .html/.txt de um template de email e faz o inline do CSS"""
+    contexto = {'site_url': settings.SITE_URL, **contexto}
+    html = inline_css(render_to_string(f'home/emails/{template}.html', contexto))
+    texto = render_to_string(f'home/emails/{template}.txt', contexto).strip()
+    return EmailPreCompilado(assunto, html, texto)
+
+
+def email_nova_noticia(noticia):
+    """Compila a newsletter de uma notícia (uma vez por campanha)"""
+    # Versão JPEG em largura de email (clientes de email não mostram WebP)
+    imagem_url = url_imagem(noticia)
+    if imagem_url:
+        if imagem_url.startswith('/'):
+            imagem_url = f"{settings.SITE_URL}{imagem_url}"
+
+    return compilar_email('nova_noticia', f'📰 Nova Notícia: {noticia.titulo}', {
+        'noticia': noticia,
+        'imagem_url': imagem_url,
+        'noticia_url': settings.SITE_URL + reverse('noticia_detalhe', args=[noticia.id]),
+        'cancelar_url': settings.SITE_URL + reverse('cancelar_newsletter', args=[MARCADOR_TOKEN]),
+    })
+
+
+@lru_cache(maxsize=1)
+def email_boas_vindas():
+    """Email de boas-vindas, idêntico para todos os inscritos"""
+    return compilar_email('boas_vindas', '🎉 Bem-vindo à Newsletter do Instituto Mulheres do Sul Global!', {})
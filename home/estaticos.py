@@ -0,0 +1,66 @@
+import logging
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+# Sem dependências de models/cloudinary: o storage é carregado pelo
+# collectstatic e a cada {% static %}, antes de qualquer outra parte do app
+logger = logging.getLogger(__name__)
+
+
+class EstaticosComHash(CompressedManifestStaticFilesStorage):
+    """
+    collectstatic grava cada arquivo com o hash do conteúdo no nome
+    (style.3f2a9c1b0d4e.css) mais as versões .gz/.br, que o WhiteNoise serve
+    com Cache-Control immutable. Referências a arquivos que não existem
+    (workshop-placeholder.jpg) ficam com o nome sem hash em vez de derrubar
+    o build ou a renderização.
+    """
+
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._avisados = set()
+        # Durante o post_process: nomes sem hash, conferidos só no fim
+        self._sem_hash = None
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if self._sem_hash is not None:
+                self._sem_hash.add(name)
+            else:
+                self._avisar(name)
+            return name
+
+    def post_process(self, *args, **kwargs):
+        # Numa passada, um CSS pode referenciar outro que ainda não foi
+        # gravado (forms.css -> widgets.css com --clear): só avisa dos que
+        # continuam sem hash depois de todas as passadas
+        self._sem_hash = set()
+        try:
+            yield from super().post_process(*args, **kwargs)
+            sem_hash = self._sem_hash
+        finally:
+            self._sem_hash = None
+        for name in sorted(sem_hash):
+            if self.hash_key(self.clean_name(name)) not in self.hashed_files:
+                self._avisar(name)
+
+    def _avisar(self, name):
+        if name not in self._avisados:
+            self._avisados.add(name)
+            logger.warning("⚠️ Estático não encontrado, servido sem hash: %s", name)
+
+    def compress_files(self, names):
+        # O collectstatic do cloudinary_storage (que substitui o do Django) só
+        # grava as cópias com hash; as originais não existem para comprimir
+        return super().compress_files([name for name in names if self.exists(name)])
+
+    def stored_name(self, name):
+        # Sem manifesto (collectstatic não rodou) as URLs ficam sem hash, apontando para arquivos que existem
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
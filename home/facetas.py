@@ -0,0 +1,59 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .cache import em_cache_noticias
+from .models import Noticia
+
+
+MESES = [
+    (1, 'Janeiro'), (2, 'Fevereiro'), (3, 'Março'),
+    (4, 'Abril'), (5, 'Maio'), (6, 'Junho'),
+    (7, 'Julho'), (8, 'Agosto'), (9, 'Setembro'),
+    (10, 'Outubro'), (11, 'Novembro'), (12, 'Dezembro')
+]
+
+
+def _calcular_facetas():
+    """Um único GROUP BY (categoria, ano, mês) sobre as notícias publicadas"""
+    linhas = (
+        Noticia.objects.publicadas()
+        .annotate(ano=ExtractYear('data_publicacao'), mes=ExtractMonth('data_publicacao'))
+        .order_by()
+        .values('categoria', 'ano', 'mes')
+        .annotate(total=Count('id'))
+    )
+
+    por_categoria = Counter()
+    por_ano = Counter()
+    por_mes = defaultdict(Counter)
+    for linha in linhas:
+        por_categoria[linha['categoria']] += linha['total']
+        por_ano[linha['ano']] += linha['total']
+        por_mes[linha['ano']][linha['mes']] += linha['total']
+
+    facetas = {
+        'categorias': [(valor, nome, por_categoria[valor]) for valor, nome in Noticia.CATEGORIA_CHOICES],
+        'anos': sorted(por_ano.items(), reverse=True),
+        'meses': {ano: dict(meses) for ano, meses in por_mes.items()},
+        'total': sum(por_categoria.values()),
+    }
+    return facetas, Noticia.objects.proxima_publicacao()
+
+
+def facetas_noticias():
+    """
+    Contagens por categoria, ano e ano/mês das notícias publicadas. Ficam em
+    cache até a próxima alteração de notícia ou a próxima publicação agendada.
+    """
+    return em_cache_noticias('facetas', _calcular_facetas)
+
+
+def meses_com_contagem(facetas, ano):
+    """[(numero, nome, total)] do ano selecionado; sem ano, total 0 em todos"""
+    try:
+        contagens = facetas['meses'].get(int(ano), {}) if ano else {}
+    except ValueError:
+        contagens = {}
+    return [(numero, nome, contagens.get(numero, 0)) for numero, nome in MESES]
@@ -0,0 +1,224 @@
+import io
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+
+# ========================================
+# ÍCONES
+# ========================================
+# Os templates usam Bootstrap Icons (bi bi-*) e Font Awesome Free (fas/far/
+# fab fa-*), mas só algumas dezenas de ícones. Em vez das folhas completas
+# (e do kit) vindas de três CDNs, o comando gerar_icones procura nos
+# templates as classes usadas e grava em home/static/home/icones/ uma fonte
+# WOFF2 só com esses glifos e o CSS que aponta cada classe para o seu
+# código. Os dois arquivos ficam no repositório; no build, gerar_icones
+# --verificar (sem fontTools) falha se algum template usa um ícone que não
+# está no CSS gerado.
+#
+# Família de cada ícone: 'bi' ou o estilo do Font Awesome ('solid',
+# 'regular', 'brands'). O mesmo nome pode existir em mais de um estilo
+# (far fa-clock e fas fa-clock são glifos diferentes).
+
+PASTA_ICONES = Path(__file__).resolve().parent / 'static' / 'home' / 'icones'
+NOME_FONTE = 'icones'
+UNIDADES_EM = 1000
+PRIMEIRO_CODIGO = 0xE000  # Área de uso privado
+
+# Classe de estilo do Font Awesome -> família; sem estilo o FA 6 usa o solid
+ESTILOS_FA = {
+    'fas': 'solid', 'fa-solid': 'solid', 'fa': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+FAMILIAS_FA = ('solid', 'regular', 'brands')
+
+# Classes fa-* que não são ícones (tamanho, animação, listas...)
+_UTILITARIO_FA = re.compile(
+    r'fa-(?:\d*x|2?xs|sm|lg|2?xl|fw|border|inverse|ul|li|stack(?:-[12]x)?|pull-(?:left|right|start|end)'
+    r'|spin(?:-pulse|-reverse)?|pulse|beat(?:-fade)?|bounce|fade|shake|flip(?:-horizontal|-vertical|-both)?'
+    r'|rotate-(?:90|180|270|by)|width-auto|classic|sharp)'
+)
+
+_CLASSE = re.compile(r'''\bclass\s*=\s*(["'])(.*?)\1''', re.S)
+# bi-{% if %}check-circle-fill{% elif %}x-circle-fill{% endif %}: um ícone por ramo
+_PREFIXO_COM_TAG = re.compile(r'\b(bi|fa)-((?:\{%.*?%\}[\w-]*)+)', re.S)
+_TAG = re.compile(r'\{%.*?%\}|\{\{.*?\}\}|\{#.*?#\}', re.S)
+_REGRA_CSS = re.compile(r'([^{}]+)\{[^{}]*?content:\s*"\\([0-9a-fA-F]+)"', re.S)
+_SELETOR_ICONE = re.compile(r'^((?:\.[\w-]+)*?)\.(bi|fa)-([\w-]+)::?before$')
+
+
+# ========================================
+# ÍCONES USADOS NOS TEMPLATES
+# ========================================
+
+def pastas_templates():
+    """Pastas de templates do projeto (fora do site-packages)"""
+    base = Path(settings.BASE_DIR).resolve()
+    pastas = [Path(p) for config in settings.TEMPLATES for p in config.get('DIRS', [])]
+    pastas += [Path(p) for p in get_app_template_dirs('templates')]
+    return [p for p in dict.fromkeys(p.resolve() for p in pastas) if p.is_dir() and base in p.parents]
+
+
+def _icones_da_classe(valor):
+    """(família, nome) das classes de um atributo class (com ou sem tags do Django)"""
+    nomes = []
+    for prefixo, ramos in _PREFIXO_COM_TAG.findall(valor):
+        nomes += [f'{prefixo}-{nome}' for nome in re.findall(r'%\}([\w-]+)', ramos)]
+    classes = _TAG.sub(' ', _PREFIXO_COM_TAG.sub(' ', valor)).split()
+    nomes += [c for c in classes if c.startswith(('bi-', 'fa-'))]
+
+    estilo = next((ESTILOS_FA[c] for c in classes if c in ESTILOS_FA and c != 'fa'), 'solid')
+    for classe in nomes:
+        if classe.startswith('bi-'):
+            yield 'bi', classe[3:]
+        elif classe not in ESTILOS_FA and not _UTILITARIO_FA.fullmatch(classe):
+            yield estilo, classe[3:]
+
+
+def icones_usados(pastas=None):
+    """{(família, nome): [templates que usam]}"""
+    usados = defaultdict(list)
+    for pasta in pastas or pastas_templates():
+        for arquivo in sorted(pasta.rglob('*.html')):
+            texto = arquivo.read_text(encoding='utf-8')
+            for _, valor in _CLASSE.findall(texto):
+                for icone in _icones_da_classe(valor):
+                    if str(arquivo.relative_to(pasta)) not in usados[icone]:
+                        usados[icone].append(str(arquivo.relative_to(pasta)))
+    return dict(usados)
+
+
+# ========================================
+# CSS
+# ========================================
+
+def ler_css(texto):
+    """
+    {(família, nome): código} das regras `.x-nome::before {content: "\\f017"}`.
+    Nas folhas do Font Awesome as regras não dizem o estilo (família None);
+    no CSS gerado o estilo vem na classe antes do ícone (.far.fa-clock).
+    """
+    codigos = {}
+    for seletores, codigo in _REGRA_CSS.findall(texto):
+        for seletor in seletores.split(','):
+            achado = _SELETOR_ICONE.match(seletor.strip())
+            if not achado:
+                continue
+            estilos, prefixo, nome = achado.groups()
+            if prefixo == 'bi':
+                familia = 'bi'
+            else:
+                estilo = next((c for c in estilos.split('.') if c in ESTILOS_FA), None)
+                familia = ESTILOS_FA[estilo] if estilo else None
+            codigos.setdefault((familia, nome), int(codigo, 16))
+    return codigos
+
+
+def icones_no_pacote(pasta=PASTA_ICONES):
+    caminho = Path(pasta) / f'{NOME_FONTE}.css'
+    if not caminho.exists():
+        return {}
+    codigos = ler_css(caminho.read_text(encoding='utf-8'))
+    # Regras sem estilo no CSS gerado são do solid, o padrão do FA 6
+    return {(familia or 'solid', nome): codigo for (familia, nome), codigo in codigos.items()}
+
+
+def faltando(usados, pasta=PASTA_ICONES):
+    no_pacote = icones_no_pacote(pasta)
+    return {icone: templates for icone, templates in usados.items() if icone not in no_pacote}
+
+
+def _seletores(familia, nome):
+    if familia == 'bi':
+        return f'.bi-{nome}::before'
+    if familia == 'solid':
+        return f'.fa-{nome}::before'
+    classes = [c for c, f in ESTILOS_FA.items() if f == familia]
+    return ','.join(f'.{c}.fa-{nome}::before' for c in classes)
+
+
+def gerar_css(codigos, creditos=()):
+    """CSS do pacote: @font-face, regras base das classes bi/fa e um ::before por ícone"""
+    estilos_fa = ','.join(f'.{c}' for c in ESTILOS_FA)
+    base = (
+        'display:inline-block;font-family:"{0}"!important;font-style:normal;font-weight:normal!important;'
+        'font-variant:normal;text-transform:none;line-height:1;text-rendering:auto;'
+        '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale'
+    ).format(NOME_FONTE)
+    linhas = ['/*! Gerado por `python manage.py gerar_icones`: não editar à mão.']
+    linhas += [f' * {credito}' for credito in creditos]
+    linhas += [' */']
+    linhas.append(
+        f'@font-face{{font-family:"{NOME_FONTE}";src:url("{NOME_FONTE}.woff2") format("woff2");font-display:block}}'
+    )
+    linhas.append(f'{estilos_fa}{{{base}}}')
+    linhas.append(f'.bi::before,[class^="bi-"]::before,[class*=" bi-"]::before{{{base};vertical-align:-.125em}}')
+    for (familia, nome), codigo in sorted(codigos.items(), key=lambda item: (item[0][0] != 'bi', item[0])):
+        linhas.append(f'{_seletores(familia, nome)}{{content:"\\{codigo:x}"}}')
+    return '\n'.join(linhas) + '\n'
+
+
+# ========================================
+# FONTE
+# ========================================
+
+def gerar_fonte(glifos):
+    """
+    WOFF2 com os glifos pedidos, copiados das fontes de origem e levados para
+    UNIDADES_EM (Font Awesome usa 512, Bootstrap Icons 300).
+
+    glifos: [(código novo, caminho da fonte de origem, código na origem)]
+    Precisa do fontTools (e do brotli para o WOFF2), só na máquina de quem gera.
+    """
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.cu2quPen import Cu2QuPen
+    from fontTools.pens.transformPen import TransformPen
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTFont
+
+    fontes = {}
+    ordem = ['.notdef']
+    mapa = {}
+    desenhos = {'.notdef': TTGlyphPen(None).glyph()}
+    larguras = {'.notdef': UNIDADES_EM}
+    ascendente, descendente = 0, 0
+
+    for codigo, caminho, codigo_origem in glifos:
+        if caminho not in fontes:
+            fontes[caminho] = TTFont(caminho)
+        fonte = fontes[caminho]
+        escala = UNIDADES_EM / fonte['head'].unitsPerEm
+        ascendente = max(ascendente, round(fonte['hhea'].ascent * escala))
+        descendente = min(descendente, round(fonte['hhea'].descent * escala))
+
+        origem = fonte.getBestCmap().get(codigo_origem)
+        if origem is None:
+            raise ValueError(f'{Path(caminho).name} não tem o código {codigo_origem:x}')
+        nome = f'u{codigo:04X}'
+        caneta = TTGlyphPen(None)
+        fonte.getGlyphSet()[origem].draw(TransformPen(Cu2QuPen(caneta, max_err=1), (escala, 0, 0, escala, 0, 0)))
+        desenhos[nome] = caneta.glyph()
+        larguras[nome] = round(fonte['hmtx'][origem][0] * escala)
+        ordem.append(nome)
+        mapa[codigo] = nome
+
+    construtor = FontBuilder(UNIDADES_EM, isTTF=True)
+    construtor.setupGlyphOrder(ordem)
+    construtor.setupCharacterMap(mapa)
+    construtor.setupGlyf(desenhos)
+    glyf = construtor.font['glyf']
+    construtor.setupHorizontalMetrics({nome: (larguras[nome], getattr(glyf[nome], 'xMin', 0)) for nome in ordem})
+    construtor.setupHorizontalHeader(ascent=ascendente, descent=descendente)
+    construtor.setupNameTable({'familyName': NOME_FONTE, 'styleName': 'Regular'})
+    construtor.setupOS2(
+        sTypoAscender=ascendente, sTypoDescender=descendente, usWinAscent=ascendente, usWinDescent=-descendente,
+    )
+    construtor.setupPost()
+    construtor.font.flavor = 'woff2'
+    saida = io.BytesIO()
+    construtor.font.save(saida)
+    return saida.getvalue()
@@ -0,0 +1,210 @@
+import base64
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps
+
+
+# ========================================
+# IMAGENS RESPONSIVAS
+# ========================================
+# Os editores sobem fotos em tamanho cheio em Noticia.imagem e
+# Workshop.imagem. No upload o original é limitado a LARGURA_MAXIMA e são
+# geradas versões WebP e JPEG nas LARGURAS abaixo, mais um placeholder
+# borrado de poucos bytes que aparece enquanto a imagem carrega. Os nomes
+# ficam em imagem_derivadas e o template tag imagem_responsiva monta o
+# <picture> com srcset. Tudo passa pelo storage do campo, então vale tanto
+# para MEDIA_ROOT local quanto para o Cloudinary.
+#
+# As derivadas ficam em <pasta do upload>/derivadas/. O storage grava cada
+# conteúdo uma vez (home.armazenamento): reprocessar o mesmo arquivo não
+# grava nada de novo.
+
+LARGURA_MAXIMA = 2000
+LARGURAS = (320, 640, 960, 1280, 1920)
+
+# extensão: (formato do Pillow, opções de gravação)
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 78, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+# Formatos do original que são regravados quando passam do limite (GIF animado fica como está)
+FORMATOS_ORIGINAL = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85, 'method': 4},
+}
+
+LARGURA_PLACEHOLDER = 16
+PASTA_DERIVADAS = 'derivadas'
+
+# Largura usada no src do <img> (navegadores sem srcset) e nos emails
+LARGURA_PADRAO = 640
+
+
+def _tem_transparencia(imagem):
+    return imagem.mode in ('RGBA', 'LA', 'PA') or (imagem.mode == 'P' and 'transparency' in imagem.info)
+
+
+def _codificar(imagem, formato, opcoes):
+    if formato == 'JPEG' and imagem.mode != 'RGB':
+        # JPEG não tem canal alfa: transparência vira fundo branco
+        fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel('A') if imagem.mode == 'RGBA' else None)
+        imagem = fundo
+    saida = io.BytesIO()
+    imagem.save(saida, formato, **opcoes)
+    return saida.getvalue()
+
+
+def _redimensionar(imagem, largura):
+    altura = max(1, round(imagem.height * largura / imagem.width))
+    return imagem.resize((largura, altura), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def larguras_para(largura):
+    """Larguras das derivadas de um original com `largura` px (nunca amplia)"""
+    maior = min(largura, LARGURAS[-1])
+    return [w for w in LARGURAS if w < maior] + [maior]
+
+
+def processar_bytes(dados):
+    """
+    Só CPU, sem Django (roda nos processos do comando gerar_imagens). Retorna
+    o original limitado (ou None se ele já serve), as dimensões, as
+    derivadas [(extensao, largura, bytes)] e o placeholder.
+    """
+    with Image.open(io.BytesIO(dados)) as aberta:
+        formato = aberta.format
+        orientacao = aberta.getexif().get(0x0112, 1)
+        imagem = ImageOps.exif_transpose(aberta)
+    imagem = imagem.convert('RGBA' if _tem_transparencia(imagem) else 'RGB')
+
+    original = None
+    if formato in FORMATOS_ORIGINAL and (imagem.width > LARGURA_MAXIMA or orientacao != 1):
+        # Passou do limite ou depende do EXIF para ficar em pé: regrava já girado
+        if imagem.width > LARGURA_MAXIMA:
+            imagem = _redimensionar(imagem, LARGURA_MAXIMA)
+        original = _codificar(imagem, formato, FORMATOS_ORIGINAL[formato])
+
+    derivadas = []
+    atual = imagem
+    # Da maior para a menor, cada uma a partir da anterior (mais rápido que sempre do original)
+    for largura in reversed(larguras_para(imagem.width)):
+        if largura != atual.width:
+            atual = _redimensionar(atual, largura)
+        for extensao, (formato_derivada, opcoes) in FORMATOS.items():
+            derivadas.append((extensao, largura, _codificar(atual, formato_derivada, opcoes)))
+
+    miniatura = _redimensionar(atual, LARGURA_PLACEHOLDER).filter(ImageFilter.GaussianBlur(1))
+    placeholder = _codificar(miniatura, 'JPEG', {'quality': 40})
+
+    return {
+        'original': original,
+        'largura': imagem.width,
+        'altura': imagem.height,
+        'derivadas': derivadas,
+        'placeholder': 'data:image/jpeg;base64,' + base64.b64encode(placeholder).decode(),
+    }
+
+
+# ========================================
+# GRAVAÇÃO NO STORAGE
+# ========================================
+
+def ler_original(objeto):
+    arquivo = objeto.imagem
+    if not arquivo._committed:
+        # Upload ainda em memória/arquivo temporário
+        arquivo.seek(0)
+        return arquivo.read()
+    with arquivo.storage.open(arquivo.name, 'rb') as original:
+        return original.read()
+
+
+def aplicar(objeto, resultado, dados=None):
+    """
+    Grava no storage o original limitado e as derivadas e preenche os campos
+    de ImagemResponsiva (sem salvar o objeto). `dados` é o conteúdo de um
+    upload ainda não gravado, que passa a ser gravado aqui.
+    """
+    arquivo = objeto.imagem
+    conteudo = resultado['original'] if resultado['original'] is not None else dados
+    if conteudo is not None:
+        arquivo.save(posixpath.basename(arquivo.name), ContentFile(conteudo), save=False)
+
+    storage = arquivo.storage
+    pasta = posixpath.join(posixpath.dirname(arquivo.name), PASTA_DERIVADAS)
+    derivadas = {'original': arquivo.name}
+    for extensao, largura, dados_derivada in resultado['derivadas']:
+        # O nome final é o que o storage devolve (hash do conteúdo)
+        nome = storage.save(f'{pasta}/{largura}.{extensao}', ContentFile(dados_derivada))
+        derivadas.setdefault(extensao, []).append([largura, nome])
+    for lista in derivadas.values():
+        if isinstance(lista, list):
+            lista.sort()
+
+    objeto.imagem_largura = resultado['largura']
+    objeto.imagem_altura = resultado['altura']
+    objeto.imagem_derivadas = derivadas
+    objeto.imagem_placeholder = resultado['placeholder']
+
+
+def limpar(objeto):
+    objeto.imagem_largura = None
+    objeto.imagem_altura = None
+    objeto.imagem_derivadas = {}
+    objeto.imagem_placeholder = ''
+
+
+def processada(objeto):
+    """As derivadas guardadas são do arquivo atual"""
+    return bool(objeto.imagem) and objeto.imagem_derivadas.get('original') == objeto.imagem.name
+
+
+def preparar_upload(objeto):
+    """
+    pre_save de Noticia/Workshop: processa a imagem recém-enviada antes de a
+    linha ser gravada, então signals e caches seguintes já veem o srcset.
+    """
+    if not objeto.imagem:
+        if objeto.imagem_derivadas:
+            limpar(objeto)
+        return
+    if objeto.imagem._committed:
+        return
+    dados = ler_original(objeto)
+    try:
+        resultado = processar_bytes(dados)
+    except Exception as e:
+        # Arquivo que o Pillow não processa fica como veio, sem derivadas
+        print(f"❌ Erro ao gerar versões da imagem {objeto.imagem.name}: {e}")
+        limpar(objeto)
+        return
+    aplicar(objeto, resultado, dados)
+
+
+# ========================================
+# URLS
+# ========================================
+
+def versoes(objeto, extensao):
+    """[(largura, url)] das derivadas no formato `extensao`"""
+    storage = objeto.imagem.storage
+    return [(largura, storage.url(nome)) for largura, nome in objeto.imagem_derivadas.get(extensao, [])]
+
+
+def srcset(objeto, extensao):
+    return ', '.join(f'{url} {largura}w' for largura, url in versoes(objeto, extensao))
+
+
+def url_imagem(objeto, largura=LARGURA_PADRAO, extensao='jpg'):
+    """A menor derivada com pelo menos `largura` px (ou a maior que houver); sem derivadas, o original"""
+    if not objeto.imagem:
+        return ''
+    disponiveis = versoes(objeto, extensao) if processada(objeto) else []
+    if not disponiveis:
+        return objeto.imagem.url
+    return next((url for w, url in disponiveis if w >= largura), disponiveis[-1][1])
@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from home.busca import buscar_noticias, indexar_noticias
+from home.models import Noticia
+
+
+VOCABULARIO = (
+    'mulheres sul global formação liderança comunidade projeto parceria tecnologia educação saúde '
+    'direitos igualdade gênero evento oficina voluntariado conquista programa juventude cultura '
+    'empreendedorismo território rede encontro pesquisa política inclusão ciência arte cidadania '
+    'mobilização campanha capacitação diversidade desenvolvimento sustentável economia solidária'
+).split()
+
+BUSCAS = ['formação', 'liderança comunitária', 'tecnologias', 'economia solidária', 'cidadania juventude']
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência da busca de notícias (índice de texto x ILIKE) com N notícias sintéticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--noticias', type=int, default=100000)
+        parser.add_argument('--repeticoes', type=int, default=5)
+
+    def handle(self, *args, **options):
+        total = options['noticias']
+        aleatorio = random.Random(42)
+        # Palavras de preenchimento; as do VOCABULARIO aparecem em ~1% das posições,
+        # então cada busca casa com uma fração realista das notícias
+        preenchimento = [
+            ''.join(aleatorio.choice('abcdefghijlmnoprstuv') for _ in range(aleatorio.randint(4, 9)))
+            for _ in range(5000)
+        ]
+
+        def frase(n):
+            return ' '.join(
+                aleatorio.choice(VOCABULARIO) if aleatorio.random() < 0.01 else aleatorio.choice(preenchimento)
+                for _ in range(n)
+            )
+
+        # Tudo roda dentro de uma transação desfeita no final: o banco não fica com as notícias de teste
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            for inicio_lote in range(0, total, 2000):
+                lote = Noticia.objects.bulk_create([
+                    Noticia(
+                        titulo=frase(6),
+                        subtitulo=frase(10),
+                        slug=f'bench-busca-{i}',
+                        conteudo=frase(300),
+                        publicado=True,
+                    )
+                    for i in range(inicio_lote, min(inicio_lote + 2000, total))
+                ])
+                # bulk_create não dispara signals; no Postgres o trigger indexa sozinho
+                indexar_noticias(lote)
+            self.stdout.write(f"📥 {total} notícia(s) criadas e indexadas em {time.perf_counter() - inicio:.1f}s ({connection.vendor})\n")
+
+            publicadas = Noticia.objects.publicadas()
+            for busca in BUSCAS:
+                ilike = self._medir(options['repeticoes'], lambda: list(
+                    publicadas.filter(*[
+                        Q(titulo__icontains=p) | Q(subtitulo__icontains=p) | Q(conteudo__icontains=p)
+                        for p in busca.split()
+                    ]).order_by('-data_publicacao').values_list('id', flat=True)[:9]
+                ))
+                indice = self._medir(options['repeticoes'], lambda: list(
+                    buscar_noticias(publicadas, busca).order_by('-relevancia', '-data_publicacao')
+                    .values_list('id', flat=True)[:9]
+                ))
+                self.stdout.write(f"  {busca!r:<28} ILIKE {ilike:>9.1f} ms   índice {indice:>9.1f} ms")
+
+            transaction.set_rollback(True)
+
+    def _medir(self, repeticoes, consulta):
+        """Mediana em milissegundos"""
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            consulta()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tempos)
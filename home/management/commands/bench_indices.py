@@ -0,0 +1,210 @@
+import datetime
+import os
+import random
+import re
+import tempfile
+import uuid
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from home.models import (
+    CandidaturaVoluntariado,
+    InscricaoWorkshop,
+    NewsletterSubscriber,
+    Noticia,
+    VagaVoluntariado,
+    Workshop,
+)
+
+
+# Tabelas que crescem com o uso; um full scan nelas é regressão
+TABELAS_GRANDES = {
+    Noticia._meta.db_table,
+    Workshop._meta.db_table,
+    InscricaoWorkshop._meta.db_table,
+    VagaVoluntariado._meta.db_table,
+    CandidaturaVoluntariado._meta.db_table,
+    NewsletterSubscriber._meta.db_table,
+}
+
+
+class Command(BaseCommand):
+    help = 'Popula uma base grande, faz EXPLAIN de cada query das views públicas e falha se alguma fizer full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--noticias', type=int, default=20000)
+        parser.add_argument('--workshops', type=int, default=2000)
+        parser.add_argument('--inscricoes', type=int, default=20)
+        parser.add_argument('--vagas', type=int, default=1000)
+        parser.add_argument('--candidaturas', type=int, default=20)
+        parser.add_argument('--inscritos', type=int, default=50000)
+        parser.add_argument('--verbose-plans', action='store_true', help='Mostra o plano de todas as queries')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"EXPLAIN não suportado para '{connection.vendor}'")
+
+        regressoes = []
+        # A base de teste vive só nesta transação, desfeita no final
+        with transaction.atomic():
+            self._popular(options)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            cache.clear()
+
+            noticia = Noticia.objects.publicadas().order_by('-data_publicacao').first()
+            ano = noticia.data_publicacao.year
+            urls = [
+                '/',
+                '/noticias/',
+                '/noticias/?categoria=evento',
+                f'/noticias/?ano={ano}',
+                f'/noticias/?ano={ano}&mes={noticia.data_publicacao.month}',
+                '/noticias/?page=50',
+                f'/noticia/{noticia.id}/',
+                '/workshops/',
+                '/workshops/?status=disponivel',
+                '/voluntariado/',
+            ]
+
+            # Sem páginas pré-renderizadas nem cache de páginas: toda URL chega à view e ao banco
+            sem_prerender = os.path.join(tempfile.gettempdir(), f'bench-indices-{uuid.uuid4().hex}')
+            with override_settings(ALLOWED_HOSTS=['*'], PRERENDER_DIR=sem_prerender, CACHE_PAGINAS=False):
+                cliente = Client()
+                for url in urls:
+                    with CaptureQueriesContext(connection) as capturadas:
+                        resposta = cliente.get(url)
+                    if resposta.status_code != 200:
+                        raise CommandError(f"{url} respondeu {resposta.status_code}")
+
+                    self.stdout.write(f"🔎 {url} ({len(capturadas.captured_queries)} queries)")
+                    for query in capturadas.captured_queries:
+                        sql = query['sql']
+                        if not sql.lstrip().upper().startswith('SELECT'):
+                            continue
+                        plano, scans = self._explicar(sql)
+                        if options['verbose_plans'] or scans:
+                            self.stdout.write(f"    {sql[:160]}")
+                            for linha in plano:
+                                self.stdout.write(f"      {linha}")
+                        for tabela in scans:
+                            regressoes.append((url, tabela, sql))
+                            self.stdout.write(self.style.ERROR(f"    ❌ full scan em {tabela}"))
+
+            transaction.set_rollback(True)
+
+        if regressoes:
+            raise CommandError(f"{len(regressoes)} query(s) com full table scan em tabelas grandes")
+        self.stdout.write(self.style.SUCCESS(f"✅ Nenhum full table scan nas views públicas ({connection.vendor})"))
+
+    # ========================================
+    # EXPLAIN
+    # ========================================
+
+    def _explicar(self, sql):
+        """Retorna (linhas do plano, tabelas grandes lidas por inteiro)"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plano = [linha[3] for linha in cursor.fetchall()]
+                scans = []
+                for detalhe in plano:
+                    # "SCAN tabela" sem índice; "SCAN tabela USING INDEX" é varredura de índice
+                    encontrado = re.match(r'SCAN (\w+)(?: AS \w+)?$', detalhe)
+                    if encontrado and encontrado.group(1) in TABELAS_GRANDES:
+                        scans.append(encontrado.group(1))
+                return plano, scans
+
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            raiz = cursor.fetchone()[0][0]['Plan']
+            plano, scans = [], []
+            pendentes = [(raiz, 0)]
+            while pendentes:
+                no, nivel = pendentes.pop()
+                relacao = no.get('Relation Name', '')
+                plano.append(f"{'  ' * nivel}{no['Node Type']} {relacao} {no.get('Index Name', '')}".rstrip())
+                if no['Node Type'] == 'Seq Scan' and relacao in TABELAS_GRANDES:
+                    scans.append(relacao)
+                pendentes.extend((filho, nivel + 1) for filho in reversed(no.get('Plans', [])))
+            return plano, scans
+
+    # ========================================
+    # DADOS SINTÉTICOS
+    # ========================================
+
+    def _popular(self, options):
+        aleatorio = random.Random(7)
+        agora = timezone.now()
+        categorias = [valor for valor, _ in Noticia.CATEGORIA_CHOICES]
+
+        Noticia.objects.bulk_create([
+            Noticia(
+                titulo=f'Notícia {i}',
+                slug=f'bench-indices-{i}',
+                conteudo='Conteúdo ' * 50,
+                categoria=aleatorio.choice(categorias),
+                # ~90% publicadas, algumas agendadas para o futuro
+                publicado=aleatorio.random() < 0.9,
+                destaque=aleatorio.random() < 0.01,
+                data_publicacao=agora - datetime.timedelta(hours=aleatorio.randint(-200, 24 * 365 * 5)),
+            )
+            for i in range(options['noticias'])
+        ], batch_size=2000)
+
+        hoje = datetime.date.today()
+        workshops = Workshop.objects.bulk_create([
+            Workshop(
+                titulo=f'Workshop {i}',
+                descricao='Descrição',
+                data_inicio=hoje - datetime.timedelta(days=aleatorio.randint(-90, 1500)),
+                data_fim=hoje,
+                carga_horaria=8,
+                numero_encontros=4,
+                nivel='iniciante',
+                vagas_totais=options['inscricoes'] * 2,
+                # A maior parte do histórico já está encerrada
+                status=aleatorio.choices(['disponivel', 'em_breve', 'esgotado', 'encerrado'], [3, 2, 5, 90])[0],
+            )
+            for i in range(options['workshops'])
+        ], batch_size=2000)
+        InscricaoWorkshop.objects.bulk_create([
+            InscricaoWorkshop(
+                workshop=workshop, nome='Participante', email=f'{workshop.id}-{j}@exemplo.com',
+                telefone='0', experiencia='nenhuma',
+                status=aleatorio.choice(['pendente', 'confirmado', 'recusado']),
+            )
+            for workshop in workshops for j in range(options['inscricoes'])
+        ], batch_size=2000)
+
+        vagas = VagaVoluntariado.objects.bulk_create([
+            VagaVoluntariado(
+                titulo=f'Vaga {i}', descricao='Descrição', requisitos='Requisito',
+                tipo=VagaVoluntariado.TIPO_CHOICES[0][0], horas_semanais=4, duracao_minima='3 meses',
+                vagas_totais=options['candidaturas'] * 2, vagas_disponiveis=options['candidaturas'],
+                status=aleatorio.choices(['aberta', 'fechada', 'pausada'], [5, 90, 5])[0],
+            )
+            for i in range(options['vagas'])
+        ], batch_size=2000)
+        CandidaturaVoluntariado.objects.bulk_create([
+            CandidaturaVoluntariado(
+                vaga=vaga, nome='Candidata', email=f'{vaga.id}-{j}@exemplo.com', telefone='0', motivacao='Motivação',
+                status=aleatorio.choice(['pendente', 'em_analise', 'aprovado', 'recusado']),
+            )
+            for vaga in vagas for j in range(options['candidaturas'])
+        ], batch_size=2000)
+
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email=f'inscrito-{i}@exemplo.com', token=uuid.uuid4().hex, ativo=aleatorio.random() < 0.8)
+            for i in range(options['inscritos'])
+        ], batch_size=2000)
+
+        self.stdout.write(
+            f"📥 {options['noticias']} notícias, {options['workshops']} workshops, "
+            f"{options['workshops'] * options['inscricoes']} inscrições, {options['vagas']} vagas, "
+            f"{options['vagas'] * options['candidaturas']} candidaturas, {options['inscritos']} inscritos"
+        )
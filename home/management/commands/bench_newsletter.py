@@ -0,0 +1,115 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from home.emails import MARCADOR_TOKEN, email_nova_noticia
+from home.models import Noticia
+
+
+def _html_por_destinatario(noticia, token):
+    """Reprodução do f-string antigo de enviar_newsletter_nova_noticia (linha de base)"""
+    noticia_url = f"https://mulheresdosulglobal.com/noticias/{noticia.id}/"
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{ font-family: 'Arial', sans-serif; background-color: #f9fafb; margin: 0; padding: 0; }}
+            .container {{ max-width: 600px; margin: 0 auto; background: white; }}
+            .header {{ background: linear-gradient(135deg, #e6004c, #c7003f); padding: 40px 20px; text-align: center; }}
+            .header h1 {{ color: white; margin: 0; font-size: 28px; }}
+            .content {{ padding: 40px 30px; }}
+            .content h2 {{ color: #1a1a1a; font-size: 24px; margin-bottom: 15px; }}
+            .content .subtitle {{ color: #e6004c; font-size: 18px; font-weight: bold; margin-bottom: 20px; }}
+            .content p {{ color: #4c4c4c; line-height: 1.6; font-size: 16px; }}
+            .content img {{ max-width: 100%; height: auto; border-radius: 8px; margin: 20px 0; }}
+            .button {{ display: inline-block; background: #e6004c; color: white; padding: 15px 30px; 
+                      text-decoration: none; border-radius: 8px; margin: 20px 0; font-weight: bold; }}
+            .footer {{ background: #1f2937; color: #d1d5db; padding: 30px; text-align: center; font-size: 14px; }}
+            .unsubscribe {{ color: #9ca3af; font-size: 12px; margin-top: 20px; }}
+            .unsubscribe a {{ color: #60a5fa; text-decoration: none; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>📰 Nova Notícia Publicada!</h1>
+            </div>
+            <div class="content">
+                <h2>{noticia.titulo}</h2>
+                {f'<p class="subtitle">{noticia.subtitulo}</p>' if noticia.subtitulo else ''}
+                {f'<img src="https://mulheresdosulglobal.com{noticia.imagem.url}" alt="{noticia.titulo}">' if noticia.imagem else ''}
+                <p>{noticia.conteudo[:300]}...</p>
+                <a href="{noticia_url}" class="button">Ler Notícia Completa</a>
+            </div>
+            <div class="footer">
+                <p><strong>Instituto Mulheres do Sul Global</strong></p>
+                <p>Maricá, Rio de Janeiro, Brasil</p>
+                <p>contato@mulheresdosulglobal.com | +55 21 98355-1120</p>
+                <p class="unsubscribe">
+                    Não quer mais receber nossos emails? 
+                    <a href="https://mulheresdosulglobal.com/newsletter/cancelar/{token}/">Cancelar inscrição</a>
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    text_content = f"{noticia.titulo}\n\n{noticia.conteudo[:200]}...\n\nLeia mais em: {noticia_url}"
+    return html_content, text_content
+
+
+class Command(BaseCommand):
+    help = 'Compara o custo de renderização por destinatário da newsletter (antes x depois)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destinatarios', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        total = options['destinatarios']
+        tokens = [str(uuid.uuid4()) for _ in range(total)]
+        noticia = Noticia(
+            id=1,
+            titulo='Mulheres do Sul Global lançam novo programa de formação',
+            subtitulo='Inscrições abertas para a turma de 2026',
+            conteudo='Conteúdo da notícia com bastante texto. ' * 40,
+        )
+
+        resultados = []
+
+        inicio = time.perf_counter()
+        for token in tokens:
+            _html_por_destinatario(noticia, token)
+        resultados.append(('f-string por destinatário (antigo)', total, time.perf_counter() - inicio))
+
+        # Renderizar o template Django inteiro para cada inscrito é muito mais caro;
+        # amostramos 1% e extrapolamos para não levar minutos
+        amostra = max(1, total // 100)
+        contexto = {'noticia': noticia, 'noticia_url': '', 'imagem_url': '', 'site_url': ''}
+        inicio = time.perf_counter()
+        for token in tokens[:amostra]:
+            render_to_string('home/emails/nova_noticia.html', {**contexto, 'cancelar_url': token})
+            render_to_string('home/emails/nova_noticia.txt', {**contexto, 'cancelar_url': token})
+        resultados.append(('template Django por destinatário', amostra, time.perf_counter() - inicio))
+
+        inicio = time.perf_counter()
+        email = email_nova_noticia(noticia)
+        compilacao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for token in tokens:
+            email.renderizar(token)
+        resultados.append(('pré-compilado + substituição (novo)', total, time.perf_counter() - inicio))
+
+        html, _ = email.renderizar(tokens[0])
+        assert MARCADOR_TOKEN not in html and tokens[0] in html
+
+        self.stdout.write(f"📊 Renderização para {total} destinatário(s)\n")
+        for nome, n, segundos in resultados:
+            por_destinatario = segundos / n * 1_000_000
+            projetado = por_destinatario * total / 1_000_000
+            self.stdout.write(f"  {nome:<40} {por_destinatario:>9.2f} µs/destinatário   {projetado:>8.2f}s para {total}")
+        self.stdout.write(f"  {'compilação única (template + CSS inline)':<40} {compilacao * 1000:>9.2f} ms")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from home.cache_paginas import estatisticas_cache_paginas, zerar_estatisticas_cache_paginas
+
+
+class Command(BaseCommand):
+    help = 'Mostra a taxa de acerto do cache de páginas (use num shell do servidor aquecido; com LocMemCache vale só para o processo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help='Zera os contadores depois de mostrar')
+
+    def handle(self, *args, **options):
+        e = estatisticas_cache_paginas()
+        self.stdout.write(
+            f"📊 Cache de páginas: {e['acertos']} acerto(s), {e['faltas']} falta(s), "
+            f"{e['ignoradas']} requisição(ões) com sessão/mensagens fora do cache"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Taxa de acerto: {e['taxa_acerto']:.1%}"))
+        if options['zerar']:
+            zerar_estatisticas_cache_paginas()
+            self.stdout.write("🧹 Contadores zerados")
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.relacionadas import recalcular_relacionadas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a tabela de notícias relacionadas (categoria, data e similaridade TF-IDF do texto)'
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = recalcular_relacionadas()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Relacionadas de {total} notícia(s) recalculadas em {time.perf_counter() - inicio:.1f}s"
+        ))
@@ -0,0 +1,76 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+from django.urls import Resolver404
+
+from home.css_critico import ALTURA_DOBRA, arquivo, coletando, css_critico, gravar, ler_folha, urls_representativas
+from home.prerender import responder
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera o CSS crítico (primeira tela) de cada template público, inlinado pelo {% estilos %}, '
+        'e mostra quanto a primeira renderização deixa de esperar (rodar depois do collectstatic)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dobra', type=int, default=ALTURA_DOBRA, help='Altura estimada da primeira tela, em px')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        dados, paginas = {}, []
+        for url in urls_representativas():
+            try:
+                with coletando() as coleta:
+                    resposta = responder(url)
+            except (Resolver404, Http404):
+                continue
+            if resposta.status_code != 200 or not coleta:
+                self.stderr.write(f"❌ {url}: status {resposta.status_code}, sem bloco {{% estilos %}}")
+                continue
+            pagina, folhas = coleta[0]
+            if pagina in dados:
+                continue
+            html = resposta.content
+            try:
+                dados[pagina] = {'folhas': folhas, 'css': css_critico(folhas, html.decode(), options['dobra'])}
+            except Exception as e:
+                self.stderr.write(f"❌ {pagina}: {e}")
+                continue
+            paginas.append((url, pagina, html, folhas))
+        if not dados:
+            raise CommandError('Nenhuma página renderizou com o bloco {% estilos %}')
+        gravar(dados)
+
+        # Mesmas URLs de novo, agora com o CSS crítico aplicado
+        self.stdout.write(
+            f"{'página':<28}{'html sem crítico':>18}{'com crítico':>13}{'css bloqueante':>16}"
+            f"{'1ª pintura antes':>18}{'depois':>10}{'redução':>9}"
+        )
+        for url, pagina, antes, folhas in paginas:
+            depois = responder(url).content
+            html_antes, html_depois = self._gzip(antes), self._gzip(depois)
+            bloqueante = sum(self._gzip(ler_folha(href).encode()) for href in folhas)
+            espera_antes = html_antes + bloqueante
+            self.stdout.write(
+                f"{pagina:<28}{self._kb(html_antes):>18}{self._kb(html_depois):>13}{self._kb(bloqueante):>16}"
+                f"{self._kb(espera_antes):>18}{self._kb(html_depois):>10}"
+                f"{100 * (espera_antes - html_depois) / espera_antes:>8.1f}%"
+            )
+        self.stdout.write(
+            '   (tamanhos com gzip; 1ª pintura = HTML + CSS que bloqueia a renderização; '
+            'depois dela os arquivos de CSS carregam sem bloquear e ficam em cache)'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ CSS crítico de {len(dados)} template(s) em {arquivo()} ({time.perf_counter() - inicio:.1f}s)"
+        ))
+
+    @staticmethod
+    def _gzip(conteudo):
+        return len(gzip.compress(conteudo, 9))
+
+    @staticmethod
+    def _kb(valor):
+        return f"{valor / 1024:.1f} KB"
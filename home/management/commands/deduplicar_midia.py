@@ -0,0 +1,82 @@
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from home.armazenamento import MODELOS_COM_MIDIA, hash_conteudo, ja_enderecado, nome_por_conteudo, nomes_em_uso
+from home.cache import TAG_WORKSHOPS, campos_alteracao, invalidar, invalidar_noticias
+from home.models import Noticia
+from home.prerender import regenerar_noticias
+
+
+class Command(BaseCommand):
+    help = (
+        'Regrava a mídia antiga com nome = hash do conteúdo, apontando as notícias/workshops '
+        'para o arquivo único (as cópias antigas ficam para o limpar_midia)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--simular', action='store_true', help='Só calcula os hashes e mostra o que seria economizado')
+
+    def handle(self, *args, **options):
+        self.simular = options['simular']
+        self.novos_nomes = {}
+        self.tamanhos = {}
+        alterados = {modelo: [] for modelo in MODELOS_COM_MIDIA}
+
+        for modelo in MODELOS_COM_MIDIA:
+            for objeto in modelo.objects.exclude(imagem='').exclude(imagem__isnull=True).only('id', 'imagem', 'imagem_derivadas'):
+                try:
+                    if self._converter(objeto):
+                        alterados[modelo].append(objeto.pk)
+                except Exception as e:
+                    self.stderr.write(f"❌ {modelo._meta.model_name} {objeto.pk}: {e}")
+
+        # Mesmos passos de um save, uma vez para todas as linhas alteradas
+        if not self.simular:
+            if alterados[Noticia]:
+                invalidar_noticias()
+                regenerar_noticias(alterados[Noticia])
+            if any(ids for modelo, ids in alterados.items() if modelo is not Noticia):
+                invalidar(TAG_WORKSHOPS)
+
+        por_conteudo = {novo: self.tamanhos[antigo] for antigo, novo in self.novos_nomes.items()}
+        total = sum(self.tamanhos.values())
+        unico = sum(por_conteudo.values())
+        linhas = sum(len(ids) for ids in alterados.values())
+        verbo = 'seriam atualizada(s)' if self.simular else 'atualizada(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(self.novos_nomes)} arquivo(s) antigo(s) → {len(por_conteudo)} conteúdo(s) único(s); "
+            f"{linhas} linha(s) {verbo}; {total / 1024:.0f} KB → {unico / 1024:.0f} KB"
+        ))
+
+    def _novo_nome(self, nome):
+        """Nome endereçado por conteúdo de um arquivo antigo (lido uma vez por execução)"""
+        if nome not in self.novos_nomes:
+            with default_storage.open(nome, 'rb') as arquivo:
+                dados = arquivo.read()
+            self.tamanhos[nome] = len(dados)
+            if self.simular:
+                self.novos_nomes[nome] = nome_por_conteudo(nome, hash_conteudo(ContentFile(dados)))
+            else:
+                self.novos_nomes[nome] = default_storage.save(nome, ContentFile(dados))
+        return self.novos_nomes[nome]
+
+    def _converter(self, objeto):
+        antigos = [nome for nome in nomes_em_uso(objeto) if not ja_enderecado(nome)]
+        if not antigos:
+            return False
+        trocar = {nome: self._novo_nome(nome) for nome in antigos}
+
+        derivadas = dict(objeto.imagem_derivadas)
+        for chave, versoes in derivadas.items():
+            if isinstance(versoes, list):
+                derivadas[chave] = [[largura, trocar.get(nome, nome)] for largura, nome in versoes]
+        imagem = trocar.get(objeto.imagem.name, objeto.imagem.name)
+        if derivadas.get('original') == objeto.imagem.name:
+            derivadas['original'] = imagem
+
+        if not self.simular:
+            type(objeto).objects.filter(pk=objeto.pk).update(
+                imagem=imagem, imagem_derivadas=derivadas, **campos_alteracao(type(objeto))
+            )
+        return True
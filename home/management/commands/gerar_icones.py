@@ -0,0 +1,160 @@
+import importlib.util
+import logging
+import re
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.icones import (
+    FAMILIAS_FA, NOME_FONTE, PASTA_ICONES, PRIMEIRO_CODIGO, faltando, gerar_css, gerar_fonte, icones_usados, ler_css,
+)
+
+# Licenças que precisam acompanhar os glifos copiados
+LICENCAS = {
+    'Font Awesome Free': 'ícones CC BY 4.0, fonte SIL OFL 1.1 (https://fontawesome.com/license/free)',
+    'Bootstrap Icons': 'MIT (https://github.com/twbs/icons/blob/main/LICENSE)',
+}
+ARQUIVOS_FA = {'solid': 'fa-solid-900', 'regular': 'fa-regular-400', 'brands': 'fa-brands-400'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera home/static/home/icones/ (uma fonte WOFF2 só com os ícones bi-*/fa-* usados nos templates, mais o CSS). '
+        'Com --verificar só confere se todo ícone dos templates está no pacote gerado (usado no build)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verificar', action='store_true', help='Falha se algum ícone dos templates não está no pacote')
+        parser.add_argument(
+            '--fontawesome',
+            help='Pasta do Font Awesome Free (css/all.css e webfonts/); padrão: pacote pip fontawesomefree',
+        )
+        parser.add_argument(
+            '--bootstrap-icons',
+            help='Pasta font/ do Bootstrap Icons (bootstrap-icons.css e fonts/); padrão: pacote pip bootstrap-flask',
+        )
+
+    def handle(self, *args, **options):
+        usados = icones_usados()
+        if options['verificar']:
+            return self._verificar(usados)
+
+        # Avisos do fontTools sobre tabelas das fontes de origem que não afetam os glifos
+        logging.getLogger('fontTools').setLevel(logging.ERROR)
+        fontes = self._fontes(options)
+        glifos, codigos, erros = [], {}, []
+        novos = {}
+        for (familia, nome), templates in sorted(usados.items()):
+            css, arquivos = fontes['bi' if familia == 'bi' else 'fa']
+            origem = css.get((familia if familia == 'bi' else None, nome))
+            caminho = arquivos.get(familia)
+            if origem is None:
+                erros.append(f"{self._classe(familia, nome)} não existe ({', '.join(templates)})")
+                continue
+            if origem not in self._cmap(caminho):
+                erros.append(f"{self._classe(familia, nome)} não existe no estilo {familia} ({', '.join(templates)})")
+                continue
+            # Nomes diferentes para o mesmo glifo (fa-calendar-alt/fa-calendar-days) dividem o código
+            if (caminho, origem) not in novos:
+                novos[(caminho, origem)] = PRIMEIRO_CODIGO + len(novos)
+                glifos.append((novos[(caminho, origem)], caminho, origem))
+            codigos[(familia, nome)] = novos[(caminho, origem)]
+        if erros:
+            raise CommandError('Ícones inexistentes nos templates:\n  ' + '\n  '.join(erros))
+
+        PASTA_ICONES.mkdir(parents=True, exist_ok=True)
+        fonte = gerar_fonte(glifos)
+        (PASTA_ICONES / f'{NOME_FONTE}.woff2').write_bytes(fonte)
+        css = gerar_css(codigos, self.creditos)
+        (PASTA_ICONES / f'{NOME_FONTE}.css').write_text(css, encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(codigos)} ícone(s) ({len(glifos)} glifo(s)) em {PASTA_ICONES}: "
+            f"{NOME_FONTE}.woff2 {len(fonte) / 1024:.1f} KB, {NOME_FONTE}.css {len(css.encode()) / 1024:.1f} KB"
+        ))
+        self.stdout.write(
+            f"📦 Antes: {self.bytes_origem / 1024:.0f} KB de CSS e fontes completos vindos de CDNs (sem contar o kit)"
+        )
+
+    def _verificar(self, usados):
+        if not (PASTA_ICONES / f'{NOME_FONTE}.woff2').exists():
+            raise CommandError(f'{PASTA_ICONES}/{NOME_FONTE}.woff2 não existe: rode python manage.py gerar_icones')
+        ausentes = faltando(usados)
+        if ausentes:
+            linhas = [f"{self._classe(*icone)} ({', '.join(templates)})" for icone, templates in sorted(ausentes.items())]
+            raise CommandError(
+                'Ícones usados nos templates que não estão no pacote (rode python manage.py gerar_icones):\n  '
+                + '\n  '.join(linhas)
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ Todos os {len(usados)} ícone(s) dos templates estão no pacote'))
+
+    # ========================================
+    # FONTES DE ORIGEM
+    # ========================================
+
+    def _fontes(self, options):
+        """{'fa'/'bi': (códigos do CSS de origem, {família: caminho da fonte})}"""
+        self.creditos = []
+        self.bytes_origem = 0
+        self._cmaps = {}
+
+        pasta_fa = self._pasta(options['fontawesome'], 'fontawesomefree', 'static/fontawesomefree', '--fontawesome')
+        css_fa = self._ler(pasta_fa / 'css' / 'all.min.css', pasta_fa / 'css' / 'all.css')
+        fontes_fa = {familia: self._arquivo(pasta_fa / 'webfonts', ARQUIVOS_FA[familia]) for familia in FAMILIAS_FA}
+
+        pasta_bi = self._pasta(
+            options['bootstrap_icons'], 'flask_bootstrap', 'static/bootstrap5/css/font', '--bootstrap-icons'
+        )
+        css_bi = self._ler(pasta_bi / 'bootstrap-icons.min.css', pasta_bi / 'bootstrap-icons.css')
+        fontes_bi = {'bi': self._arquivo(pasta_bi / 'fonts', 'bootstrap-icons')}
+
+        return {'fa': (ler_css(css_fa), fontes_fa), 'bi': (ler_css(css_bi), fontes_bi)}
+
+    def _pasta(self, caminho, pacote, subpasta, opcao):
+        if caminho:
+            pasta = Path(caminho)
+        else:
+            spec = importlib.util.find_spec(pacote)
+            if spec is None or not spec.submodule_search_locations:
+                raise CommandError(
+                    f'Pacote {pacote} não instalado: pip install -r requirements-dev.txt, ou passe {opcao} PASTA'
+                )
+            pasta = Path(list(spec.submodule_search_locations)[0]) / subpasta
+        if not pasta.is_dir():
+            raise CommandError(f'{pasta} não existe')
+        return pasta
+
+    def _ler(self, *candidatos):
+        for caminho in candidatos:
+            if caminho.exists():
+                texto = caminho.read_text(encoding='utf-8')
+                self.bytes_origem += caminho.stat().st_size
+                versao = re.search(r'(Font Awesome Free|Bootstrap Icons) v?([\d.]+)', texto)
+                if versao:
+                    self.creditos.append(f'{versao[1]} {versao[2]}: {LICENCAS[versao[1]]}')
+                return texto
+        raise CommandError(f'{candidatos[0]} não existe')
+
+    def _arquivo(self, pasta, nome):
+        for extensao in ('.woff2', '.ttf'):
+            caminho = pasta / f'{nome}{extensao}'
+            if caminho.exists():
+                self.bytes_origem += caminho.stat().st_size
+                return str(caminho)
+        raise CommandError(f'{pasta / nome}.woff2 não existe')
+
+    def _cmap(self, caminho):
+        if caminho not in self._cmaps:
+            try:
+                from fontTools.ttLib import TTFont
+            except ImportError:
+                raise CommandError('Gerar o pacote precisa do fontTools: pip install -r requirements-dev.txt')
+            self._cmaps[caminho] = set(TTFont(caminho).getBestCmap())
+        return self._cmaps[caminho]
+
+    @staticmethod
+    def _classe(familia, nome):
+        if familia == 'bi':
+            return f'bi bi-{nome}'
+        prefixo = {'solid': 'fas', 'regular': 'far', 'brands': 'fab'}[familia]
+        return f'{prefixo} fa-{nome}'
@@ -0,0 +1,99 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from home.cache import TAG_WORKSHOPS, campos_alteracao, invalidar, invalidar_noticias
+from home.imagens import LARGURA_PADRAO, aplicar, ler_original, processada, processar_bytes
+from home.models import Noticia, Workshop
+from home.prerender import regenerar_noticias
+
+CAMPOS = ['imagem', 'imagem_largura', 'imagem_altura', 'imagem_derivadas', 'imagem_placeholder']
+MODELOS = {'noticias': Noticia, 'workshops': Workshop}
+
+
+class Command(BaseCommand):
+    help = 'Gera as versões responsivas (WebP/JPEG por largura, placeholder) das imagens já enviadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcar', action='store_true', help='Reprocessa também as imagens que já têm versões')
+        parser.add_argument('--processos', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--modelo', choices=sorted(MODELOS), help='Só notícias ou só workshops')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        modelos = [MODELOS[options['modelo']]] if options['modelo'] else list(MODELOS.values())
+        pendentes = [
+            objeto
+            for modelo in modelos
+            for objeto in modelo.objects.exclude(imagem='').exclude(imagem__isnull=True).only('id', *CAMPOS)
+            if options['forcar'] or not processada(objeto)
+        ]
+        if not pendentes:
+            self.stdout.write(self.style.SUCCESS('✅ Todas as imagens já têm versões responsivas'))
+            return
+
+        # Os processos filhos só usam o Pillow; não podem herdar a conexão com o banco
+        connections.close_all()
+        self.bytes_originais = 0
+        self.bytes_padrao = 0
+        processadas = []
+        processos = max(1, options['processos'])
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            em_andamento = {}
+            fila = iter(pendentes)
+            while True:
+                # Poucos arquivos em memória por vez: no máximo dois por processo
+                while len(em_andamento) < processos * 2:
+                    objeto = next(fila, None)
+                    if objeto is None:
+                        break
+                    try:
+                        dados = ler_original(objeto)
+                    except Exception as e:
+                        self.stderr.write(f"❌ {objeto._meta.model_name} {objeto.pk}: não foi possível ler {objeto.imagem.name}: {e}")
+                        continue
+                    self.bytes_originais += len(dados)
+                    em_andamento[executor.submit(processar_bytes, dados)] = objeto
+                if not em_andamento:
+                    break
+                prontas, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for futuro in prontas:
+                    objeto = em_andamento.pop(futuro)
+                    if self._gravar(objeto, futuro):
+                        processadas.append(objeto)
+
+        # Um UPDATE por linha (sem signals); caches e páginas são refeitos uma vez no final
+        noticia_ids = [o.pk for o in processadas if isinstance(o, Noticia)]
+        if noticia_ids:
+            invalidar_noticias()
+            regenerar_noticias(noticia_ids)
+        if any(isinstance(o, Workshop) for o in processadas):
+            invalidar(TAG_WORKSHOPS)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(processadas)} de {len(pendentes)} imagem(ns) processada(s) com {processos} processo(s) "
+            f"em {time.perf_counter() - inicio:.1f}s"
+        ))
+        if self.bytes_originais:
+            self.stdout.write(
+                f"📦 Originais: {self.bytes_originais / 1024:.0f} KB; versões WebP de {LARGURA_PADRAO}px: "
+                f"{self.bytes_padrao / 1024:.0f} KB ({100 * self.bytes_padrao / self.bytes_originais:.1f}%)"
+            )
+
+    def _gravar(self, objeto, futuro):
+        try:
+            resultado = futuro.result()
+            aplicar(objeto, resultado)
+            type(objeto).objects.filter(pk=objeto.pk).update(
+                **{campo: getattr(objeto, campo) for campo in CAMPOS}, **campos_alteracao(type(objeto))
+            )
+        except Exception as e:
+            self.stderr.write(f"❌ {objeto._meta.model_name} {objeto.pk}: {e}")
+            return False
+        larguras = [w for extensao, w, _ in resultado['derivadas'] if extensao == 'webp']
+        padrao = min((w for w in larguras if w >= LARGURA_PADRAO), default=max(larguras))
+        self.bytes_padrao += next(len(d) for extensao, w, d in resultado['derivadas'] if extensao == 'webp' and w == padrao)
+        return True
@@ -0,0 +1,35 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from home.armazenamento import arquivos_orfaos
+
+
+class Command(BaseCommand):
+    help = 'Lista (ou apaga, com --apagar) os arquivos de mídia que nenhuma notícia/workshop usa mais'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apagar', action='store_true', help='Apaga os órfãos (sem isso só lista)')
+        parser.add_argument('--horas', type=int, default=24, help='Ignora arquivos mais novos que isso (uploads em andamento)')
+
+    def handle(self, *args, **options):
+        try:
+            orfaos = list(arquivos_orfaos(options['horas']))
+        except TypeError as e:
+            raise CommandError(str(e))
+
+        total_bytes = 0
+        for nome in orfaos:
+            try:
+                total_bytes += default_storage.size(nome) or 0
+            except Exception:
+                pass
+            if options['apagar']:
+                try:
+                    default_storage.delete(nome)
+                except Exception as e:
+                    self.stderr.write(f"❌ Erro ao apagar {nome}: {e}")
+                    continue
+            self.stdout.write(f"{'🗑️ ' if options['apagar'] else '  '}{nome}")
+
+        acao = 'apagado(s)' if options['apagar'] else 'órfão(s) (use --apagar para remover)'
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(orfaos)} arquivo(s) {acao}, {total_bytes / 1024:.0f} KB"))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.prerender import diretorio, prerenderizar_tudo, regenerar_pendentes
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera o HTML estático das páginas públicas (home, notícias, workshops, voluntariado, doação). '
+        'Com --pendentes só as páginas anotadas pelos saves e as notícias agendadas que entraram no ar (agendar, ex.: a cada minuto)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pendentes', action='store_true', help='Só as páginas que saíram do ar depois de alterações')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        geradas, total = regenerar_pendentes() if options['pendentes'] else prerenderizar_tudo()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {geradas} de {total} página(s) pré-renderizada(s) em {diretorio()} "
+            f"({time.perf_counter() - inicio:.1f}s)"
+        ))
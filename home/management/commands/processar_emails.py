@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.outbox import TAMANHO_LOTE_PADRAO, processar_fila
+
+
+class Command(BaseCommand):
+    help = 'Envia os emails da caixa de saída com retentativas e backoff exponencial'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO, help='Emails reservados por lote')
+        parser.add_argument('--loop', action='store_true', help='Continua rodando e verificando a fila')
+        parser.add_argument('--intervalo', type=int, default=10, help='Segundos entre verificações no modo --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            enviados, reagendados, mortos = processar_fila(tamanho_lote=options['lote'], log=self.stdout.write)
+
+            if enviados or reagendados or mortos:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {enviados} enviado(s), {reagendados} reagendado(s), {mortos} movido(s) para 'falhou'"
+                ))
+
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
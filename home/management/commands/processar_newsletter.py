@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.newsletter import TAMANHO_LOTE_PADRAO, processar_campanhas
+
+
+class Command(BaseCommand):
+    help = 'Envia as campanhas de newsletter pendentes em lotes, retomando envios interrompidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO, help='Envios reservados por lote')
+        parser.add_argument('--loop', action='store_true', help='Continua rodando e verificando novas campanhas')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre verificações no modo --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.monotonic()
+            enviados, falhas = processar_campanhas(tamanho_lote=options['lote'], log=self.stdout.write)
+            decorrido = time.monotonic() - inicio
+
+            if enviados or falhas:
+                taxa = enviados / decorrido if decorrido > 0 else 0
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {enviados} email(s) enviado(s), {falhas} falha(s) em {decorrido:.1f}s ({taxa:.1f} emails/s)"
+                ))
+
+            if not options['loop']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from home.models import VagaVoluntariado, Workshop
+from home.vagas import (
+    divergencias_voluntariado,
+    divergencias_workshops,
+    recalcular_vagas_voluntariado,
+    recalcular_vagas_workshops,
+)
+
+
+class Command(BaseCommand):
+    help = 'Recalcula vagas e status de workshops e voluntariado a partir das inscrições, com relatório de divergências'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra as divergências, sem corrigir')
+
+    def handle(self, *args, **options):
+        corrigir = not options['dry_run']
+
+        workshops = list(divergencias_workshops())
+        for d in workshops:
+            self.stdout.write(
+                f"⚠️ Workshop #{d['id']} '{d['titulo']}': "
+                f"ocupadas {d['vagas_ocupadas']} → {d['inscricoes_ativas']} (de {d['vagas_totais']}), "
+                f"status {d['status']} → {d['status_esperado']}"
+            )
+
+        vagas = list(divergencias_voluntariado())
+        for d in vagas:
+            self.stdout.write(
+                f"⚠️ Vaga #{d['id']} '{d['titulo']}': "
+                f"disponíveis {d['vagas_disponiveis']} → {d['disponiveis_esperado']}, "
+                f"ocupadas {d['vagas_ocupadas']} → {d['candidaturas_ativas']} (de {d['vagas_totais']}), "
+                f"status {d['status']} → {d['status_esperado']}"
+            )
+
+        if corrigir and (workshops or vagas):
+            # O UPDATE recalcula a contagem no momento em que roda, então
+            # inscrições feitas depois do relatório também entram na correção
+            with transaction.atomic():
+                if workshops:
+                    recalcular_vagas_workshops(Workshop.objects.filter(id__in=[d['id'] for d in workshops]))
+                if vagas:
+                    recalcular_vagas_voluntariado(VagaVoluntariado.objects.filter(id__in=[d['id'] for d in vagas]))
+
+        acao = 'corrigido(s)' if corrigir else 'encontrado(s) (dry-run)'
+        estilo = self.style.SUCCESS if not (workshops or vagas) or corrigir else self.style.WARNING
+        self.stdout.write(estilo(
+            f"✅ {len(workshops)} workshop(s) e {len(vagas)} vaga(s) de voluntariado com divergência {acao}"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from home.busca import reindexar_busca
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca de notícias (FTS5 no SQLite, coluna tsvector no Postgres)'
+
+    def handle(self, *args, **options):
+        total = reindexar_busca()
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} notícia(s) reindexada(s)"))
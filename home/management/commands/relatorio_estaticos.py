@@ -0,0 +1,63 @@
+import os
+from collections import defaultdict
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Mostra quantos bytes os estáticos com hash economizam com as versões .gz/.br (rodar depois do collectstatic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--maiores', type=int, default=5, help='Quantos dos maiores arquivos servidos listar')
+
+    def handle(self, *args, **options):
+        arquivos = getattr(staticfiles_storage, 'hashed_files', None)
+        if not arquivos:
+            raise CommandError('Sem manifesto de estáticos: rode collectstatic com EstaticosComHash')
+
+        # extensão: [arquivos, original, gzip, brotli, servido]
+        totais = defaultdict(lambda: [0, 0, 0, 0, 0])
+        servidos = []
+        for com_hash, nome in {com_hash: nome for nome, com_hash in arquivos.items()}.items():
+            caminho = staticfiles_storage.path(com_hash)
+            if not os.path.exists(caminho):
+                continue
+            original = os.path.getsize(caminho)
+            gz = self._tamanho(caminho + '.gz')
+            br = self._tamanho(caminho + '.br')
+            # O WhiteNoise entrega a menor versão que o navegador aceita (brotli > gzip > original)
+            servido = min(t for t in (original, gz, br) if t is not None)
+            linha = totais[os.path.splitext(nome)[1].lower() or '(sem extensão)']
+            linha[0] += 1
+            linha[1] += original
+            linha[2] += gz if gz is not None else original
+            linha[3] += br if br is not None else original
+            linha[4] += servido
+            servidos.append((servido, com_hash))
+
+        self.stdout.write(f"{'tipo':<16}{'arquivos':>9}{'original':>12}{'gzip':>12}{'brotli':>12}{'servido':>12}")
+        geral = [0, 0, 0, 0, 0]
+        for extensao, linha in sorted(totais.items(), key=lambda item: -item[1][1]):
+            self.stdout.write(f"{extensao:<16}{linha[0]:>9}" + ''.join(f"{self._kb(v):>12}" for v in linha[1:]))
+            geral = [a + b for a, b in zip(geral, linha)]
+        self.stdout.write(f"{'total':<16}{geral[0]:>9}" + ''.join(f"{self._kb(v):>12}" for v in geral[1:]))
+
+        self.stdout.write('\n📦 Maiores arquivos servidos:')
+        for servido, nome in sorted(servidos, reverse=True)[:options['maiores']]:
+            self.stdout.write(f"   {self._kb(servido):>10}  {nome}")
+
+        economia = geral[1] - geral[4]
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {self._kb(economia)} a menos por visita sem cache "
+            f"({100 * economia / geral[1] if geral[1] else 0:.1f}% de {self._kb(geral[1])}); "
+            f"arquivos com hash servidos com Cache-Control immutable"
+        ))
+
+    @staticmethod
+    def _tamanho(caminho):
+        return os.path.getsize(caminho) if os.path.exists(caminho) else None
+
+    @staticmethod
+    def _kb(valor):
+        return f"{valor / 1024:.1f} KB"
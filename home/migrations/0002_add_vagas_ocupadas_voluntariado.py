@@ -1,5 +1,32 @@
 from django.db import migrations
 
+
+ADICIONAR_COLUNA = """
+    ALTER TABLE home_vagavoluntariado
+    ADD COLUMN IF NOT EXISTS vagas_ocupadas INTEGER DEFAULT 0 NOT NULL;
+
+    UPDATE home_vagavoluntariado
+    SET vagas_ocupadas = 0
+    WHERE vagas_ocupadas IS NULL;
+"""
+
+REMOVER_COLUNA = """
+    ALTER TABLE home_vagavoluntariado
+    DROP COLUMN IF EXISTS vagas_ocupadas;
+"""
+
+
+def adicionar_coluna(apps, schema_editor):
+    # ADD COLUMN IF NOT EXISTS só existe no Postgres; nos demais bancos a 0013 cria a coluna
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADICIONAR_COLUNA)
+
+
+def remover_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REMOVER_COLUNA)
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -7,20 +34,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunSQL(
-            # Forward SQL
-            sql="""
-                ALTER TABLE home_vagavoluntariado 
-                ADD COLUMN IF NOT EXISTS vagas_ocupadas INTEGER DEFAULT 0 NOT NULL;
-                
-                UPDATE home_vagavoluntariado 
-                SET vagas_ocupadas = 0 
-                WHERE vagas_ocupadas IS NULL;
-            """,
-            # Reverse SQL (para rollback)
-            reverse_sql="""
-                ALTER TABLE home_vagavoluntariado 
-                DROP COLUMN IF EXISTS vagas_ocupadas;
-            """
-        ),
-    ]
\ No newline at end of file
+        migrations.RunPython(adicionar_coluna, remover_coluna),
+    ]
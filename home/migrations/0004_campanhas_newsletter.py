@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_add_vagas_ocupadas_voluntariado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampanhaNewsletter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('concluida', 'Concluída')], default='pendente', max_length=20, verbose_name='Status')),
+                ('total_destinatarios', models.IntegerField(default=0, verbose_name='Total de Destinatários')),
+                ('total_enviados', models.IntegerField(default=0, verbose_name='Enviados')),
+                ('total_falhas', models.IntegerField(default=0, verbose_name='Falhas')),
+                ('criada_em', models.DateTimeField(auto_now_add=True, verbose_name='Criada em')),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('ultimo_envio_em', models.DateTimeField(blank=True, null=True, verbose_name='Último envio em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campanhas', to='home.noticia', verbose_name='Notícia')),
+            ],
+            options={
+                'verbose_name': 'Campanha de Newsletter',
+                'verbose_name_plural': 'Campanhas de Newsletter',
+                'ordering': ['-criada_em'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EnvioNewsletter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='E-mail')),
+                ('token', models.CharField(max_length=100, verbose_name='Token de Cancelamento')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('falhou', 'Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('reservado_em', models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')),
+                ('enviado_em', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+                ('campanha', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios', to='home.campanhanewsletter', verbose_name='Campanha')),
+                ('inscrito', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='envios', to='home.newslettersubscriber', verbose_name='Inscrito')),
+            ],
+            options={
+                'verbose_name': 'Envio de Newsletter',
+                'verbose_name_plural': 'Envios de Newsletter',
+                'ordering': ['id'],
+                'unique_together': {('campanha', 'email')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def remover_campanhas_duplicadas(apps, schema_editor):
+    """Mantém apenas a campanha mais antiga de cada notícia antes da restrição única"""
+    CampanhaNewsletter = apps.get_model('home', 'CampanhaNewsletter')
+    vistas = set()
+    for campanha_id, noticia_id in CampanhaNewsletter.objects.order_by('noticia_id', 'id').values_list('id', 'noticia_id'):
+        if noticia_id in vistas:
+            CampanhaNewsletter.objects.filter(id=campanha_id).delete()
+        vistas.add(noticia_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_campanhas_newsletter'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_campanhas_duplicadas, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='campanhanewsletter',
+            name='noticia',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='campanha_newsletter', to='home.noticia', verbose_name='Notícia'),
+        ),
+    ]
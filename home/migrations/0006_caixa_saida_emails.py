@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_campanha_unica_por_noticia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSaida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assunto', models.CharField(max_length=300, verbose_name='Assunto')),
+                ('corpo_texto', models.TextField(verbose_name='Corpo (texto)')),
+                ('corpo_html', models.TextField(blank=True, verbose_name='Corpo (HTML)')),
+                ('remetente', models.CharField(max_length=254, verbose_name='Remetente')),
+                ('destinatarios', models.JSONField(default=list, verbose_name='Destinatários')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('enviado', 'Enviado'), ('falhou', 'Falhou (esgotou tentativas)')], default='pendente', max_length=20, verbose_name='Status')),
+                ('tentativas', models.IntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próxima tentativa em')),
+                ('reservado_em', models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último erro')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('enviado_em', models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')),
+            ],
+            options={
+                'verbose_name': 'Email na Caixa de Saída',
+                'verbose_name_plural': 'Caixa de Saída de Emails',
+                'ordering': ['-criado_em'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_caixa_saida_emails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisualizacaoDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('total', models.IntegerField(default=0, verbose_name='Visualizações')),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visualizacoes_diarias', to='home.noticia')),
+            ],
+            options={
+                'verbose_name': 'Visualização Diária',
+                'verbose_name_plural': 'Visualizações Diárias',
+                'ordering': ['-data'],
+                'unique_together': {('noticia', 'data')},
+            },
+        ),
+    ]
@@ -0,0 +1,137 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+
+# Cópia do estado de home.busca quando a migração foi criada: mudanças
+# futuras no módulo não alteram o que esta migração grava.
+TABELA_FTS = 'home_noticia_busca'
+COLUNAS_FTS = ('titulo', 'subtitulo', 'autor', 'conteudo')
+
+SUFIXOS_PLURAL = [('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'), ('ns', 'm'), ('res', 'r'), ('s', '')]
+SUFIXOS = [
+    'amentos', 'imentos', 'amento', 'imento', 'acoes', 'icoes', 'mente', 'idades', 'idade',
+    'acao', 'icao', 'ismo', 'ista', 'avel', 'ivel', 'ando', 'endo', 'indo', 'ador', 'ante',
+    'ar', 'er', 'ir', 'ao', 'a', 'o', 'e',
+]
+TAMANHO_MINIMO_RADICAL = 3
+
+_PALAVRA = re.compile(r'\w+')
+_SEM_COMBINANTES = dict.fromkeys(range(0x0300, 0x0370))
+
+
+def radical(palavra):
+    for sufixo, troca in SUFIXOS_PLURAL:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= TAMANHO_MINIMO_RADICAL:
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+    for sufixo in SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= TAMANHO_MINIMO_RADICAL:
+            return palavra[:-len(sufixo)]
+    return palavra
+
+
+def texto_indexavel(texto):
+    sem_acentos = unicodedata.normalize('NFKD', (texto or '').lower()).translate(_SEM_COMBINANTES)
+    return ' '.join(radical(p) for p in _PALAVRA.findall(sem_acentos))
+
+
+VETOR_POSTGRES = """
+    setweight(to_tsvector('portugues_sem_acento', coalesce({p}titulo, '')), 'A') ||
+    setweight(to_tsvector('portugues_sem_acento', coalesce({p}subtitulo, '')), 'B') ||
+    setweight(to_tsvector('portugues_sem_acento', coalesce({p}autor, '')), 'C') ||
+    setweight(to_tsvector('portugues_sem_acento', coalesce({p}conteudo, '')), 'D')
+"""
+
+CRIAR_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portugues_sem_acento') THEN
+            CREATE TEXT SEARCH CONFIGURATION portugues_sem_acento (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portugues_sem_acento
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE home_noticia ADD COLUMN IF NOT EXISTS busca tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION home_noticia_busca_atualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busca := {VETOR_POSTGRES.format(p='NEW.')};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS home_noticia_busca_trigger ON home_noticia",
+    # Só os campos de texto disparam o trigger: o UPDATE de visualizacoes não recalcula o vetor
+    """
+    CREATE TRIGGER home_noticia_busca_trigger
+        BEFORE INSERT OR UPDATE OF titulo, subtitulo, autor, conteudo ON home_noticia
+        FOR EACH ROW EXECUTE FUNCTION home_noticia_busca_atualizar()
+    """,
+    f"UPDATE home_noticia SET busca = {VETOR_POSTGRES.format(p='')}",
+    "CREATE INDEX IF NOT EXISTS home_noticia_busca_gin ON home_noticia USING GIN (busca)",
+]
+
+REMOVER_POSTGRES = [
+    "DROP INDEX IF EXISTS home_noticia_busca_gin",
+    "DROP TRIGGER IF EXISTS home_noticia_busca_trigger ON home_noticia",
+    "DROP FUNCTION IF EXISTS home_noticia_busca_atualizar()",
+    "ALTER TABLE home_noticia DROP COLUMN IF EXISTS busca",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS portugues_sem_acento",
+]
+
+
+def criar_indice_busca(apps, schema_editor):
+    """
+    Postgres: coluna tsvector mantida por trigger + índice GIN.
+    SQLite: tabela FTS5 espelho, mantida pelos signals de Noticia.
+    """
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for sql in CRIAR_POSTGRES:
+            schema_editor.execute(sql)
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5("
+                    f"{', '.join(COLUNAS_FTS)}, tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            except Exception as e:
+                # SQLite compilado sem FTS5: a busca usa o fallback com icontains
+                print(f"⚠️ FTS5 indisponível, busca de notícias sem índice: {e}")
+                return
+
+            Noticia = apps.get_model('home', 'Noticia')
+            linhas = [
+                (noticia['id'], *(texto_indexavel(noticia[coluna]) for coluna in COLUNAS_FTS))
+                for noticia in Noticia.objects.values('id', *COLUNAS_FTS).iterator()
+            ]
+            cursor.executemany(
+                f"INSERT INTO {TABELA_FTS} (rowid, {', '.join(COLUNAS_FTS)}) VALUES (%s, %s, %s, %s, %s)",
+                linhas,
+            )
+
+
+def remover_indice_busca(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for sql in REMOVER_POSTGRES:
+            schema_editor.execute(sql)
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABELA_FTS}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_visualizacoes_diarias'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0008_busca_noticias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidaturavoluntariado',
+            index=models.Index(fields=['vaga', 'status'], name='candidatura_vaga_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailsaida',
+            index=models.Index(condition=models.Q(('status', 'pendente')), fields=['proxima_tentativa_em', 'id'], name='emailsaida_pendentes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='envionewsletter',
+            index=models.Index(fields=['campanha', 'status'], name='envio_campanha_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricaoworkshop',
+            index=models.Index(fields=['workshop', 'status'], name='inscricao_workshop_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscriber',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['id'], name='newsletter_ativos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['publicado', '-data_publicacao'], name='noticia_publicado_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['destaque', 'publicado', '-data_publicacao'], name='noticia_destaque_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['categoria', '-data_publicacao'], name='noticia_categoria_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(condition=models.Q(('publicado', True)), fields=['-data_publicacao', '-id'], name='noticia_publicadas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vagavoluntariado',
+            index=models.Index(fields=['status', '-criada_em'], name='vaga_status_criada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshop',
+            index=models.Index(fields=['status', '-data_inicio'], name='workshop_status_inicio_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticiaRelacionada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicao', models.PositiveSmallIntegerField(verbose_name='Posição')),
+                ('pontuacao', models.FloatField(verbose_name='Pontuação')),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionadas', to='home.noticia')),
+                ('relacionada', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='home.noticia')),
+            ],
+            options={
+                'verbose_name': 'Notícia Relacionada',
+                'verbose_name_plural': 'Notícias Relacionadas',
+                'ordering': ['noticia', 'posicao'],
+                'unique_together': {('noticia', 'relacionada')},
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_noticias_relacionadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_altura',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Altura da imagem'),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_derivadas',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versões da imagem'),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_largura',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Largura da imagem'),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Placeholder da imagem'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='imagem_altura',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Altura da imagem'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='imagem_derivadas',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versões da imagem'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='imagem_largura',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Largura da imagem'),
+        ),
+        migrations.AddField(
+            model_name='workshop',
+            name='imagem_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Placeholder da imagem'),
+        ),
+    ]
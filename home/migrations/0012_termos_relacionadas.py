@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0011_imagens_responsivas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrequenciaTermo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termo', models.CharField(max_length=100, unique=True)),
+                ('noticias', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Frequência de Termo',
+                'verbose_name_plural': 'Frequências de Termos',
+            },
+        ),
+        migrations.CreateModel(
+            name='TermoNoticia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termo', models.CharField(max_length=100)),
+                ('peso', models.FloatField()),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='home.noticia')),
+            ],
+            options={
+                'verbose_name': 'Termo de Notícia',
+                'verbose_name_plural': 'Termos de Notícias',
+                'indexes': [models.Index(fields=['termo'], name='termo_noticia_termo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def adicionar_colunas_ausentes(apps, schema_editor):
+    """
+    Adiciona vagas_ocupadas apenas onde a coluna ainda não existe.
+    A 0002 cria a coluna de VagaVoluntariado via SQL (só no Postgres) e a de
+    Workshop nunca teve migração, então o estado real varia entre bancos.
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for model_name in ('vagavoluntariado', 'workshop'):
+            model = apps.get_model('home', model_name)
+            tabela = model._meta.db_table
+            colunas = [c.name for c in connection.introspection.get_table_description(cursor, tabela)]
+            if 'vagas_ocupadas' not in colunas:
+                schema_editor.add_field(model, model._meta.get_field('vagas_ocupadas'))
+
+
+class Migration(migrations.Migration):
+
+    # Mesma migração que já rodou como 0003_sincroniza_vagas_ocupadas: bancos
+    # com a 0003 aplicada a tomam como aplicada e não rodam de novo
+    replaces = [('home', '0003_sincroniza_vagas_ocupadas')]
+
+    dependencies = [
+        ('home', '0012_termos_relacionadas'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='vagavoluntariado',
+                    name='vagas_ocupadas',
+                    field=models.IntegerField(default=0, verbose_name='Vagas Ocupadas'),
+                ),
+                migrations.AddField(
+                    model_name='workshop',
+                    name='vagas_ocupadas',
+                    field=models.IntegerField(default=0, verbose_name='Vagas Ocupadas'),
+                ),
+            ],
+        ),
+        migrations.RunPython(adicionar_colunas_ausentes, migrations.RunPython.noop),
+    ]
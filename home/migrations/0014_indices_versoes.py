@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0013_sincroniza_vagas_ocupadas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['data_atualizacao'], name='noticia_atualizacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vagavoluntariado',
+            index=models.Index(fields=['atualizada_em'], name='vaga_atualizada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workshop',
+            index=models.Index(fields=['atualizado_em'], name='workshop_atualizado_idx'),
+        ),
+    ]
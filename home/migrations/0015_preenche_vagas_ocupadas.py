@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _ativas(model, campo):
+    """Inscrições/candidaturas que ocupam vaga (todas menos as recusadas), por oferta"""
+    contagem = (
+        model.objects.filter(**{campo: OuterRef('pk')})
+        .exclude(status='recusado')
+        .order_by()
+        .values(campo)
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(contagem), 0)
+
+
+def preencher_vagas_ocupadas(apps, schema_editor):
+    """
+    A coluna vagas_ocupadas nasceu com 0 onde não existia (0013), mas a
+    reserva de vagas confia nela no UPDATE condicional: sem a contagem real,
+    workshops com inscrições aceitariam inscrições além do total.
+    """
+    Workshop = apps.get_model('home', 'Workshop')
+    InscricaoWorkshop = apps.get_model('home', 'InscricaoWorkshop')
+    VagaVoluntariado = apps.get_model('home', 'VagaVoluntariado')
+    CandidaturaVoluntariado = apps.get_model('home', 'CandidaturaVoluntariado')
+
+    Workshop.objects.update(vagas_ocupadas=_ativas(InscricaoWorkshop, 'workshop'))
+    VagaVoluntariado.objects.update(vagas_ocupadas=_ativas(CandidaturaVoluntariado, 'vaga'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0014_indices_versoes'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_vagas_ocupadas, migrations.RunPython.noop),
+    ]
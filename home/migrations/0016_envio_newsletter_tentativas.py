@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0015_preenche_vagas_ocupadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='envionewsletter',
+            name='proxima_tentativa_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Próxima tentativa em'),
+        ),
+        migrations.AddField(
+            model_name='envionewsletter',
+            name='tentativas',
+            field=models.IntegerField(default=0, verbose_name='Tentativas'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def adicionar_coluna(apps, schema_editor):
+    # No Postgres a coluna (com trigger e índice GIN) já foi criada pela 0008
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.execute("ALTER TABLE home_noticia ADD COLUMN busca tsvector NULL")
+
+
+def remover_coluna(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.execute("ALTER TABLE home_noticia DROP COLUMN busca")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0016_envio_newsletter_tentativas'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='noticia',
+                    name='busca',
+                    field=SearchVectorField(editable=False, null=True, verbose_name='Vetor de busca'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(adicionar_coluna, remover_coluna),
+            ],
+        ),
+        # Tabela FTS5 criada pela 0008 (SQLite); não gerenciada, só entra no estado
+        migrations.CreateModel(
+            name='NoticiaBusca',
+            fields=[
+                ('noticia', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='indice_busca', serialize=False, to='home.noticia')),
+                ('consulta', models.TextField(db_column='home_noticia_busca')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'home_noticia_busca',
+                'managed': False,
+            },
+        ),
+    ]
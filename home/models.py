@@ -1,13 +1,73 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 import uuid
 
+# ========================================
+# RASTREAMENTO DE CAMPOS
+# ========================================
+
+class RastreiaCamposMixin:
+    """
+    Guarda os valores de CAMPOS_RASTREADOS como vieram do banco (from_db),
+    para que os signals saibam o valor anterior sem outro SELECT.
+    """
+    CAMPOS_RASTREADOS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_carregado = {
+            campo: valor for campo, valor in zip(field_names, values)
+            if campo in cls.CAMPOS_RASTREADOS and valor is not models.DEFERRED
+        }
+        return instance
+
+    def valor_original(self, campo):
+        """Valor do campo no banco; None para objetos novos ou não carregados via queryset"""
+        return getattr(self, '_estado_carregado', {}).get(campo)
+
+    def campo_alterado(self, campo):
+        return self.valor_original(campo) != getattr(self, campo)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Os receivers de post_save já rodaram com o estado antigo; agora ele passa a ser o salvo
+        self._estado_carregado = {campo: getattr(self, campo) for campo in self.CAMPOS_RASTREADOS}
+
+
+# ========================================
+# IMAGENS RESPONSIVAS
+# ========================================
+
+class ImagemResponsiva(models.Model):
+    """
+    Dados das versões de `imagem` geradas no upload (home.imagens): dimensões
+    do original, derivadas WebP/JPEG por largura e o placeholder borrado.
+    """
+    imagem_largura = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Largura da imagem')
+    imagem_altura = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Altura da imagem')
+    imagem_derivadas = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Versões da imagem')
+    imagem_placeholder = models.TextField(blank=True, editable=False, verbose_name='Placeholder da imagem')
+
+    class Meta:
+        abstract = True
+
+
 # ========================================
 # WORKSHOP
 # ========================================
 
-class Workshop(models.Model):
+class WorkshopQuerySet(models.QuerySet):
+    def com_ocupacao(self):
+        """Anota as inscrições ativas (não recusadas) de cada workshop em um único JOIN agregado"""
+        return self.annotate(
+            inscricoes_ativas=models.Count('inscricoes', filter=~models.Q(inscricoes__status='recusado'))
+        )
+
+
+class Workshop(ImagemResponsiva):
     NIVEL_CHOICES = [
         ('iniciante', 'Iniciante'),
         ('intermediario', 'Intermediário'),
@@ -38,19 +98,32 @@ class Workshop(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
     
+    objects = WorkshopQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Workshop'
         verbose_name_plural = 'Workshops'
         ordering = ['-data_inicio']
+        indexes = [
+            models.Index(fields=['status', '-data_inicio'], name='workshop_status_inicio_idx'),
+            # Versão da tag de cache (home.cache.versao_do_banco)
+            models.Index(fields=['atualizado_em'], name='workshop_atualizado_idx'),
+        ]
     
     def __str__(self):
         return self.titulo
     
+    def _contar_inscricoes_ativas(self):
+        """Usa a anotação de com_ocupacao() quando presente; senão faz o COUNT"""
+        inscricoes_ativas = getattr(self, 'inscricoes_ativas', None)
+        if inscricoes_ativas is None:
+            inscricoes_ativas = self.inscricoes.exclude(status='recusado').count()
+        return inscricoes_ativas
+    
     @property
     def vagas_disponiveis(self):
         """Calcula vagas disponíveis em tempo real baseado nas inscrições não recusadas"""
-        inscricoes_ativas = self.inscricoes.exclude(status='recusado').count()
-        vagas_livres = self.vagas_totais - inscricoes_ativas
+        vagas_livres = self.vagas_totais - self._contar_inscricoes_ativas()
         return max(0, vagas_livres)
     
     
@@ -60,8 +133,7 @@ class Workshop(models.Model):
         if self.vagas_totais is None or self.vagas_totais == 0:
             return 0
         # Calcula vagas ocupadas baseado nas inscrições
-        inscricoes_ativas = self.inscricoes.exclude(status='recusado').count()
-        return int((inscricoes_ativas / self.vagas_totais) * 100)
+        return int((self._contar_inscricoes_ativas() / self.vagas_totais) * 100)
     
     def esta_disponivel(self):
         """Verifica se workshop está disponível"""
@@ -76,7 +148,9 @@ class Workshop(models.Model):
         self.save(update_fields=['status'])
 
 
-class InscricaoWorkshop(models.Model):
+class InscricaoWorkshop(RastreiaCamposMixin, models.Model):
+    CAMPOS_RASTREADOS = ('status',)
+    
     EXPERIENCIA_CHOICES = [
         ('nenhuma', 'Nenhuma experiência'),
         ('basica', 'Básica'),
@@ -105,6 +179,9 @@ class InscricaoWorkshop(models.Model):
         verbose_name_plural = 'Inscrições em Workshops'
         ordering = ['-inscrito_em']
         unique_together = ['workshop', 'email']
+        indexes = [
+            models.Index(fields=['workshop', 'status'], name='inscricao_workshop_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nome} - {self.workshop.titulo} ({self.status})"
@@ -146,6 +223,10 @@ class VagaVoluntariado(models.Model):
         verbose_name = 'Vaga de Voluntariado'
         verbose_name_plural = 'Vagas de Voluntariado'
         ordering = ['-criada_em']
+        indexes = [
+            models.Index(fields=['status', '-criada_em'], name='vaga_status_criada_idx'),
+            models.Index(fields=['atualizada_em'], name='vaga_atualizada_idx'),
+        ]
     
     def __str__(self):
         return self.titulo
@@ -169,7 +250,9 @@ class VagaVoluntariado(models.Model):
         self.save(update_fields=['vagas_disponiveis', 'status'])
 
 
-class CandidaturaVoluntariado(models.Model):
+class CandidaturaVoluntariado(RastreiaCamposMixin, models.Model):
+    CAMPOS_RASTREADOS = ('status',)
+    
     STATUS_CHOICES = [
         ('pendente', 'Pendente'),
         ('em_analise', 'Em Análise'),
@@ -193,6 +276,9 @@ class CandidaturaVoluntariado(models.Model):
         verbose_name = 'Candidatura de Voluntariado'
         verbose_name_plural = 'Candidaturas de Voluntariado'
         ordering = ['-candidatou_em']
+        indexes = [
+            models.Index(fields=['vaga', 'status'], name='candidatura_vaga_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nome} - {self.vaga.titulo} ({self.status})"
@@ -203,6 +289,10 @@ class CandidaturaVoluntariado(models.Model):
 # ========================================
 
 class NoticiaManager(models.Manager):
+    def get_queryset(self):
+        # O vetor de busca só é usado no WHERE/ORDER BY da busca, nunca precisa vir para o Python
+        return super().get_queryset().defer('busca')
+
     def publicadas(self):
         """Retorna apenas notícias publicadas e com data <= agora"""
         return self.filter(
@@ -220,9 +310,18 @@ class NoticiaManager(models.Manager):
     def destaques(self):
         """Retorna notícias em destaque publicadas"""
         return self.publicadas().filter(destaque=True)
+    
+    def por_ids(self, ids):
+        """Carrega as notícias dos ids em uma query, preservando a ordem da lista"""
+        noticias = self.in_bulk(ids)
+        return [noticias[i] for i in ids if i in noticias]
+    
+    def proxima_publicacao(self):
+        """Data da próxima notícia agendada (horizonte de validade dos caches), ou None"""
+        return self.agendadas().aggregate(proxima=models.Min('data_publicacao'))['proxima']
 
 
-class Noticia(models.Model):
+class Noticia(ImagemResponsiva):
     CATEGORIA_CHOICES = [
         ('evento', 'Evento'),
         ('projeto', 'Projeto'),
@@ -250,6 +349,9 @@ class Noticia(models.Model):
         help_text='Data e hora em que a notícia será publicada automaticamente'
     )
     autor = models.CharField(max_length=100, blank=True, verbose_name='Autor')
+
+    # Postgres: preenchido pelo trigger da migração 0008. SQLite: fica vazio, a busca usa a tabela FTS5
+    busca = SearchVectorField(null=True, editable=False, verbose_name='Vetor de busca')
     
     objects = NoticiaManager()
     
@@ -257,6 +359,14 @@ class Noticia(models.Model):
         verbose_name = 'Notícia'
         verbose_name_plural = 'Notícias'
         ordering = ['-data_publicacao']
+        indexes = [
+            models.Index(fields=['publicado', '-data_publicacao'], name='noticia_publicado_data_idx'),
+            models.Index(fields=['destaque', 'publicado', '-data_publicacao'], name='noticia_destaque_data_idx'),
+            models.Index(fields=['categoria', '-data_publicacao'], name='noticia_categoria_data_idx'),
+            # Listagem pública e paginação por cursor: só as publicadas, já na ordem (data, id)
+            models.Index(fields=['-data_publicacao', '-id'], condition=models.Q(publicado=True), name='noticia_publicadas_idx'),
+            models.Index(fields=['data_atualizacao'], name='noticia_atualizacao_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         # Gera slug automaticamente se não existir
@@ -269,13 +379,10 @@ class Noticia(models.Model):
         
         super().save(*args, **kwargs)
         
-        # Envia newsletter apenas para novas notícias em destaque
+        # Newsletter apenas para novas notícias em destaque (única por notícia, após o commit)
         if is_new and self.destaque and self.publicado:
-            from .views import enviar_newsletter_nova_noticia
-            try:
-                enviar_newsletter_nova_noticia(self)
-            except Exception as e:
-                print(f"Erro ao enviar newsletter: {e}")
+            from .newsletter import agendar_newsletter
+            agendar_newsletter(self)
     
     def __str__(self):
         return self.titulo
@@ -286,6 +393,103 @@ class Noticia(models.Model):
         return self.publicado and self.data_publicacao <= timezone.now()
 
 
+class NoticiaRelacionada(models.Model):
+    """Notícias relacionadas pré-calculadas (categoria, data e similaridade do texto)"""
+    noticia = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='relacionadas')
+    relacionada = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='+')
+    posicao = models.PositiveSmallIntegerField(verbose_name='Posição')
+    pontuacao = models.FloatField(verbose_name='Pontuação')
+
+    class Meta:
+        verbose_name = 'Notícia Relacionada'
+        verbose_name_plural = 'Notícias Relacionadas'
+        ordering = ['noticia', 'posicao']
+        unique_together = ['noticia', 'relacionada']
+
+    def __str__(self):
+        return f"{self.noticia_id} → {self.relacionada_id} ({self.pontuacao:.3f})"
+
+
+class TermoNoticia(models.Model):
+    """Lista invertida das relacionadas: peso de cada termo no vetor TF-IDF da notícia"""
+    noticia = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='+')
+    termo = models.CharField(max_length=100)
+    peso = models.FloatField()
+
+    class Meta:
+        verbose_name = 'Termo de Notícia'
+        verbose_name_plural = 'Termos de Notícias'
+        indexes = [
+            models.Index(fields=['termo'], name='termo_noticia_termo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.noticia_id}: {self.termo} ({self.peso:.3f})"
+
+
+class FrequenciaTermo(models.Model):
+    """Em quantas notícias publicadas cada termo aparece (idf das relacionadas)"""
+    termo = models.CharField(max_length=100, unique=True)
+    noticias = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = 'Frequência de Termo'
+        verbose_name_plural = 'Frequências de Termos'
+
+    def __str__(self):
+        return f"{self.termo}: {self.noticias}"
+
+
+class Match(models.Lookup):
+    """coluna MATCH valor, para as colunas ocultas do FTS5"""
+    lookup_name = 'match'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class NoticiaBusca(models.Model):
+    """
+    Tabela FTS5 espelho de home_noticia no SQLite (migração 0008, mantida
+    por home.busca). Não é gerenciada pelo Django: serve só para a busca
+    fazer o JOIN pelo ORM.
+    """
+    noticia = models.OneToOneField(
+        Noticia, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='indice_busca',
+    )
+    # Colunas ocultas do FTS5: a que tem o nome da tabela recebe a consulta e `rank` devolve o bm25
+    consulta = models.TextField(db_column='home_noticia_busca')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'home_noticia_busca'
+
+
+NoticiaBusca._meta.get_field('consulta').register_lookup(Match)
+NoticiaBusca._meta.get_field('rank').register_lookup(Match)
+
+
+class VisualizacaoDiaria(models.Model):
+    """Total de visualizações de uma notícia em um dia (para gráficos de tendência)"""
+    noticia = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='visualizacoes_diarias')
+    data = models.DateField(verbose_name='Data')
+    total = models.IntegerField(default=0, verbose_name='Visualizações')
+
+    class Meta:
+        verbose_name = 'Visualização Diária'
+        verbose_name_plural = 'Visualizações Diárias'
+        ordering = ['-data']
+        unique_together = ['noticia', 'data']
+
+    def __str__(self):
+        return f"{self.noticia.titulo} - {self.data}: {self.total}"
+
+
 # ========================================
 # NEWSLETTER
 # ========================================
@@ -301,6 +505,10 @@ class NewsletterSubscriber(models.Model):
         verbose_name = "Inscrito na Newsletter"
         verbose_name_plural = "Inscritos na Newsletter"
         ordering = ['-data_inscricao']
+        indexes = [
+            # Destinatários da newsletter: WHERE ativo ORDER BY id
+            models.Index(fields=['id'], condition=models.Q(ativo=True), name='newsletter_ativos_idx'),
+        ]
 
     def __str__(self):
         return self.email
@@ -308,4 +516,122 @@ class NewsletterSubscriber(models.Model):
     def save(self, *args, **kwargs):
         if not self.token:
             self.token = str(uuid.uuid4())
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+# ========================================
+# NEWSLETTER - CAMPANHAS DE ENVIO
+# ========================================
+
+class CampanhaNewsletter(models.Model):
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviando', 'Enviando'),
+        ('concluida', 'Concluída'),
+    ]
+
+    # OneToOne: o banco garante no máximo uma campanha por notícia
+    noticia = models.OneToOneField(Noticia, on_delete=models.CASCADE, related_name='campanha_newsletter', verbose_name='Notícia')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', verbose_name='Status')
+    total_destinatarios = models.IntegerField(default=0, verbose_name='Total de Destinatários')
+    total_enviados = models.IntegerField(default=0, verbose_name='Enviados')
+    total_falhas = models.IntegerField(default=0, verbose_name='Falhas')
+    criada_em = models.DateTimeField(auto_now_add=True, verbose_name='Criada em')
+    iniciada_em = models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')
+    ultimo_envio_em = models.DateTimeField(blank=True, null=True, verbose_name='Último envio em')
+    concluida_em = models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')
+
+    class Meta:
+        verbose_name = 'Campanha de Newsletter'
+        verbose_name_plural = 'Campanhas de Newsletter'
+        ordering = ['-criada_em']
+
+    def __str__(self):
+        return f"Newsletter - {self.noticia.titulo}"
+
+    @property
+    def percentual_progresso(self):
+        """Percentual de destinatários já processados (enviados + falhas)"""
+        if not self.total_destinatarios:
+            return 0
+        processados = self.total_enviados + self.total_falhas
+        return int((processados / self.total_destinatarios) * 100)
+
+    @property
+    def taxa_envio(self):
+        """Throughput médio da campanha em emails por segundo"""
+        if not self.iniciada_em or not self.ultimo_envio_em or not self.total_enviados:
+            return 0
+        segundos = (self.ultimo_envio_em - self.iniciada_em).total_seconds()
+        if segundos <= 0:
+            return 0
+        return round(self.total_enviados / segundos, 2)
+
+
+class EnvioNewsletter(models.Model):
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviando', 'Enviando'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou'),
+    ]
+
+    campanha = models.ForeignKey(CampanhaNewsletter, on_delete=models.CASCADE, related_name='envios', verbose_name='Campanha')
+    inscrito = models.ForeignKey(NewsletterSubscriber, on_delete=models.SET_NULL, blank=True, null=True, related_name='envios', verbose_name='Inscrito')
+    email = models.EmailField(verbose_name='E-mail')
+    token = models.CharField(max_length=100, verbose_name='Token de Cancelamento')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', verbose_name='Status')
+    reservado_em = models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')
+    enviado_em = models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')
+    erro = models.TextField(blank=True, verbose_name='Erro')
+    # Falhas de conexão deixam o envio pendente com backoff (vazio = pronto para envio)
+    tentativas = models.IntegerField(default=0, verbose_name='Tentativas')
+    proxima_tentativa_em = models.DateTimeField(blank=True, null=True, verbose_name='Próxima tentativa em')
+
+    class Meta:
+        verbose_name = 'Envio de Newsletter'
+        verbose_name_plural = 'Envios de Newsletter'
+        ordering = ['id']
+        unique_together = ['campanha', 'email']
+        indexes = [
+            models.Index(fields=['campanha', 'status'], name='envio_campanha_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} ({self.status})"
+
+# ========================================
+# CAIXA DE SAÍDA DE EMAILS (OUTBOX)
+# ========================================
+
+class EmailSaida(models.Model):
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou (esgotou tentativas)'),
+    ]
+
+    assunto = models.CharField(max_length=300, verbose_name='Assunto')
+    corpo_texto = models.TextField(verbose_name='Corpo (texto)')
+    corpo_html = models.TextField(blank=True, verbose_name='Corpo (HTML)')
+    remetente = models.CharField(max_length=254, verbose_name='Remetente')
+    destinatarios = models.JSONField(default=list, verbose_name='Destinatários')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente', verbose_name='Status')
+    tentativas = models.IntegerField(default=0, verbose_name='Tentativas')
+    proxima_tentativa_em = models.DateTimeField(default=timezone.now, verbose_name='Próxima tentativa em')
+    reservado_em = models.DateTimeField(blank=True, null=True, verbose_name='Reservado em')
+    ultimo_erro = models.TextField(blank=True, verbose_name='Último erro')
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    enviado_em = models.DateTimeField(blank=True, null=True, verbose_name='Enviado em')
+
+    class Meta:
+        verbose_name = 'Email na Caixa de Saída'
+        verbose_name_plural = 'Caixa de Saída de Emails'
+        ordering = ['-criado_em']
+        indexes = [
+            # Fila do worker: pendentes em ordem de próxima tentativa
+            models.Index(fields=['proxima_tentativa_em', 'id'], condition=models.Q(status='pendente'), name='emailsaida_pendentes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.assunto} → {', '.join(self.destinatarios)} ({self.status})"
@@ -0,0 +1,277 @@
+from datetime import timedelta
+import smtplib
+import time
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .emails import email_nova_noticia
+from .models import CampanhaNewsletter, EnvioNewsletter, NewsletterSubscriber
+from .outbox import MAX_TENTATIVAS, calcular_backoff
+
+
+# Tamanho padrão do lote reservado por iteração do worker
+TAMANHO_LOTE_PADRAO = 200
+
+# Após esse tempo uma reserva de lote é considerada abandonada (worker caiu)
+EXPIRACAO_RESERVA = timedelta(minutes=10)
+
+
+# ========================================
+# CAMPANHAS
+# ========================================
+
+def agendar_newsletter(noticia):
+    """
+    Ponto único de disparo da newsletter de uma notícia. A campanha só é
+    registrada depois do commit, então um save desfeito nunca gera envio.
+    """
+    noticia_id = noticia.pk
+    transaction.on_commit(lambda: criar_campanha_newsletter(noticia_id))
+
+
+def criar_campanha_newsletter(noticia_id):
+    """
+    Registra a campanha da notícia, no máximo uma vez (garantido pelo banco).
+    Os destinatários só são materializados pelo worker (processar_newsletter).
+    """
+    try:
+        campanha, criada = CampanhaNewsletter.objects.get_or_create(noticia_id=noticia_id)
+    except Exception as e:
+        print(f"❌ Erro ao registrar campanha da notícia {noticia_id}: {e}")
+        return None
+    if not criada:
+        print(f"ℹ️ Newsletter da notícia {noticia_id} já estava agendada")
+    return campanha
+
+
+def preparar_campanha(campanha):
+    """Gera uma linha de envio por inscrito ativo (executado uma única vez por campanha)"""
+    with transaction.atomic():
+        campanha = CampanhaNewsletter.objects.select_for_update().get(pk=campanha.pk)
+        if campanha.status != 'pendente':
+            return campanha
+
+        inscritos = NewsletterSubscriber.objects.filter(ativo=True).order_by('id').values_list('id', 'email', 'token')
+
+        total = 0
+        lote = []
+        for inscrito_id, email, token in inscritos.iterator(chunk_size=2000):
+            lote.append(EnvioNewsletter(campanha=campanha, inscrito_id=inscrito_id, email=email, token=token))
+            if len(lote) >= 1000:
+                EnvioNewsletter.objects.bulk_create(lote, ignore_conflicts=True)
+                total += len(lote)
+                lote = []
+        if lote:
+            EnvioNewsletter.objects.bulk_create(lote, ignore_conflicts=True)
+            total += len(lote)
+
+        campanha.status = 'enviando' if total else 'concluida'
+        campanha.total_destinatarios = total
+        campanha.iniciada_em = timezone.now()
+        if not total:
+            campanha.concluida_em = campanha.iniciada_em
+        campanha.save(update_fields=['status', 'total_destinatarios', 'iniciada_em', 'concluida_em'])
+
+    return campanha
+
+
+def recuperar_envios_interrompidos(campanha, expiracao=EXPIRACAO_RESERVA):
+    """
+    Trata envios deixados para trás por um worker que caiu.
+
+    Linhas em 'enviando' podem ou não ter saído pelo SMTP, então são marcadas
+    como falha em vez de reenviadas (nunca enviamos duas vezes). Reservas
+    expiradas de linhas ainda 'pendente' voltam a ficar livres.
+    """
+    limite = timezone.now() - expiracao
+    interrompidos = EnvioNewsletter.objects.filter(
+        campanha=campanha, status='enviando', reservado_em__lt=limite
+    ).update(status='falhou', erro='Envio interrompido (worker encerrado durante o envio)')
+
+    if interrompidos:
+        CampanhaNewsletter.objects.filter(pk=campanha.pk).update(total_falhas=F('total_falhas') + interrompidos)
+
+    EnvioNewsletter.objects.filter(
+        campanha=campanha, status='pendente', reservado_em__lt=limite
+    ).update(reservado_em=None)
+
+    return interrompidos
+
+
+def reservar_lote(campanha, tamanho=TAMANHO_LOTE_PADRAO, expiracao=EXPIRACAO_RESERVA):
+    """Reserva o próximo lote de envios pendentes (e fora do backoff) para este worker"""
+    agora = timezone.now()
+    limite = agora - expiracao
+    with transaction.atomic():
+        ids = list(
+            EnvioNewsletter.objects.select_for_update(skip_locked=True)
+            .filter(campanha=campanha, status='pendente')
+            .filter(Q(proxima_tentativa_em__isnull=True) | Q(proxima_tentativa_em__lte=agora))
+            .filter(Q(reservado_em__isnull=True) | Q(reservado_em__lt=limite))
+            .order_by('id')
+            .values_list('id', flat=True)[:tamanho]
+        )
+        if ids:
+            EnvioNewsletter.objects.filter(id__in=ids).update(reservado_em=timezone.now())
+
+    return list(EnvioNewsletter.objects.filter(id__in=ids).order_by('id'))
+
+
+def erro_transitorio(erro):
+    """
+    Falhas de conexão (queda, timeout, servidor fora do ar ou respondendo
+    4xx) não dizem nada sobre o destinatário e valem nova tentativa. Recusas
+    definitivas do servidor (5xx, destinatário inválido) não.
+    """
+    if isinstance(erro, smtplib.SMTPResponseException):
+        return 400 <= erro.smtp_code < 500
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return False
+    return isinstance(erro, (smtplib.SMTPServerDisconnected, OSError))
+
+
+def adiar_envio(envio, erro):
+    """Devolve o envio para 'pendente' com backoff, ou o marca como falha ao esgotar as tentativas"""
+    tentativas = envio.tentativas + 1
+    if tentativas >= MAX_TENTATIVAS:
+        EnvioNewsletter.objects.filter(pk=envio.pk).update(
+            status='falhou', tentativas=tentativas, erro=erro, reservado_em=None
+        )
+        return 'falhou'
+
+    EnvioNewsletter.objects.filter(pk=envio.pk).update(
+        status='pendente',
+        tentativas=tentativas,
+        erro=erro,
+        reservado_em=None,
+        proxima_tentativa_em=timezone.now() + calcular_backoff(tentativas),
+    )
+    return 'pendente'
+
+
+def processar_campanha(campanha, tamanho_lote=TAMANHO_LOTE_PADRAO, connection=None, log=None):
+    """
+    Drena os envios pendentes de uma campanha em lotes, reutilizando uma
+    única conexão SMTP. Retorna (enviados, falhas) desta execução.
+
+    Uma falha de conexão interrompe a execução: o envio atual volta para a
+    fila com backoff, o restante do lote é liberado e a campanha continua
+    em 'enviando' até a próxima execução do worker.
+    """
+    campanha = preparar_campanha(campanha)
+    if campanha.status == 'concluida':
+        return 0, 0
+
+    recuperar_envios_interrompidos(campanha)
+
+    # HTML/texto renderizados uma vez; por destinatário só troca o token
+    email = email_nova_noticia(campanha.noticia)
+    connection = connection or get_connection()
+    enviados = falhas = 0
+    inicio = time.monotonic()
+
+    try:
+        connection.open()
+    except Exception as e:
+        # Servidor indisponível: nada é reservado, tentamos na próxima execução
+        if log:
+            log(f"❌ Não foi possível conectar ao servidor de email: {e}")
+        return 0, 0
+
+    try:
+        interrompido = False
+        while not interrompido:
+            envios = reservar_lote(campanha, tamanho_lote)
+            if not envios:
+                break
+
+            ok = erro = 0
+            for posicao, envio in enumerate(envios):
+                # Marca antes de enviar: se o processo cair aqui, a linha não é reenviada
+                EnvioNewsletter.objects.filter(pk=envio.pk).update(status='enviando')
+                try:
+                    email.mensagem(envio.email, envio.token, connection=connection).send()
+                    EnvioNewsletter.objects.filter(pk=envio.pk).update(status='enviado', enviado_em=timezone.now(), erro='')
+                    ok += 1
+                except Exception as e:
+                    if not erro_transitorio(e):
+                        EnvioNewsletter.objects.filter(pk=envio.pk).update(status='falhou', erro=str(e))
+                        erro += 1
+                        continue
+
+                    situacao = adiar_envio(envio, str(e))
+                    if situacao == 'falhou':
+                        erro += 1
+                    # Os demais do lote voltam para a fila sem esperar a reserva expirar
+                    EnvioNewsletter.objects.filter(
+                        pk__in=[outro.pk for outro in envios[posicao + 1:]]
+                    ).update(reservado_em=None)
+                    interrompido = True
+                    if log:
+                        log(f"⚠️ Campanha #{campanha.pk}: conexão com o servidor de email falhou ({e}), lote interrompido")
+                    break
+
+            CampanhaNewsletter.objects.filter(pk=campanha.pk).update(
+                total_enviados=F('total_enviados') + ok,
+                total_falhas=F('total_falhas') + erro,
+                ultimo_envio_em=timezone.now(),
+            )
+            enviados += ok
+            falhas += erro
+
+            if log:
+                campanha.refresh_from_db(fields=['total_destinatarios', 'total_enviados', 'total_falhas'])
+                decorrido = time.monotonic() - inicio
+                taxa = enviados / decorrido if decorrido > 0 else 0
+                log(
+                    f"📨 Campanha #{campanha.pk}: {campanha.total_enviados + campanha.total_falhas}/"
+                    f"{campanha.total_destinatarios} ({campanha.percentual_progresso}%) - {taxa:.1f} emails/s"
+                )
+    finally:
+        connection.close()
+
+    finalizar_campanha(campanha)
+    return enviados, falhas
+
+
+def finalizar_campanha(campanha):
+    """Marca a campanha como concluída quando não restam envios pendentes (inclusive os em backoff)"""
+    restantes = EnvioNewsletter.objects.filter(campanha=campanha, status__in=['pendente', 'enviando']).exists()
+    if not restantes:
+        CampanhaNewsletter.objects.filter(pk=campanha.pk, status='enviando').update(
+            status='concluida', concluida_em=timezone.now()
+        )
+    return not restantes
+
+
+def processar_campanhas(tamanho_lote=TAMANHO_LOTE_PADRAO, log=None):
+    """Processa todas as campanhas em aberto, da mais antiga para a mais nova"""
+    total_enviados = total_falhas = 0
+    campanhas = CampanhaNewsletter.objects.filter(status__in=['pendente', 'enviando']).order_by('criada_em')
+    for campanha in campanhas:
+        enviados, falhas = processar_campanha(campanha, tamanho_lote=tamanho_lote, log=log)
+        total_enviados += enviados
+        total_falhas += falhas
+    return total_enviados, total_falhas
+
+
+def reenviar_falhas(campanhas):
+    """
+    Recoloca na fila os envios que falharam das campanhas e as reabre.
+    Retorna o número de envios recolocados.
+    """
+    total = 0
+    for campanha in campanhas:
+        with transaction.atomic():
+            reenviados = EnvioNewsletter.objects.filter(campanha=campanha, status='falhou').update(
+                status='pendente', tentativas=0, proxima_tentativa_em=None, reservado_em=None, erro=''
+            )
+            if reenviados:
+                CampanhaNewsletter.objects.filter(pk=campanha.pk).update(
+                    status='enviando', concluida_em=None, total_falhas=F('total_falhas') - reenviados
+                )
+        total += reenviados
+    return total
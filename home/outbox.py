@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import EmailSaida
+
+
+TAMANHO_LOTE_PADRAO = 100
+
+# Depois disso o email vai para o estado 'falhou' (dead letter)
+MAX_TENTATIVAS = 6
+
+# Backoff exponencial: 1min, 2min, 4min, ... limitado a 6h
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAXIMO = timedelta(hours=6)
+
+EXPIRACAO_RESERVA = timedelta(minutes=10)
+
+
+# ========================================
+# ENFILEIRAMENTO
+# ========================================
+
+def enfileirar_email(assunto, mensagem, destinatarios, html='', remetente=None):
+    """
+    Grava o email na caixa de saída. Chamado dentro da mesma transação da
+    alteração que o originou: se ela for desfeita, o email também é.
+    """
+    return EmailSaida.objects.create(
+        assunto=assunto,
+        corpo_texto=mensagem,
+        corpo_html=html,
+        remetente=remetente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+
+
+def enfileirar_emails(emails):
+    """Versão em lote: recebe tuplas (assunto, mensagem, destinatarios)"""
+    return EmailSaida.objects.bulk_create([
+        EmailSaida(
+            assunto=assunto,
+            corpo_texto=mensagem,
+            remetente=settings.DEFAULT_FROM_EMAIL,
+            destinatarios=list(destinatarios),
+        )
+        for assunto, mensagem, destinatarios in emails
+    ], batch_size=500)
+
+
+# ========================================
+# DRENAGEM DA FILA
+# ========================================
+
+def calcular_backoff(tentativas):
+    """Intervalo até a próxima tentativa após `tentativas` falhas"""
+    return min(BACKOFF_BASE * (2 ** (tentativas - 1)), BACKOFF_MAXIMO)
+
+
+def reservar_lote(tamanho=TAMANHO_LOTE_PADRAO, expiracao=EXPIRACAO_RESERVA):
+    """Reserva os próximos emails prontos para envio"""
+    agora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailSaida.objects.select_for_update(skip_locked=True)
+            .filter(status='pendente', proxima_tentativa_em__lte=agora)
+            .filter(Q(reservado_em__isnull=True) | Q(reservado_em__lt=agora - expiracao))
+            .order_by('proxima_tentativa_em', 'id')
+            .values_list('id', flat=True)[:tamanho]
+        )
+        if ids:
+            EmailSaida.objects.filter(id__in=ids).update(reservado_em=agora)
+
+    return list(EmailSaida.objects.filter(id__in=ids).order_by('id'))
+
+
+def registrar_falha(email, erro):
+    """Agenda nova tentativa com backoff ou move o email para 'falhou'"""
+    tentativas = email.tentativas + 1
+    if tentativas >= MAX_TENTATIVAS:
+        EmailSaida.objects.filter(pk=email.pk).update(
+            status='falhou', tentativas=tentativas, ultimo_erro=erro, reservado_em=None
+        )
+        return 'falhou'
+
+    EmailSaida.objects.filter(pk=email.pk).update(
+        tentativas=tentativas,
+        ultimo_erro=erro,
+        reservado_em=None,
+        proxima_tentativa_em=timezone.now() + calcular_backoff(tentativas),
+    )
+    return 'pendente'
+
+
+def processar_fila(tamanho_lote=TAMANHO_LOTE_PADRAO, connection=None, log=None):
+    """
+    Envia os emails pendentes em lotes por uma única conexão.
+    Retorna (enviados, reagendados, mortos).
+    """
+    enviados = reagendados = mortos = 0
+    connection = connection or get_connection()
+
+    try:
+        connection.open()
+    except Exception as e:
+        # Servidor indisponível: nada é reservado, tentamos na próxima execução
+        if log:
+            log(f"❌ Não foi possível conectar ao servidor de email: {e}")
+        return 0, 0, 0
+
+    try:
+        while True:
+            lote = reservar_lote(tamanho_lote)
+            if not lote:
+                break
+
+            ok = []
+            for email in lote:
+                msg = EmailMultiAlternatives(
+                    email.assunto, email.corpo_texto, email.remetente, email.destinatarios, connection=connection
+                )
+                if email.corpo_html:
+                    msg.attach_alternative(email.corpo_html, "text/html")
+                try:
+                    msg.send()
+                    ok.append(email.pk)
+                except Exception as e:
+                    if registrar_falha(email, str(e)) == 'falhou':
+                        mortos += 1
+                    else:
+                        reagendados += 1
+
+            if ok:
+                EmailSaida.objects.filter(pk__in=ok).update(
+                    status='enviado', enviado_em=timezone.now(), reservado_em=None, tentativas=F('tentativas') + 1
+                )
+            enviados += len(ok)
+
+            if log:
+                log(f"📤 Lote de {len(lote)}: {len(ok)} enviado(s)")
+    finally:
+        connection.close()
+
+    return enviados, reagendados, mortos
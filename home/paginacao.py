@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+
+SALT_CURSOR = 'home.paginacao.cursor'
+
+# Notícias por página na listagem (numerada ou por cursor)
+NOTICIAS_POR_PAGINA = 9
+
+
+# ========================================
+# PAGINAÇÃO POR CURSOR (KEYSET)
+# ========================================
+# Em vez de COUNT(*) + OFFSET, cada página parte da última linha vista:
+# WHERE (data_publicacao, id) < (cursor) ORDER BY data_publicacao DESC, id DESC.
+# O custo é o mesmo na página 1 e na página 1000.
+
+class PaginaCursor:
+    """Página de resultados com links de anterior/próxima, sem total"""
+
+    def __init__(self, itens, proximo_cursor, anterior_cursor):
+        self.itens = itens
+        self.proximo_cursor = proximo_cursor
+        self.anterior_cursor = anterior_cursor
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    @property
+    def has_next(self):
+        return self.proximo_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.anterior_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def _codificar_cursor(noticia, direcao):
+    """Cursor opaco e assinado: o cliente não consegue montar nem alterar a posição"""
+    return signing.dumps([noticia.data_publicacao.isoformat(), noticia.id, direcao], salt=SALT_CURSOR)
+
+
+def _decodificar_cursor(cursor):
+    """Retorna (data_publicacao, id, direcao) ou None para cursor ausente/inválido"""
+    if not cursor:
+        return None
+    try:
+        data, noticia_id, direcao = signing.loads(cursor, salt=SALT_CURSOR)
+        return datetime.fromisoformat(data), int(noticia_id), direcao
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+def paginar_por_cursor(queryset, cursor=None, por_pagina=NOTICIAS_POR_PAGINA):
+    """
+    Pagina o queryset em ordem decrescente de (data_publicacao, id). Busca
+    uma linha a mais que a página para saber se existe continuação.
+    """
+    posicao = _decodificar_cursor(cursor)
+
+    if posicao is None:
+        linhas = list(queryset.order_by('-data_publicacao', '-id')[:por_pagina + 1])
+        itens = linhas[:por_pagina]
+        tem_proxima, tem_anterior = len(linhas) > por_pagina, False
+
+    else:
+        data, noticia_id, direcao = posicao
+        if direcao == 'anterior':
+            linhas = list(
+                queryset.filter(Q(data_publicacao__gt=data) | Q(data_publicacao=data, id__gt=noticia_id))
+                .order_by('data_publicacao', 'id')[:por_pagina + 1]
+            )
+            itens = linhas[:por_pagina][::-1]
+            tem_proxima, tem_anterior = True, len(linhas) > por_pagina
+        else:
+            linhas = list(
+                queryset.filter(Q(data_publicacao__lt=data) | Q(data_publicacao=data, id__lt=noticia_id))
+                .order_by('-data_publicacao', '-id')[:por_pagina + 1]
+            )
+            itens = linhas[:por_pagina]
+            tem_proxima, tem_anterior = len(linhas) > por_pagina, True
+
+    if not itens:
+        return PaginaCursor([], None, None)
+
+    return PaginaCursor(
+        itens,
+        _codificar_cursor(itens[-1], 'proxima') if tem_proxima else None,
+        _codificar_cursor(itens[0], 'anterior') if tem_anterior else None,
+    )
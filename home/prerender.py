@@ -0,0 +1,438 @@
+import gzip
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf import settings
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+from .cache import TAG_NOTICIAS, TAG_VOLUNTARIADO, TAG_WORKSHOPS, ids_publicadas, ids_relacionadas, versoes
+from .cache_paginas import query_normalizada, visitante_anonimo
+from .models import Noticia, NoticiaRelacionada
+from .paginacao import NOTICIAS_POR_PAGINA
+from .visualizacoes import registrar_visualizacao
+
+
+# ========================================
+# PRÉ-RENDERIZAÇÃO DAS PÁGINAS PÚBLICAS
+# ========================================
+# O comando prerenderizar grava o HTML das páginas públicas em PRERENDER_DIR;
+# o PrerenderMiddleware (subclasse do WhiteNoise) entrega esses arquivos a
+# visitantes anônimos sem passar pelas views. POSTs, cancelamento de
+# newsletter, filtros e busca continuam no Django.
+#
+# Quando uma notícia, workshop ou vaga muda, nada é renderizado na
+# requisição: os arquivos das páginas afetadas são apagados (o Django, com o
+# cache de páginas, responde por elas) e as URLs vão para ARQUIVO_PENDENTES.
+# O worker `prerenderizar --pendentes` (agendado como os demais) gera essas
+# páginas de novo. Das listagens só entram as páginas cujos ids mudaram ou
+# que mostram a notícia salva; contagens dos filtros nas demais páginas
+# ficam como estavam até o próximo build.
+#
+# Com PRERENDER_DIR sem permissão de escrita (sistema de arquivos só leitura,
+# como na Vercel) nada é regenerado em tempo de execução. O manifesto guarda
+# a versão de cada tag (home.cache) no build, e um arquivo só é servido
+# enquanto as tags da página continuam nessa versão: depois da primeira
+# alteração de notícias, workshops ou vagas, o Django (com o cache de
+# páginas) responde por elas até o próximo deploy.
+
+ARQUIVO_MANIFESTO = '_manifesto.json'
+ARQUIVO_PENDENTES = '_pendentes'
+ARQUIVO_INDICE = 'index.html'
+
+URL_WORKSHOPS = '/workshops/'
+URL_VOLUNTARIADO = '/voluntariado/'
+URLS_FIXAS = [URL_WORKSHOPS, URL_VOLUNTARIADO, '/doacao/']
+
+# Tags de cache de que cada página fixa depende; as demais são de notícias
+TAGS_FIXAS = {URL_WORKSHOPS: (TAG_WORKSHOPS,), URL_VOLUNTARIADO: (TAG_VOLUNTARIADO,), '/doacao/': ()}
+TAGS = (TAG_NOTICIAS, TAG_WORKSHOPS, TAG_VOLUNTARIADO)
+
+_PAGINA_LISTA = re.compile(r'page=(\d+)')
+_DETALHE = re.compile(r'/noticia/(\d+)/')
+
+_trava = threading.Lock()
+
+
+def diretorio():
+    return Path(settings.PRERENDER_DIR)
+
+
+def arquivo_da_url(caminho, query=''):
+    """
+    Caminho relativo do arquivo de uma URL, ou None se a URL não é
+    pré-renderizada. `query` já normalizado (query_normalizada).
+    """
+    if not caminho.endswith('/') or '..' in caminho or '//' in caminho:
+        return None
+    base = caminho.strip('/')
+    if query:
+        pagina = _PAGINA_LISTA.fullmatch(query)
+        if caminho != '/noticias/' or not pagina:
+            return None
+        if pagina.group(1) != '1':
+            base = f'{base}/pagina/{pagina.group(1)}'
+    return f'{base}/{ARQUIVO_INDICE}' if base else ARQUIVO_INDICE
+
+
+def prerenderizacao_ativa():
+    """O comando já gerou as páginas neste servidor"""
+    return (diretorio() / ARQUIVO_MANIFESTO).exists()
+
+
+def regeneracao_ativa():
+    """Só regenera com as páginas geradas e a pasta gravável"""
+    return prerenderizacao_ativa() and os.access(diretorio(), os.W_OK)
+
+
+def pagina_de_noticias(caminho):
+    """Páginas que mostram notícias (e por isso dependem do horizonte)"""
+    return caminho not in URLS_FIXAS
+
+
+def tags_da_pagina(caminho):
+    return TAGS_FIXAS.get(caminho, (TAG_NOTICIAS,))
+
+
+# ========================================
+# MANIFESTO
+# ========================================
+# Guarda o horizonte (próxima notícia agendada: a partir dele os arquivos de
+# notícias ficam velhos e o Django volta a responder por eles), as versões
+# das tags no build, os ids de cada página da listagem e, para cada página
+# de detalhe, os ids das notícias exibidas nela (a própria e as relacionadas).
+
+def ler_manifesto():
+    try:
+        return json.loads((diretorio() / ARQUIVO_MANIFESTO).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar(relativo, conteudo):
+    """Escrita atômica (arquivo temporário + rename), com a versão .gz ao lado"""
+    destino = diretorio() / relativo
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode()
+    versoes = [(destino.with_name(destino.name + '.gz'), gzip.compress(conteudo, 9, mtime=0)), (destino, conteudo)]
+    if relativo == ARQUIVO_MANIFESTO:
+        versoes = versoes[1:]
+    for caminho, dados in versoes:
+        descritor, temporario = tempfile.mkstemp(dir=destino.parent, prefix='.tmp-')
+        with os.fdopen(descritor, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+
+
+def _remover(relativo):
+    destino = diretorio() / relativo
+    for caminho in (destino.with_name(destino.name + '.gz'), destino):
+        try:
+            caminho.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ========================================
+# RENDERIZAÇÃO
+# ========================================
+
+def _requisicao(url):
+    site = urlsplit(settings.SITE_URL)
+    caminho, _, query = url.partition('?')
+    request = RequestFactory().get(caminho, dict(parse_qsl(query)), secure=site.scheme == 'https')
+    # O host público entra nos links de compartilhamento; não precisa estar em ALLOWED_HOSTS
+    request.get_host = lambda: site.netloc
+    request.prerenderizacao = True
+    # Formulários sem token no HTML (o JS do base.html busca em /csrf/)
+    request.resposta_publica = True
+    return request
+
+
+def responder(url):
+    """Resposta da view para um visitante anônimo (Resolver404/Http404 se a página não existe)"""
+    encontrada = resolve(url.partition('?')[0])
+    return encontrada.func(_requisicao(url), *encontrada.args, **encontrada.kwargs)
+
+
+def renderizar(url):
+    """Grava o HTML da URL; remove o arquivo se a página deixou de existir. Retorna o status"""
+    caminho, _, query = url.partition('?')
+    relativo = arquivo_da_url(caminho, query)
+    try:
+        resposta = responder(url)
+        status = resposta.status_code
+    except (Resolver404, Http404):
+        status = 404
+    except Exception as e:
+        # Página que não renderiza não pode ficar com o HTML antigo
+        print(f"❌ Erro ao pré-renderizar {url}: {e}")
+        status = 500
+    if status == 200:
+        _gravar(relativo, resposta.content)
+    else:
+        _remover(relativo)
+    return status
+
+
+def _ids_da_lista(url, publicadas):
+    pagina = _PAGINA_LISTA.search(url)
+    inicio = (int(pagina.group(1)) - 1 if pagina else 0) * NOTICIAS_POR_PAGINA
+    return publicadas[inicio:inicio + NOTICIAS_POR_PAGINA]
+
+
+def urls_lista_noticias():
+    if settings.NOTICIAS_PAGINACAO_CURSOR:
+        return ['/noticias/']
+    paginas = max(1, math.ceil(len(ids_publicadas()) / NOTICIAS_POR_PAGINA))
+    return ['/noticias/'] + [f'/noticias/?page={n}' for n in range(2, paginas + 1)]
+
+
+def _remover_paginas_lista_excedentes(urls_lista):
+    pasta = diretorio() / 'noticias' / 'pagina'
+    if not pasta.exists():
+        return
+    validas = {arquivo_da_url(*url.partition('?')[::2]) for url in urls_lista}
+    for arquivo in pasta.glob(f'*/{ARQUIVO_INDICE}'):
+        relativo = arquivo.relative_to(diretorio()).as_posix()
+        if relativo not in validas:
+            _remover(relativo)
+
+
+def _gerar(urls, manifesto):
+    """Renderiza as URLs e atualiza no manifesto as notícias exibidas em cada página"""
+    paginas = manifesto.setdefault('noticias', {})
+    listas = manifesto.setdefault('listas', {})
+    gerados = 0
+    for url in urls:
+        status = renderizar(url)
+        detalhe = _DETALHE.fullmatch(url)
+        if url.startswith('/noticias/'):
+            if status == 200:
+                listas[url] = _ids_da_lista(url, ids_publicadas())
+            else:
+                listas.pop(url, None)
+        elif detalhe:
+            noticia_id = int(detalhe.group(1))
+            if status == 200:
+                paginas[url] = [noticia_id, *ids_relacionadas(noticia_id)]
+            else:
+                paginas.pop(url, None)
+        gerados += status == 200
+    proxima = Noticia.objects.proxima_publicacao()
+    manifesto['horizonte'] = proxima.isoformat() if proxima else None
+    manifesto['gerado_em'] = timezone.now().isoformat()
+    _gravar(ARQUIVO_MANIFESTO, json.dumps(manifesto))
+    return gerados
+
+
+def prerenderizar_tudo():
+    """Todas as páginas públicas (comando prerenderizar). Retorna (geradas, total)"""
+    urls_lista = urls_lista_noticias()
+    urls = ['/', *urls_lista, *(f'/noticia/{i}/' for i in ids_publicadas()), *URLS_FIXAS]
+    with _trava:
+        manifesto = {'noticias': {}, 'listas': {}, 'versoes': dict(zip(TAGS, versoes(TAGS)))}
+        gerados = _gerar(urls, manifesto)
+        _remover_paginas_lista_excedentes(urls_lista)
+        # Detalhes de notícias que não estão mais publicadas
+        pasta = diretorio() / 'noticia'
+        if pasta.exists():
+            for arquivo in pasta.glob(f'*/{ARQUIVO_INDICE}'):
+                if f'/noticia/{arquivo.parent.name}/' not in manifesto['noticias']:
+                    _remover(arquivo.relative_to(diretorio()).as_posix())
+    return gerados, len(urls)
+
+
+def _urls_noticias(noticia_ids, manifesto):
+    """
+    Páginas que mudam quando as notícias `noticia_ids` mudam: a home, as
+    páginas da listagem com outros ids ou que exibem alguma delas, o detalhe
+    de cada uma e os detalhes que exibem alguma delas entre as relacionadas.
+    """
+    publicadas = ids_publicadas()
+    listas = manifesto.get('listas', {})
+    urls = ['/']
+    for url in urls_lista_noticias():
+        atuais, anteriores = _ids_da_lista(url, publicadas), listas.get(url)
+        if anteriores != atuais or noticia_ids.intersection(atuais):
+            urls.append(url)
+    detalhes = {f'/noticia/{i}/' for i in noticia_ids}
+    detalhes.update(url for url, ids in manifesto.get('noticias', {}).items() if noticia_ids.intersection(ids))
+    detalhes.update(
+        f'/noticia/{i}/' for i in
+        NoticiaRelacionada.objects.filter(relacionada_id__in=noticia_ids).values_list('noticia_id', flat=True)
+    )
+    return urls + sorted(detalhes)
+
+
+def regenerar_noticias(noticia_ids):
+    """Gera agora as páginas afetadas por notícias (comandos; nas requisições use adiar_noticias)"""
+    if not regeneracao_ativa():
+        return 0
+    with _trava:
+        manifesto = ler_manifesto() or {}
+        gerados = _gerar(_urls_noticias(set(noticia_ids), manifesto), manifesto)
+        _remover_paginas_lista_excedentes(urls_lista_noticias())
+    return gerados
+
+
+def regenerar_urls(urls):
+    """Páginas que não dependem de notícias (workshops, voluntariado)"""
+    if not regeneracao_ativa():
+        return 0
+    with _trava:
+        return _gerar(urls, ler_manifesto() or {})
+
+
+# ========================================
+# PÁGINAS PENDENTES
+# ========================================
+# Nas requisições (signals, ações do admin) só se apaga arquivo e anota
+# URL: uma linha acrescentada a ARQUIVO_PENDENTES, seguro entre processos.
+
+def adiar_urls(urls):
+    """Tira as páginas do ar (o Django responde por elas) e deixa a geração para o worker"""
+    if not regeneracao_ativa() or not urls:
+        return 0
+    for url in urls:
+        relativo = arquivo_da_url(*url.partition('?')[::2])
+        if relativo:
+            _remover(relativo)
+    with open(diretorio() / ARQUIVO_PENDENTES, 'a') as pendentes:
+        pendentes.write(''.join(f'{url}\n' for url in urls))
+    return len(urls)
+
+
+def adiar_noticias(noticia_ids):
+    if not regeneracao_ativa():
+        return 0
+    urls = _urls_noticias(set(noticia_ids), ler_manifesto() or {})
+    _remover_paginas_lista_excedentes(urls_lista_noticias())
+    return adiar_urls(urls)
+
+
+def _publicadas_apos_horizonte(manifesto):
+    """Notícias agendadas que entraram no ar depois da última geração"""
+    if not manifesto.get('horizonte'):
+        return []
+    horizonte = parse_datetime(manifesto['horizonte'])
+    if timezone.now() < horizonte:
+        return []
+    return list(
+        Noticia.objects.publicadas().filter(data_publicacao__gte=horizonte).values_list('id', flat=True)
+    )
+
+
+def regenerar_pendentes():
+    """Worker: gera as URLs anotadas e as páginas das notícias agendadas que já entraram no ar"""
+    if not regeneracao_ativa():
+        return 0, 0
+    arquivo = diretorio() / ARQUIVO_PENDENTES
+    processando = arquivo.with_name(arquivo.name + '.processando')
+    # As anotações feitas durante a geração vão para um arquivo novo; uma
+    # execução interrompida deixa o .processando para a próxima
+    if not processando.exists():
+        try:
+            os.replace(arquivo, processando)
+        except FileNotFoundError:
+            pass
+    urls = processando.read_text().split() if processando.exists() else []
+    with _trava:
+        manifesto = ler_manifesto() or {}
+        agendadas = _publicadas_apos_horizonte(manifesto)
+        if agendadas:
+            urls += _urls_noticias(set(agendadas), manifesto)
+        urls = list(dict.fromkeys(urls))
+        gerados = _gerar(urls, manifesto) if urls else 0
+    if processando.exists():
+        processando.unlink()
+    return gerados, len(urls)
+
+
+# ========================================
+# MIDDLEWARE
+# ========================================
+
+class PrerenderMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise que, além dos estáticos, entrega as páginas pré-renderizadas a
+    visitantes anônimos. Os arquivos são conferidos a cada requisição (um
+    stat), então as páginas regeneradas valem na hora, sem reiniciar.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self._manifesto = (None, None)
+
+    def _estado(self):
+        """Horizonte, versões do build e se a pasta é gravável; relidos só quando o manifesto muda"""
+        try:
+            modificado = os.stat(diretorio() / ARQUIVO_MANIFESTO).st_mtime_ns
+        except OSError:
+            return None
+        if self._manifesto[0] != modificado:
+            manifesto = ler_manifesto() or {}
+            self._manifesto = (modificado, {
+                'horizonte': parse_datetime(manifesto['horizonte']) if manifesto.get('horizonte') else None,
+                'versoes': manifesto.get('versoes', {}),
+                'somente_leitura': not os.access(diretorio(), os.W_OK),
+            })
+        return self._manifesto[1]
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and visitante_anonimo(request):
+            resposta = self._servir_prerenderizada(request)
+            if resposta is not None:
+                return resposta
+        return super().__call__(request)
+
+    def _servir_prerenderizada(self, request):
+        estado = self._estado()
+        if estado is None:
+            return None
+        horizonte = estado['horizonte']
+        if horizonte and timezone.now() >= horizonte and pagina_de_noticias(request.path_info):
+            # Notícia agendada já no ar: o Django responde pelas páginas de notícias até o worker gerá-las
+            return None
+        if estado['somente_leitura']:
+            # Sem worker para regenerar: a página só vale enquanto nada do que ela mostra mudou
+            tags = tags_da_pagina(request.path_info)
+            if tags and [estado['versoes'].get(tag) for tag in tags] != versoes(tags):
+                return None
+        relativo = arquivo_da_url(request.path_info, query_normalizada(request))
+        if relativo is None:
+            return None
+        try:
+            arquivo = self.get_static_file(str(diretorio() / relativo), request.path_info)
+        except MissingFileError:
+            return None
+
+        resposta = self.serve(arquivo, request)
+        del resposta['Access-Control-Allow-Origin']
+        patch_cache_control(
+            resposta,
+            public=True,
+            max_age=0,
+            s_maxage=settings.CDN_S_MAXAGE,
+            stale_while_revalidate=settings.CDN_STALE_WHILE_REVALIDATE,
+        )
+        resposta['X-Prerender'] = 'HIT'
+
+        detalhe = _DETALHE.fullmatch(request.path_info)
+        if detalhe and resposta.status_code == 200:
+            registrar_visualizacao(int(detalhe.group(1)))
+        return resposta
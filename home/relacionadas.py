@@ -0,0 +1,296 @@
+import bisect
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .busca import termos
+from .cache import invalidar_noticias
+from .models import FrequenciaTermo, Noticia, NoticiaRelacionada, TermoNoticia
+
+
+# Quantas relacionadas ficam guardadas por notícia (a página mostra 3; as
+# demais cobrem as que forem despublicadas até o próximo recálculo)
+TOTAL_RELACIONADAS = 6
+
+# Peso de cada campo no vetor do texto
+PESOS_CAMPOS = {'titulo': 3, 'subtitulo': 2, 'conteudo': 1}
+
+# Composição da pontuação final
+PESO_TEXTO = 0.7
+PESO_CATEGORIA = 0.2
+PESO_RECENCIA = 0.1
+MEIA_VIDA_DIAS = 90
+
+# Termos presentes em mais que essa fração das notícias não ajudam a diferenciar
+FRACAO_MAXIMA_TERMO = 0.5
+
+# Cada notícia é representada só pelos termos de maior peso; mantém as listas
+# invertidas curtas e o recálculo completo perto de linear
+TERMOS_POR_NOTICIA = 30
+
+# Termos maiores que isso (URLs, sequências sem espaço) ficam de fora do vetor
+TAMANHO_MAXIMO_TERMO = 100
+
+# Ids por consulta com IN (o SQLite limita o número de parâmetros)
+TAMANHO_LOTE = 500
+
+
+# ========================================
+# VETORES TF-IDF
+# ========================================
+
+def _contagem(noticia):
+    """Frequência de cada termo da notícia, ponderada pelo campo"""
+    contagem = Counter()
+    for campo, peso in PESOS_CAMPOS.items():
+        for termo in termos(noticia[campo]):
+            if len(termo) <= TAMANHO_MAXIMO_TERMO:
+                contagem[termo] += peso
+    return contagem
+
+
+def _idf(noticias_com_termo, total):
+    """None para termos comuns demais"""
+    if noticias_com_termo > max(1, FRACAO_MAXIMA_TERMO * total) and total >= 4:
+        return None
+    return math.log((1 + total) / (1 + noticias_com_termo)) + 1
+
+
+def _vetor(contagem, idf):
+    """Os TERMOS_POR_NOTICIA termos de maior peso, normalizados"""
+    vetor = {t: (1 + math.log(n)) * idf[t] for t, n in contagem.items() if idf.get(t) is not None}
+    vetor = dict(heapq.nlargest(TERMOS_POR_NOTICIA, vetor.items(), key=lambda item: item[1]))
+    norma = math.sqrt(sum(v * v for v in vetor.values())) or 1.0
+    return {t: v / norma for t, v in vetor.items()}
+
+
+def _pontuacao(similaridade, categoria, data, outra_categoria, outra_data):
+    dias = abs((outra_data - data).total_seconds()) / 86400
+    return (
+        PESO_TEXTO * similaridade
+        + PESO_CATEGORIA * (outra_categoria == categoria)
+        + PESO_RECENCIA * 0.5 ** (dias / MEIA_VIDA_DIAS)
+    )
+
+
+def _melhores(pontuacoes):
+    return heapq.nlargest(TOTAL_RELACIONADAS, pontuacoes.items(), key=lambda item: (item[1], item[0]))
+
+
+def _lotes(ids):
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        yield ids[inicio:inicio + TAMANHO_LOTE]
+
+
+class _Corpus:
+    """Vetores TF-IDF normalizados de todas as notícias publicadas (ou agendadas)"""
+
+    def __init__(self):
+        campos = ('id', 'categoria', 'data_publicacao', *PESOS_CAMPOS)
+        self.categorias = {}
+        self.datas = {}
+        frequencias = {}
+        for noticia in Noticia.objects.filter(publicado=True).values(*campos).iterator(chunk_size=500):
+            frequencias[noticia['id']] = _contagem(noticia)
+            self.categorias[noticia['id']] = noticia['categoria']
+            self.datas[noticia['id']] = noticia['data_publicacao']
+
+        self.total = len(frequencias)
+        self.df = Counter()
+        for contagem in frequencias.values():
+            self.df.update(contagem.keys())
+        idf = {termo: _idf(n, self.total) for termo, n in self.df.items()}
+
+        self.vetores = {}
+        self.postings = defaultdict(list)
+        for noticia_id, contagem in frequencias.items():
+            self.vetores[noticia_id] = _vetor(contagem, idf)
+            for termo, valor in self.vetores[noticia_id].items():
+                self.postings[termo].append((noticia_id, valor))
+
+        # Notícias ordenadas por data (todas e por categoria), para achar as vizinhas no tempo
+        self.por_data = {None: sorted((data, i) for i, data in self.datas.items())}
+        for data, i in self.por_data[None]:
+            self.por_data.setdefault(self.categorias[i], []).append((data, i))
+
+    def _vizinhas(self, noticia_id, chave):
+        """As TOTAL_RELACIONADAS mais próximas no tempo de cada lado"""
+        ordem = self.por_data[chave]
+        posicao = bisect.bisect_left(ordem, (self.datas[noticia_id], noticia_id))
+        inicio = max(0, posicao - TOTAL_RELACIONADAS)
+        return [i for _, i in ordem[inicio:posicao + TOTAL_RELACIONADAS + 1]]
+
+    def pontuacoes(self, noticia_id):
+        """
+        {outro_id: pontuação} das candidatas a entrar no topo: quem tem algum
+        termo em comum e, entre as sem termo em comum (cuja nota depende só de
+        categoria e data), as vizinhas no tempo.
+        """
+        similaridade = defaultdict(float)
+        for termo, valor in self.vetores.get(noticia_id, {}).items():
+            for outro_id, outro_valor in self.postings[termo]:
+                similaridade[outro_id] += valor * outro_valor
+
+        categoria = self.categorias[noticia_id]
+        data = self.datas[noticia_id]
+        candidatas = set(similaridade)
+        candidatas.update(self._vizinhas(noticia_id, None), self._vizinhas(noticia_id, categoria))
+        candidatas.discard(noticia_id)
+        return {
+            outro_id: _pontuacao(
+                similaridade.get(outro_id, 0.0), categoria, data, self.categorias[outro_id], self.datas[outro_id]
+            )
+            for outro_id in candidatas
+        }
+
+
+def _linhas(noticia_id, melhores):
+    return [
+        NoticiaRelacionada(noticia_id=noticia_id, relacionada_id=outro_id, posicao=posicao, pontuacao=pontuacao)
+        for posicao, (outro_id, pontuacao) in enumerate(melhores)
+    ]
+
+
+# ========================================
+# RECÁLCULO
+# ========================================
+
+def recalcular_relacionadas():
+    """
+    Recalcula a tabela inteira (comando calcular_relacionadas) e grava os
+    vetores e o número de notícias por termo usados pela atualização
+    incremental. Retorna o número de notícias
+    """
+    corpus = _Corpus()
+    linhas = []
+    for noticia_id in corpus.vetores:
+        linhas.extend(_linhas(noticia_id, _melhores(corpus.pontuacoes(noticia_id))))
+    termos_noticias = [
+        TermoNoticia(noticia_id=noticia_id, termo=termo, peso=peso)
+        for noticia_id, vetor in corpus.vetores.items()
+        for termo, peso in vetor.items()
+    ]
+    frequencias = [FrequenciaTermo(termo=termo, noticias=n) for termo, n in corpus.df.items()]
+
+    with transaction.atomic():
+        NoticiaRelacionada.objects.all().delete()
+        NoticiaRelacionada.objects.bulk_create(linhas, batch_size=2000)
+        TermoNoticia.objects.all().delete()
+        TermoNoticia.objects.bulk_create(termos_noticias, batch_size=2000)
+        FrequenciaTermo.objects.all().delete()
+        FrequenciaTermo.objects.bulk_create(frequencias, batch_size=2000)
+    invalidar_noticias()
+    return len(corpus.vetores)
+
+
+# ========================================
+# ATUALIZAÇÃO INCREMENTAL
+# ========================================
+# O save de uma notícia não relê o acervo: o vetor dela sai com o idf
+# gravado no último recálculo (termo novo conta como exclusivo dela), as
+# candidatas vêm da lista invertida (TermoNoticia) mais as vizinhas no
+# tempo, e só as listas dessas candidatas são lidas e regravadas. O idf
+# das outras notícias só muda no próximo calcular_relacionadas.
+
+def _vizinhas(noticia, **filtro):
+    """(id, categoria, data) das TOTAL_RELACIONADAS publicadas mais próximas no tempo de cada lado"""
+    outras = Noticia.objects.filter(publicado=True, **filtro).exclude(id=noticia['id'])
+    data = noticia['data_publicacao']
+    campos = ('id', 'categoria', 'data_publicacao')
+    antes = outras.filter(data_publicacao__lte=data).order_by('-data_publicacao', '-id').values_list(*campos)
+    depois = outras.filter(data_publicacao__gt=data).order_by('data_publicacao', 'id').values_list(*campos)
+    return [*antes[:TOTAL_RELACIONADAS], *depois[:TOTAL_RELACIONADAS]]
+
+
+def _atualizar_noticia(noticia_id):
+    """Regrava a lista e os termos da notícia e a das candidatas afetadas. Retorna os ids com lista alterada"""
+    noticia = (
+        Noticia.objects.filter(id=noticia_id, publicado=True)
+        .values('id', 'categoria', 'data_publicacao', *PESOS_CAMPOS)
+        .first()
+    )
+    if noticia is None:
+        # Rascunho ou excluída: a lista e os termos dela somem; nas outras a view já ignora não publicadas
+        with transaction.atomic():
+            NoticiaRelacionada.objects.filter(noticia_id=noticia_id).delete()
+            TermoNoticia.objects.filter(noticia_id=noticia_id).delete()
+        return {noticia_id}
+
+    contagem = _contagem(noticia)
+    total = Noticia.objects.filter(publicado=True).count()
+    df = dict(FrequenciaTermo.objects.filter(termo__in=list(contagem)).values_list('termo', 'noticias'))
+    vetor = _vetor(contagem, {termo: _idf(df.get(termo, 1), total) for termo in contagem})
+
+    similaridade = defaultdict(float)
+    dados = {}
+    postings = (
+        TermoNoticia.objects.filter(termo__in=list(vetor), noticia__publicado=True)
+        .exclude(noticia_id=noticia_id)
+        .values_list('noticia_id', 'termo', 'peso', 'noticia__categoria', 'noticia__data_publicacao')
+    )
+    for outro_id, termo, peso, categoria, data in postings:
+        similaridade[outro_id] += vetor[termo] * peso
+        dados[outro_id] = (categoria, data)
+    for outro_id, categoria, data in [*_vizinhas(noticia), *_vizinhas(noticia, categoria=noticia['categoria'])]:
+        dados[outro_id] = (categoria, data)
+    # Quem já tem a notícia na lista é pontuado de novo (pode sair dela se o texto mudou)
+    com_ela = (
+        NoticiaRelacionada.objects.filter(relacionada_id=noticia_id, noticia__publicado=True)
+        .values_list('noticia_id', 'noticia__categoria', 'noticia__data_publicacao')
+    )
+    for outro_id, categoria, data in com_ela:
+        dados[outro_id] = (categoria, data)
+
+    pontuacoes = {
+        outro_id: _pontuacao(similaridade.get(outro_id, 0.0), noticia['categoria'], noticia['data_publicacao'], *dados[outro_id])
+        for outro_id in dados
+    }
+
+    # Como a pontuação é simétrica, a notícia entra na lista das candidatas onde supera a pior guardada
+    atuais = defaultdict(dict)
+    for lote in _lotes(pontuacoes):
+        for outro_id, relacionada_id, pontuacao in NoticiaRelacionada.objects.filter(noticia_id__in=lote).values_list(
+            'noticia_id', 'relacionada_id', 'pontuacao'
+        ):
+            atuais[outro_id][relacionada_id] = pontuacao
+    atuais[noticia_id] = dict(_melhores(pontuacoes))
+    afetadas = {noticia_id}
+    for outro_id, pontuacao in pontuacoes.items():
+        lista = atuais[outro_id]
+        estava = lista.pop(noticia_id, None) is not None
+        if len(lista) < TOTAL_RELACIONADAS or pontuacao > min(lista.values()):
+            lista[noticia_id] = pontuacao
+        elif not estava:
+            continue
+        # Se a notícia saiu da lista (o texto mudou), ela fica com uma a menos até o próximo recálculo
+        afetadas.add(outro_id)
+
+    linhas = []
+    for outro_id in afetadas:
+        linhas.extend(_linhas(outro_id, _melhores(atuais[outro_id])))
+    with transaction.atomic():
+        for lote in _lotes(afetadas):
+            NoticiaRelacionada.objects.filter(noticia_id__in=lote).delete()
+        NoticiaRelacionada.objects.bulk_create(linhas, batch_size=2000)
+        TermoNoticia.objects.filter(noticia_id=noticia_id).delete()
+        TermoNoticia.objects.bulk_create(
+            [TermoNoticia(noticia_id=noticia_id, termo=termo, peso=peso) for termo, peso in vetor.items()]
+        )
+    return afetadas
+
+
+def atualizar_relacionadas(noticia_ids):
+    """
+    Atualização incremental após salvar notícias: recalcula a lista de cada
+    uma e coloca a notícia na lista das outras onde ela passa a caber.
+    Retorna o número de listas regravadas
+    """
+    afetadas = set()
+    for noticia_id in noticia_ids:
+        afetadas |= _atualizar_noticia(noticia_id)
+    # As listas mudaram depois do save (on_commit): descarta o que foi lido nesse meio-tempo
+    invalidar_noticias()
+    return len(afetadas)
@@ -0,0 +1,142 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import get_random_string
+from django.views.decorators.http import condition
+
+from .cache import (
+    TAG_VOLUNTARIADO,
+    TAG_WORKSHOPS,
+    em_cache,
+    ids_relacionadas,
+    indice_publicadas,
+    versao_deploy,
+    versoes,
+)
+from .cache_paginas import query_normalizada, visitante_anonimo
+from .models import VagaVoluntariado, Workshop
+
+
+# ========================================
+# RESPOSTAS PÚBLICAS (CDN)
+# ========================================
+# Visitantes anônimos sem mensagens pendentes recebem a mesma página, então
+# a resposta pode ficar na borda da Vercel: sem Set-Cookie, sem Vary: Cookie,
+# com s-maxage e stale-while-revalidate. O navegador revalida com
+# ETag/Last-Modified e recebe 304 sem corpo quando nada mudou.
+#
+# O token CSRF dos formulários não vai no HTML dessas páginas: o template
+# tag csrf_publico deixa o campo vazio e o JS do base.html busca o token em
+# /csrf/ no momento do envio.
+
+# Parâmetro acrescentado aos redirects que carregam mensagens
+PARAMETRO_AVISO = 'aviso'
+
+
+def resposta_publica(request):
+    return getattr(request, 'resposta_publica', False)
+
+
+# ========================================
+# ÚLTIMA ALTERAÇÃO POR PÁGINA
+# ========================================
+
+def ultima_alteracao_noticias(request, *args, **kwargs):
+    return indice_publicadas()['ultima_alteracao']
+
+
+def ultima_alteracao_noticia(request, id):
+    """A notícia e as relacionadas exibidas com ela"""
+    alteracoes = indice_publicadas()['alteracoes']
+    if id not in alteracoes:
+        return None
+    return max(alteracoes[i] for i in [id, *ids_relacionadas(id)] if i in alteracoes)
+
+
+def _ultima_alteracao(tag, model, campo):
+    return em_cache(tag, 'ultima_alteracao', lambda: (model.objects.aggregate(ultima=Max(campo))['ultima'], None))
+
+
+def ultima_alteracao_workshops(request):
+    return _ultima_alteracao(TAG_WORKSHOPS, Workshop, 'atualizado_em')
+
+
+def ultima_alteracao_voluntariado(request):
+    return _ultima_alteracao(TAG_VOLUNTARIADO, VagaVoluntariado, 'atualizada_em')
+
+
+# ========================================
+# DECORATOR
+# ========================================
+
+def pagina_publica(*tags, ultima_alteracao=None):
+    """
+    Marca a resposta como pública para visitantes anônimos e responde 304
+    quando o ETag/Last-Modified do cliente ainda vale. O ETag combina a
+    URL normalizada, as versões das `tags`, a versão do deploy e a
+    última alteração; `ultima_alteracao(request, *args, **kwargs)` retorna
+    o datetime mais recente entre os objetos exibidos.
+    """
+    def etag(request, *args, **kwargs):
+        alteracao = ultima_alteracao(request, *args, **kwargs) if ultima_alteracao else None
+        partes = [
+            request.path, query_normalizada(request), versao_deploy(),
+            *(f'{t}={v}' for t, v in zip(tags, versoes(tags))),
+            alteracao.isoformat() if alteracao else '',
+        ]
+        return 'W/"%s"' % hashlib.md5('|'.join(partes).encode()).hexdigest()
+
+    def decorator(view):
+        condicional = condition(etag_func=etag, last_modified_func=ultima_alteracao)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RESPOSTAS_PUBLICAS and request.method in ('GET', 'HEAD') and visitante_anonimo(request):
+                request.resposta_publica = True
+                return condicional(request, *args, **kwargs)
+            # Com sessão/mensagens o HTML muda de um visitante para outro: sem validadores
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ========================================
+# MIDDLEWARE
+# ========================================
+
+class RespostaPublicaMiddleware:
+    """
+    Fica antes de Session/Messages/CSRF no MIDDLEWARE para ver a resposta
+    depois deles: tira o Vary: Cookie que o SessionMiddleware coloca ao ler
+    as mensagens e libera o cache compartilhado, se nenhum cookie foi setado.
+
+    A CDN não olha cookies, então um redirect que deixou mensagem (depois de
+    um POST) ganha um parâmetro único: a página com a mensagem não sai da borda.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        mensagens = getattr(request, '_messages', None)
+        if response.status_code in (301, 302, 303, 307, 308) and getattr(mensagens, 'added_new', False):
+            destino = response['Location']
+            response['Location'] = f"{destino}{'&' if '?' in destino else '?'}{PARAMETRO_AVISO}={get_random_string(8)}"
+        if resposta_publica(request) and response.status_code in (200, 304) and not response.cookies:
+            vary = [v.strip() for v in response.get('Vary', '').split(',') if v.strip() and v.strip().lower() != 'cookie']
+            if vary:
+                response['Vary'] = ', '.join(vary)
+            elif response.has_header('Vary'):
+                del response['Vary']
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=0,
+                s_maxage=settings.CDN_S_MAXAGE,
+                stale_while_revalidate=settings.CDN_STALE_WHILE_REVALIDATE,
+            )
+        return response
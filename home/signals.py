@@ -1,9 +1,37 @@
-from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import CandidaturaVoluntariado, InscricaoWorkshop
+from .busca import indexar_noticias, remover_noticia
+from .cache import TAG_VOLUNTARIADO, TAG_WORKSHOPS, invalidar, invalidar_noticias, versao_invalidada
+from .imagens import preparar_upload
+from .models import CandidaturaVoluntariado, InscricaoWorkshop, Noticia, VagaVoluntariado, Workshop
+from .outbox import enfileirar_email
+from .prerender import URL_VOLUNTARIADO, URL_WORKSHOPS, adiar_noticias, adiar_urls
+from .relacionadas import atualizar_relacionadas
+from .transicoes import mensagem_status_candidatura, mensagem_status_inscricao
+from .vagas import (
+    liberar_vaga_voluntariado,
+    liberar_vaga_workshop,
+    ocupar_vaga_voluntariado,
+    ocupar_vaga_workshop,
+)
 
 print("🔧 Arquivo signals.py foi importado!")
 
+
+def _status_anterior(instance):
+    """
+    Status no banco antes deste save. Instâncias carregadas por queryset já
+    trazem o valor (RastreiaCamposMixin); só objetos montados à mão com pk
+    precisam consultar o banco.
+    """
+    if not instance.pk:
+        return None
+    if hasattr(instance, '_estado_carregado'):
+        return instance.valor_original('status')
+    return type(instance).objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
 # ========================================
 # SIGNALS PARA VOLUNTARIADO
 # ========================================
@@ -11,15 +39,7 @@ print("🔧 Arquivo signals.py foi importado!")
 @receiver(pre_save, sender=CandidaturaVoluntariado)
 def store_old_status_voluntariado(sender, instance, **kwargs):
     """Armazena o status anterior da candidatura"""
-    if instance.pk:
-        try:
-            old_candidatura = CandidaturaVoluntariado.objects.get(pk=instance.pk)
-            instance._old_status = old_candidatura.status
-            print(f"📝 VOLUNTARIADO - Status antigo: '{instance._old_status}'")
-        except CandidaturaVoluntariado.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+    instance._old_status = _status_anterior(instance)
 
 
 @receiver(post_save, sender=CandidaturaVoluntariado)
@@ -41,151 +61,53 @@ def atualizar_vagas_voluntariado(sender, instance, created, **kwargs):
     
     print(f"🔄 VOLUNTARIADO - Mudança: '{old_status}' → '{new_status}'")
     
-    vaga = instance.vaga
-    vaga.refresh_from_db()  # ✅ GARANTIR DADOS ATUALIZADOS
-    
     # Define quais status OCUPAM vaga
     status_ocupam_vaga = ['pendente', 'aprovado', 'em_analise']
     
     # TRANSIÇÃO: Status que ocupa → Recusado (LIBERA VAGA)
     if old_status in status_ocupam_vaga and new_status == 'recusado':
-        print(f"🚀 LIBERANDO VAGA (voluntariado)...")
-        
-        if vaga.vagas_disponiveis < vaga.vagas_totais:  # ✅ VERIFICA SE NÃO ULTRAPASSA
-            vaga.vagas_disponiveis += 1
-            print(f"➕ Vagas: {vaga.vagas_disponiveis - 1} → {vaga.vagas_disponiveis}")
-            
-            # Reabrir vaga se estava fechada
-            if vaga.status == 'fechada' and vaga.vagas_disponiveis > 0:
-                vaga.status = 'aberta'
-                print(f"🔓 Vaga reaberta (fechada → aberta)")
-            
-            vaga.save()
-            print(f"✅ Vaga '{vaga.titulo}' tem {vaga.vagas_disponiveis}/{vaga.vagas_totais} vaga(s) disponível(is)")
+        if liberar_vaga_voluntariado(instance.vaga_id):
+            print(f"➕ Vaga liberada (voluntariado #{instance.vaga_id})")
     
     # TRANSIÇÃO: Recusado → Status que ocupa (OCUPA VAGA)
     elif old_status == 'recusado' and new_status in status_ocupam_vaga:
-        print(f"🚀 OCUPANDO VAGA (voluntariado)...")
-        
-        if vaga.vagas_disponiveis > 0:
-            vaga.vagas_disponiveis -= 1
-            print(f"➖ Vagas: {vaga.vagas_disponiveis + 1} → {vaga.vagas_disponiveis}")
-            
-            # Fechar vaga se esgotou
-            if vaga.vagas_disponiveis <= 0:
-                vaga.status = 'fechada'
-                vaga.vagas_disponiveis = 0
-                print(f"🔒 Vaga fechada (aberta → fechada)")
-            
-            vaga.save()
-            print(f"✅ Vaga '{vaga.titulo}' tem {vaga.vagas_disponiveis}/{vaga.vagas_totais} vaga(s) disponível(is)")
+        if ocupar_vaga_voluntariado(instance.vaga_id):
+            print(f"➖ Vaga ocupada (voluntariado #{instance.vaga_id})")
         else:
             print(f"⚠️ Não há vagas disponíveis para ocupar!")
 
 
-@receiver(pre_delete, sender=CandidaturaVoluntariado)
-def armazenar_antes_excluir_voluntariado(sender, instance, **kwargs):
-    """Armazena dados antes de excluir"""
-    instance._status_antes_excluir = instance.status
-    instance._vaga_antes_excluir = instance.vaga
-    print(f"🗑️ VOLUNTARIADO - Preparando exclusão (status: {instance.status})")
-
-
 @receiver(post_delete, sender=CandidaturaVoluntariado)
 def atualizar_vagas_ao_excluir_voluntariado(sender, instance, **kwargs):
     """Libera vaga ao excluir (se não estava recusada)"""
-    status = getattr(instance, '_status_antes_excluir', None)
-    vaga = getattr(instance, '_vaga_antes_excluir', None)
-    
-    if not vaga:
-        print(f"⚠️ Vaga não encontrada para liberar")
-        return
-    
-    try:
-        # ✅ RECARREGA VAGA DO BANCO
-        from .models import VagaVoluntariado
-        vaga = VagaVoluntariado.objects.get(pk=vaga.pk)
-        
-        # Libera vaga se estava ocupando (não recusada)
-        if status in ['pendente', 'aprovado', 'em_analise']:
-            print(f"🚀 LIBERANDO VAGA (exclusão - status era '{status}')...")
-            
-            if vaga.vagas_disponiveis < vaga.vagas_totais:
-                vaga.vagas_disponiveis += 1
-                
-                if vaga.status == 'fechada' and vaga.vagas_disponiveis > 0:
-                    vaga.status = 'aberta'
-                    print(f"🔓 Vaga reaberta")
-                
-                vaga.save()
-                print(f"✅ EXCLUÍDO - Vaga '{vaga.titulo}' agora tem {vaga.vagas_disponiveis}/{vaga.vagas_totais} vaga(s)")
-            else:
-                print(f"ℹ️ Vaga já estava com total completo: {vaga.vagas_disponiveis}/{vaga.vagas_totais}")
-        else:
-            print(f"ℹ️ Candidatura recusada excluída - vaga mantém {vaga.vagas_disponiveis}/{vaga.vagas_totais}")
-    
-    except Exception as e:
-        print(f"❌ Erro ao liberar vaga: {e}")
+    if instance.status in ['pendente', 'aprovado', 'em_analise']:
+        try:
+            if liberar_vaga_voluntariado(instance.vaga_id):
+                print(f"✅ EXCLUÍDO - Vaga liberada (voluntariado #{instance.vaga_id})")
+        except Exception as e:
+            print(f"❌ Erro ao liberar vaga: {e}")
+    else:
+        print(f"ℹ️ Candidatura recusada excluída - vagas inalteradas")
 
 
 @receiver(post_save, sender=CandidaturaVoluntariado)
 def enviar_emails_voluntariado(sender, instance, created, **kwargs):
-    """Envia emails quando status muda"""
+    """Enfileira emails na caixa de saída quando o status muda"""
     if not created:
         old_status = getattr(instance, '_old_status', None)
         new_status = instance.status
         
-        # Email de recusa
-        if new_status == 'recusado' and old_status != 'recusado':
-            from django.core.mail import send_mail
-            from django.conf import settings
-            
-            try:
-                send_mail(
-                    subject=f'Atualização sobre sua candidatura - {instance.vaga.titulo}',
-                    message=f'''Olá {instance.nome},
-
-Obrigado pelo seu interesse em ser voluntário(a) na vaga de "{instance.vaga.titulo}".
-
-Infelizmente, não poderemos prosseguir com sua candidatura neste momento.
-
-Atenciosamente,
-Instituto Mulheres do Sul Global
-''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[instance.email],
-                    fail_silently=True,
-                )
-                print(f"📧 Email de recusa enviado para {instance.email}")
-            except Exception as e:
-                print(f"❌ Erro ao enviar email de recusa: {e}")
+        if old_status == new_status:
+            return
         
-        # Email de aprovação
-        elif new_status == 'aprovado' and old_status != 'aprovado':
-            from django.core.mail import send_mail
-            from django.conf import settings
-            
+        conteudo = mensagem_status_candidatura(instance.nome, instance.email, instance.vaga.titulo, new_status)
+        if conteudo:
             try:
-                send_mail(
-                    subject=f'Parabéns! Candidatura aprovada - {instance.vaga.titulo}',
-                    message=f'''Olá {instance.nome},
-
-Temos o prazer de informar que sua candidatura para "{instance.vaga.titulo}" foi aprovada!
-
-Entraremos em contato em breve com mais detalhes.
-
-Seja bem-vindo(a) ao nosso time!
-
-Atenciosamente,
-Instituto Mulheres do Sul Global
-''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[instance.email],
-                    fail_silently=True,
-                )
-                print(f"📧 Email de aprovação enviado para {instance.email}")
+                assunto, mensagem, destinatarios = conteudo
+                enfileirar_email(assunto=assunto, mensagem=mensagem, destinatarios=destinatarios)
+                print(f"📧 Email de '{new_status}' enfileirado para {instance.email}")
             except Exception as e:
-                print(f"❌ Erro ao enviar email de aprovação: {e}")
+                print(f"❌ Erro ao enfileirar email: {e}")
 
 
 # ========================================
@@ -195,15 +117,7 @@ Instituto Mulheres do Sul Global
 @receiver(pre_save, sender=InscricaoWorkshop)
 def store_old_status_workshop(sender, instance, **kwargs):
     """Armazena o status anterior da inscrição"""
-    if instance.pk:
-        try:
-            old_inscricao = InscricaoWorkshop.objects.get(pk=instance.pk)
-            instance._old_status = old_inscricao.status
-            print(f"📝 WORKSHOP - Status antigo: '{instance._old_status}'")
-        except InscricaoWorkshop.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+    instance._old_status = _status_anterior(instance)
 
 
 @receiver(post_save, sender=InscricaoWorkshop)
@@ -225,182 +139,170 @@ def atualizar_vagas_workshop(sender, instance, created, **kwargs):
     
     print(f"🔄 WORKSHOP - Mudança: '{old_status}' → '{new_status}'")
     
-    workshop = instance.workshop
-    workshop.refresh_from_db()  # ✅ GARANTIR DADOS ATUALIZADOS
-    
     # Define quais status OCUPAM vaga
     status_ocupam_vaga = ['pendente', 'confirmado']
     
     # TRANSIÇÃO: Status que ocupa → Recusado (LIBERA VAGA)
     if old_status in status_ocupam_vaga and new_status == 'recusado':
-        print(f"🚀 LIBERANDO VAGA (workshop)...")
-        
-        # Verifica se usa vagas_ocupadas ou vagas_disponiveis
-        if hasattr(workshop, 'vagas_ocupadas'):
-            if workshop.vagas_ocupadas > 0:
-                workshop.vagas_ocupadas -= 1
-                print(f"➖ Vagas ocupadas: {workshop.vagas_ocupadas + 1} → {workshop.vagas_ocupadas}")
-                
-                # Reabrir workshop se estava esgotado
-                if workshop.status == 'esgotado' and workshop.vagas_ocupadas < workshop.vagas_totais:
-                    workshop.status = 'disponivel'
-                    print(f"🔓 Workshop reaberto (esgotado → disponível)")
-                
-                workshop.save()
-                print(f"✅ Workshop '{workshop.titulo}' tem {workshop.vagas_disponiveis} vaga(s) disponível(is)")
-        else:
-            # Usa vagas_disponiveis
-            if workshop.vagas_disponiveis < workshop.vagas_totais:
-                workshop.vagas_disponiveis += 1
-                print(f"➕ Vagas disponíveis: {workshop.vagas_disponiveis - 1} → {workshop.vagas_disponiveis}")
-                
-                if workshop.status == 'esgotado':
-                    workshop.status = 'disponivel'
-                    print(f"🔓 Workshop reaberto")
-                
-                workshop.save()
-                print(f"✅ Workshop '{workshop.titulo}' tem {workshop.vagas_disponiveis}/{workshop.vagas_totais} vaga(s)")
+        if liberar_vaga_workshop(instance.workshop_id):
+            print(f"➖ Vaga liberada (workshop #{instance.workshop_id})")
     
     # TRANSIÇÃO: Recusado → Status que ocupa (OCUPA VAGA)
     elif old_status == 'recusado' and new_status in status_ocupam_vaga:
-        print(f"🚀 OCUPANDO VAGA (workshop)...")
-        
-        if hasattr(workshop, 'vagas_ocupadas'):
-            if workshop.vagas_ocupadas < workshop.vagas_totais:
-                workshop.vagas_ocupadas += 1
-                print(f"➕ Vagas ocupadas: {workshop.vagas_ocupadas - 1} → {workshop.vagas_ocupadas}")
-                
-                # Esgotar workshop se atingiu o limite
-                if workshop.vagas_ocupadas >= workshop.vagas_totais:
-                    workshop.status = 'esgotado'
-                    print(f"🔒 Workshop esgotado (disponível → esgotado)")
-                
-                workshop.save()
-                print(f"✅ Workshop '{workshop.titulo}' tem {workshop.vagas_disponiveis} vaga(s) disponível(is)")
+        if ocupar_vaga_workshop(instance.workshop_id):
+            print(f"➕ Vaga ocupada (workshop #{instance.workshop_id})")
         else:
-            if workshop.vagas_disponiveis > 0:
-                workshop.vagas_disponiveis -= 1
-                print(f"➖ Vagas disponíveis: {workshop.vagas_disponiveis + 1} → {workshop.vagas_disponiveis}")
-                
-                if workshop.vagas_disponiveis <= 0:
-                    workshop.status = 'esgotado'
-                    workshop.vagas_disponiveis = 0
-                    print(f"🔒 Workshop esgotado")
-                
-                workshop.save()
-                print(f"✅ Workshop '{workshop.titulo}' tem {workshop.vagas_disponiveis}/{workshop.vagas_totais} vaga(s)")
-
-
-@receiver(pre_delete, sender=InscricaoWorkshop)
-def armazenar_antes_excluir_workshop(sender, instance, **kwargs):
-    """Armazena dados antes de excluir"""
-    instance._workshop_antes_excluir = instance.workshop
-    instance._status_antes_excluir = instance.status
-    print(f"🗑️ WORKSHOP - Preparando exclusão (status: {instance.status})")
+            print(f"⚠️ Não há vagas disponíveis para ocupar!")
 
 
 @receiver(post_delete, sender=InscricaoWorkshop)
 def atualizar_vagas_ao_excluir_workshop(sender, instance, **kwargs):
     """Libera vaga ao excluir (se não estava recusada)"""
-    workshop_ref = getattr(instance, '_workshop_antes_excluir', None)
-    status = getattr(instance, '_status_antes_excluir', None)
-    
-    if not workshop_ref:
-        print(f"⚠️ Workshop não encontrado para liberar")
-        return
-    
-    try:
-        # ✅ RECARREGA WORKSHOP DO BANCO
-        from .models import Workshop
-        workshop = Workshop.objects.get(pk=workshop_ref.pk)
-        
-        # Libera vaga se estava ocupando (não recusada)
-        if status in ['pendente', 'confirmado']:
-            print(f"🚀 LIBERANDO VAGA (exclusão - status era '{status}')...")
-            
-            if hasattr(workshop, 'vagas_ocupadas'):
-                if workshop.vagas_ocupadas > 0:
-                    workshop.vagas_ocupadas -= 1
-                    
-                    if workshop.status == 'esgotado' and workshop.vagas_ocupadas < workshop.vagas_totais:
-                        workshop.status = 'disponivel'
-                        print(f"🔓 Workshop reaberto")
-                    
-                    workshop.save()
-                    print(f"✅ EXCLUÍDO - Workshop '{workshop.titulo}' tem {workshop.vagas_disponiveis} vaga(s)")
-            else:
-                if workshop.vagas_disponiveis < workshop.vagas_totais:
-                    workshop.vagas_disponiveis += 1
-                    
-                    if workshop.status == 'esgotado':
-                        workshop.status = 'disponivel'
-                        print(f"🔓 Workshop reaberto")
-                    
-                    workshop.save()
-                    print(f"✅ EXCLUÍDO - Workshop '{workshop.titulo}' agora tem {workshop.vagas_disponiveis}/{workshop.vagas_totais} vaga(s)")
-        else:
-            print(f"ℹ️ Inscrição recusada excluída - workshop mantém vagas inalteradas")
-    
-    except Exception as e:
-        print(f"❌ Erro ao liberar vaga: {e}")
+    if instance.status in ['pendente', 'confirmado']:
+        try:
+            if liberar_vaga_workshop(instance.workshop_id):
+                print(f"✅ EXCLUÍDO - Vaga liberada (workshop #{instance.workshop_id})")
+        except Exception as e:
+            print(f"❌ Erro ao liberar vaga: {e}")
+    else:
+        print(f"ℹ️ Inscrição recusada excluída - workshop mantém vagas inalteradas")
 
 
 @receiver(post_save, sender=InscricaoWorkshop)
 def enviar_emails_workshop(sender, instance, created, **kwargs):
-    """Envia emails quando status muda"""
+    """Enfileira emails na caixa de saída quando o status muda"""
     if not created:
         old_status = getattr(instance, '_old_status', None)
         new_status = instance.status
         
-        # Email de recusa
-        if new_status == 'recusado' and old_status != 'recusado':
-            from django.core.mail import send_mail
-            from django.conf import settings
-            
-            try:
-                send_mail(
-                    subject=f'Atualização sobre sua inscrição - {instance.workshop.titulo}',
-                    message=f'''Olá {instance.nome},
-
-Obrigado pelo seu interesse no workshop "{instance.workshop.titulo}".
-
-Infelizmente, não poderemos confirmar sua inscrição neste momento.
-
-Atenciosamente,
-Instituto Mulheres do Sul Global
-''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[instance.email],
-                    fail_silently=True,
-                )
-                print(f"📧 Email de recusa enviado para {instance.email}")
-            except Exception as e:
-                print(f"❌ Erro ao enviar email: {e}")
+        if old_status == new_status:
+            return
         
-        # Email de confirmação
-        elif new_status == 'confirmado' and old_status != 'confirmado':
-            from django.core.mail import send_mail
-            from django.conf import settings
-            
+        conteudo = mensagem_status_inscricao(instance.nome, instance.email, instance.workshop.titulo, new_status)
+        if conteudo:
             try:
-                send_mail(
-                    subject=f'Inscrição confirmada - {instance.workshop.titulo}',
-                    message=f'''Olá {instance.nome},
-
-Sua inscrição no workshop "{instance.workshop.titulo}" foi confirmada!
-
-Aguarde mais informações em breve.
-
-Atenciosamente,
-Instituto Mulheres do Sul Global
-''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[instance.email],
-                    fail_silently=True,
-                )
-                print(f"📧 Email de confirmação enviado para {instance.email}")
+                assunto, mensagem, destinatarios = conteudo
+                enfileirar_email(assunto=assunto, mensagem=mensagem, destinatarios=destinatarios)
+                print(f"📧 Email de '{new_status}' enfileirado para {instance.email}")
             except Exception as e:
-                print(f"❌ Erro ao enviar email: {e}")
+                print(f"❌ Erro ao enfileirar email: {e}")
+
+
+# ========================================
+# SIGNALS PARA IMAGENS RESPONSIVAS
+# ========================================
+# No pre_save a imagem recém-enviada ainda não foi gravada: o original é
+# limitado e as derivadas entram na mesma linha. Arquivos que já estavam no
+# storage são processados pelo comando gerar_imagens.
+
+@receiver(pre_save, sender=Noticia)
+@receiver(pre_save, sender=Workshop)
+def gerar_versoes_imagem(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'imagem' not in update_fields:
+        return
+    try:
+        preparar_upload(instance)
+    except Exception as e:
+        print(f"❌ Erro ao preparar imagem: {e}")
+
+
+# ========================================
+# SIGNALS PARA CACHE DE PÁGINAS
+# ========================================
+# As páginas de workshops e voluntariado mostram vagas e status, que mudam
+# com as inscrições/candidaturas. A versão só muda depois do commit, senão
+# uma requisição no meio da transação guardaria a página antiga na versão nova.
+
+@receiver(post_save, sender=Workshop)
+@receiver(post_delete, sender=Workshop)
+@receiver(post_save, sender=InscricaoWorkshop)
+@receiver(post_delete, sender=InscricaoWorkshop)
+def invalidar_paginas_workshops(sender, **kwargs):
+    transaction.on_commit(lambda: invalidar(TAG_WORKSHOPS))
+
+
+@receiver(post_save, sender=VagaVoluntariado)
+@receiver(post_delete, sender=VagaVoluntariado)
+@receiver(post_save, sender=CandidaturaVoluntariado)
+@receiver(post_delete, sender=CandidaturaVoluntariado)
+def invalidar_paginas_voluntariado(sender, **kwargs):
+    transaction.on_commit(lambda: invalidar(TAG_VOLUNTARIADO))
+
+
+# ========================================
+# SIGNALS PARA NOTÍCIAS (CACHE, BUSCA E RELACIONADAS)
+# ========================================
+
+@receiver(post_save, sender=Noticia)
+@receiver(post_delete, sender=Noticia)
+def invalidar_cache_noticias(sender, **kwargs):
+    """Qualquer alteração em notícia descarta facetas e listagens em cache (depois do commit)"""
+    transaction.on_commit(invalidar_noticias)
+
+
+@receiver(post_save, sender=Noticia)
+def indexar_noticia_busca(sender, instance, **kwargs):
+    """Mantém a tabela FTS5 do SQLite em dia (no Postgres o trigger faz isso)"""
+    try:
+        indexar_noticias([instance])
+    except Exception as e:
+        print(f"❌ Erro ao indexar notícia para busca: {e}")
+
+
+@receiver(post_delete, sender=Noticia)
+def remover_noticia_busca(sender, instance, **kwargs):
+    """Remove a notícia excluída do índice de busca"""
+    try:
+        remover_noticia(instance.id)
+    except Exception as e:
+        print(f"❌ Erro ao remover notícia da busca: {e}")
+
+
+def _atualizar_relacionadas(noticia_id):
+    try:
+        atualizar_relacionadas([noticia_id])
+    except Exception as e:
+        print(f"❌ Erro ao atualizar notícias relacionadas: {e}")
+
+
+@receiver(post_save, sender=Noticia)
+def atualizar_noticias_relacionadas(sender, instance, **kwargs):
+    """Recalcula as relacionadas da notícia depois do commit (rascunhos sem lista não custam nada)"""
+    if instance.publicado or instance.relacionadas.exists():
+        transaction.on_commit(lambda: _atualizar_relacionadas(instance.id))
+
+
+# ========================================
+# SIGNALS PARA PÁGINAS PRÉ-RENDERIZADAS
+# ========================================
+# Registrados depois dos de cache e relacionadas: os on_commit rodam na
+# ordem de registro, então as páginas afetadas já saem calculadas com as
+# listas atualizadas. Nada é renderizado aqui: as páginas saem do ar e o
+# worker (prerenderizar --pendentes) gera de novo.
+
+def _adiar_noticias(noticia_id):
+    try:
+        adiar_noticias([noticia_id])
+    except Exception as e:
+        print(f"❌ Erro ao marcar páginas da notícia para regenerar: {e}")
+
+
+@receiver(post_save, sender=Noticia)
+@receiver(post_delete, sender=Noticia)
+def regenerar_paginas_noticia(sender, instance, **kwargs):
+    """Home, páginas da listagem que mudaram, o detalhe da notícia e os detalhes que a exibem"""
+    transaction.on_commit(lambda: _adiar_noticias(instance.id))
+
+
+@receiver(versao_invalidada)
+def regenerar_paginas_vagas(sender, tag, **kwargs):
+    """Workshops e voluntariado mudam também por UPDATE em lote e por inscrições, que só invalidam a tag"""
+    urls = {TAG_WORKSHOPS: [URL_WORKSHOPS], TAG_VOLUNTARIADO: [URL_VOLUNTARIADO]}.get(tag)
+    if urls:
+        try:
+            adiar_urls(urls)
+        except Exception as e:
+            print(f"❌ Erro ao marcar {urls} para regenerar: {e}")
 
 
 print("✅ Todos os signals foram registrados com sucesso!")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from django import template
+
+from home.css_critico import aplicar
+
+
+register = template.Library()
+
+
+class EstilosNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        # context.template é o template da página (home/workshops.html), não o base.html
+        return aplicar(self.nodelist.render(context), context.template.name)
+
+
+@register.tag
+def estilos(parser, token):
+    """
+    {% estilos %}<link rel="stylesheet" ...>{% endestilos %}: com o CSS
+    crítico do template gerado (manage.py css_critico), inline só as regras
+    da primeira tela e carrega os arquivos sem bloquear a renderização.
+    """
+    nodelist = parser.parse(('endestilos',))
+    parser.delete_first_token()
+    return EstilosNode(nodelist)
@@ -0,0 +1,38 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from home.imagens import processada, srcset, url_imagem
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def imagem_responsiva(objeto, alt='', sizes='100vw', classe='', carregamento='lazy'):
+    """
+    <picture> com srcset WebP e JPEG de objeto.imagem, largura/altura (sem
+    salto de layout) e o placeholder borrado como fundo até a imagem chegar.
+    Imagens ainda sem derivadas saem como o <img> de antes.
+    """
+    atributos = [('alt', alt), ('loading', carregamento), ('decoding', 'async')]
+    if classe:
+        atributos.append(('class', classe))
+    if carregamento == 'eager':
+        # Imagem principal da página (LCP)
+        atributos.append(('fetchpriority', 'high'))
+    if objeto.imagem_largura and objeto.imagem_altura:
+        atributos += [('width', objeto.imagem_largura), ('height', objeto.imagem_altura)]
+
+    if not processada(objeto):
+        return format_html('<img src="{}" {}>', objeto.imagem.url, _atributos(atributos))
+
+    if objeto.imagem_placeholder:
+        atributos.append(('style', f"background:url('{objeto.imagem_placeholder}') center/cover no-repeat"))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        srcset(objeto, 'webp'), sizes, url_imagem(objeto), srcset(objeto, 'jpg'), sizes, _atributos(atributos),
+    )
+
+
+def _atributos(pares):
+    return format_html_join(' ', '{}="{}"', pares)
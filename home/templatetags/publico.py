@@ -0,0 +1,19 @@
+from django import template
+from django.utils.html import format_html
+
+from home.respostas_publicas import resposta_publica
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def csrf_publico(context):
+    """
+    {% csrf_token %} que não amarra a página a um visitante: em respostas
+    públicas o campo vai vazio e é preenchido pelo JS do base.html no envio.
+    """
+    request = context.get('request')
+    if request is not None and resposta_publica(request):
+        return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="" data-csrf-publico>')
+    return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', context.get('csrf_token', ''))
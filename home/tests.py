@@ -1,3 +1,465 @@
-from django.test import TestCase
+import datetime
+import smtplib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    CampanhaNewsletter,
+    CandidaturaVoluntariado,
+    EmailSaida,
+    EnvioNewsletter,
+    InscricaoWorkshop,
+    NewsletterSubscriber,
+    Noticia,
+    VagaVoluntariado,
+    VisualizacaoDiaria,
+    Workshop,
+)
+from . import visualizacoes
+from .busca import buscar_noticias
+from .cache import TAG_WORKSHOPS, campos_alteracao, invalidar, versao, versao_do_banco
+from .estaticos import EstaticosComHash
+from .newsletter import processar_campanha, reenviar_falhas
+from .outbox import MAX_TENTATIVAS, enfileirar_email, processar_fila
+from .transicoes import transicionar_candidaturas, transicionar_inscricoes
+from .vagas import (
+    InscricaoDuplicada,
+    VagasEsgotadas,
+    divergencias_voluntariado,
+    divergencias_workshops,
+    reservar_vaga_voluntariado,
+    reservar_vaga_workshop,
+)
+
+
+def criar_workshop(vagas=2, **campos):
+    hoje = datetime.date.today()
+    return Workshop.objects.create(**{
+        'titulo': 'Workshop', 'descricao': '-', 'data_inicio': hoje, 'data_fim': hoje, 'carga_horaria': 1,
+        'numero_encontros': 1, 'nivel': 'todos', 'vagas_totais': vagas, 'gratuito': True, **campos,
+    })
+
+
+def criar_vaga(vagas=2, **campos):
+    return VagaVoluntariado.objects.create(**{
+        'titulo': 'Vaga', 'descricao': '-', 'requisitos': '-', 'tipo': 'remoto', 'horas_semanais': 1,
+        'duracao_minima': '-', 'vagas_totais': vagas, 'vagas_disponiveis': vagas, **campos,
+    })
+
+
+def inscrever(workshop, email):
+    return reservar_vaga_workshop(workshop.id, nome='Pessoa', email=email, telefone='0', experiencia='nenhuma')
+
+
+def candidatar(vaga, email):
+    return reservar_vaga_voluntariado(vaga.id, nome='Pessoa', email=email, telefone='0', motivacao='-')
+
+
+# ========================================
+# RESERVA DE VAGAS
+# ========================================
+
+class ReservaConcorrenteTests(TransactionTestCase):
+    """Inscrições simultâneas nunca passam do total de vagas"""
+
+    vagas = 5
+    tentativas = 20
+
+    def _disparar(self, reservar):
+        """Roda `reservar(i)` em paralelo; retorna (aceitas, esgotadas, outros erros)"""
+        resultados = {'ok': 0, 'esgotado': 0}
+        erros = []
+        lock = threading.Lock()
+        largada = threading.Barrier(self.tentativas)
+
+        def tentar(i):
+            try:
+                largada.wait(timeout=10)
+                reservar(i)
+                chave = 'ok'
+            except VagasEsgotadas:
+                chave = 'esgotado'
+            except Exception as erro:
+                chave = None
+                with lock:
+                    erros.append(erro)
+            finally:
+                connection.close()
+            if chave:
+                with lock:
+                    resultados[chave] += 1
+
+        with ThreadPoolExecutor(max_workers=self.tentativas) as executor:
+            list(executor.map(tentar, range(self.tentativas)))
+        return resultados['ok'], resultados['esgotado'], erros
+
+    def test_workshop_sem_overbooking(self):
+        workshop = criar_workshop(self.vagas)
+
+        aceitas, esgotadas, erros = self._disparar(lambda i: inscrever(workshop, f'pessoa{i}@example.com'))
+
+        self.assertEqual(erros, [])
+        self.assertEqual(aceitas, self.vagas)
+        self.assertEqual(esgotadas, self.tentativas - self.vagas)
+        workshop.refresh_from_db()
+        self.assertEqual(InscricaoWorkshop.objects.filter(workshop=workshop).count(), self.vagas)
+        self.assertEqual(workshop.vagas_ocupadas, self.vagas)
+        self.assertEqual(workshop.status, 'esgotado')
+
+    def test_voluntariado_sem_overbooking(self):
+        vaga = criar_vaga(self.vagas)
+
+        aceitas, esgotadas, erros = self._disparar(lambda i: candidatar(vaga, f'pessoa{i}@example.com'))
+
+        self.assertEqual(erros, [])
+        self.assertEqual(aceitas, self.vagas)
+        self.assertEqual(esgotadas, self.tentativas - self.vagas)
+        vaga.refresh_from_db()
+        self.assertEqual(CandidaturaVoluntariado.objects.filter(vaga=vaga).count(), self.vagas)
+        self.assertEqual(vaga.vagas_disponiveis, 0)
+        self.assertEqual(vaga.vagas_ocupadas, self.vagas)
+        self.assertEqual(vaga.status, 'fechada')
+
+
+class ReservaTests(TestCase):
+
+    def test_workshop_esgota_e_recusa_duplicada(self):
+        workshop = criar_workshop(vagas=2)
+        inscrever(workshop, 'a@example.com')
+
+        with self.assertRaises(InscricaoDuplicada):
+            inscrever(workshop, 'a@example.com')
+        workshop.refresh_from_db()
+        # A reserva da duplicada foi desfeita junto com a inscrição
+        self.assertEqual((workshop.vagas_ocupadas, workshop.status), (1, 'disponivel'))
+
+        inscrever(workshop, 'b@example.com')
+        with self.assertRaises(VagasEsgotadas):
+            inscrever(workshop, 'c@example.com')
+        workshop.refresh_from_db()
+        self.assertEqual((workshop.vagas_ocupadas, workshop.status), (2, 'esgotado'))
+
+    def test_voluntariado_fecha_e_recusa_duplicada(self):
+        vaga = criar_vaga(vagas=1)
+        candidatar(vaga, 'a@example.com')
+
+        with self.assertRaises(VagasEsgotadas):
+            candidatar(vaga, 'b@example.com')
+        vaga.refresh_from_db()
+        self.assertEqual((vaga.vagas_disponiveis, vaga.vagas_ocupadas, vaga.status), (0, 1, 'fechada'))
+
+        vaga.status = 'aberta'
+        vaga.vagas_totais = vaga.vagas_disponiveis = 2
+        vaga.save()
+        with self.assertRaises(InscricaoDuplicada):
+            candidatar(vaga, 'a@example.com')
+        vaga.refresh_from_db()
+        self.assertEqual((vaga.vagas_disponiveis, vaga.vagas_ocupadas), (2, 1))
+
+
+# ========================================
+# TRANSIÇÕES DE STATUS
+# ========================================
+
+class TransicoesTests(TestCase):
+
+    def test_inscricoes_liberam_e_ocupam_vagas(self):
+        workshop = criar_workshop(vagas=2)
+        primeira = inscrever(workshop, 'a@example.com')
+        inscrever(workshop, 'b@example.com')
+        EmailSaida.objects.all().delete()
+
+        inscricoes = InscricaoWorkshop.objects.filter(pk=primeira.pk)
+        self.assertEqual(transicionar_inscricoes(inscricoes, 'recusado'), 1)
+        workshop.refresh_from_db()
+        self.assertEqual((workshop.vagas_ocupadas, workshop.status), (1, 'disponivel'))
+        self.assertEqual(EmailSaida.objects.get().destinatarios, ['a@example.com'])
+
+        # Repetir a mesma transição não muda nada nem reenvia o aviso
+        self.assertEqual(transicionar_inscricoes(inscricoes, 'recusado'), 0)
+        self.assertEqual(EmailSaida.objects.count(), 1)
+
+        self.assertEqual(transicionar_inscricoes(inscricoes, 'confirmado'), 1)
+        workshop.refresh_from_db()
+        self.assertEqual((workshop.vagas_ocupadas, workshop.status), (2, 'esgotado'))
+        self.assertEqual(list(divergencias_workshops()), [])
+
+    def test_candidaturas_em_lote(self):
+        vaga = criar_vaga(vagas=2)
+        candidatar(vaga, 'a@example.com')
+        candidatar(vaga, 'b@example.com')
+        vaga.refresh_from_db()
+        self.assertEqual(vaga.status, 'fechada')
+
+        self.assertEqual(transicionar_candidaturas(CandidaturaVoluntariado.objects.all(), 'recusado'), 2)
+        vaga.refresh_from_db()
+        self.assertEqual((vaga.vagas_disponiveis, vaga.vagas_ocupadas, vaga.status), (2, 0, 'aberta'))
+        self.assertEqual(list(divergencias_voluntariado()), [])
+
+    def test_save_individual_ajusta_contadores(self):
+        workshop = criar_workshop(vagas=1)
+        inscricao = inscrever(workshop, 'a@example.com')
+
+        inscricao.status = 'recusado'
+        inscricao.save()
+        workshop.refresh_from_db()
+        self.assertEqual((workshop.vagas_ocupadas, workshop.status), (0, 'disponivel'))
+
+        inscricao.delete()
+        workshop.refresh_from_db()
+        self.assertEqual(workshop.vagas_ocupadas, 0)
+
+
+# ========================================
+# CAIXA DE SAÍDA
+# ========================================
+
+class OutboxTests(TestCase):
+
+    def test_falha_reagenda_com_backoff_ate_esgotar(self):
+        email = enfileirar_email('Assunto', 'Texto', ['a@example.com'])
+
+        erro = smtplib.SMTPServerDisconnected('caiu')
+        self.assertEqual(processar_fila(connection=ConexaoInstavel([erro])), (0, 1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), ('pendente', 1))
+        self.assertGreater(email.proxima_tentativa_em, timezone.now())
+
+        # Ainda no backoff: não é reservado
+        self.assertEqual(processar_fila(connection=ConexaoInstavel([])), (0, 0, 0))
+
+        EmailSaida.objects.filter(pk=email.pk).update(
+            tentativas=MAX_TENTATIVAS - 1, proxima_tentativa_em=timezone.now()
+        )
+        self.assertEqual(processar_fila(connection=ConexaoInstavel([erro])), (0, 0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'falhou')
+
+    def test_envio_marca_enviado(self):
+        email = enfileirar_email('Assunto', 'Texto', ['a@example.com'], html='<p>Texto</p>')
+
+        self.assertEqual(processar_fila(connection=ConexaoInstavel([])), (1, 0, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), ('enviado', 1))
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Texto</p>', 'text/html')])
+
+
+# ========================================
+# INVALIDAÇÃO DE CACHE
+# ========================================
+
+@override_settings(PRERENDER_DIR=tempfile.gettempdir() + '/prerender-testes-inexistente', CACHE_PAGINAS=True)
+class CacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_versao_vem_do_banco(self):
+        workshop = criar_workshop()
+        antes = versao(TAG_WORKSHOPS)
+        # Outro processo (cache vazio) chega ao mesmo número
+        cache.clear()
+        self.assertEqual(versao(TAG_WORKSHOPS), antes)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            workshop.titulo = 'Outro título'
+            workshop.save()
+        self.assertNotEqual(versao(TAG_WORKSHOPS), antes)
+        self.assertEqual(versao(TAG_WORKSHOPS), versao_do_banco(TAG_WORKSHOPS))
+
+    def test_update_em_lote_com_campos_alteracao(self):
+        criar_workshop()
+        antes = versao(TAG_WORKSHOPS)
+        Workshop.objects.update(status='encerrado', **campos_alteracao(Workshop))
+        invalidar(TAG_WORKSHOPS)
+        self.assertNotEqual(versao(TAG_WORKSHOPS), antes)
+
+    def test_pagina_em_cache_ate_a_invalidacao(self):
+        workshop = criar_workshop(titulo='Primeiro título')
+
+        primeira = self.client.get('/workshops/')
+        self.assertEqual(primeira['X-Cache'], 'MISS')
+        segunda = self.client.get('/workshops/')
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.content, primeira.content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            workshop.titulo = 'Título novo'
+            workshop.save()
+        terceira = self.client.get('/workshops/')
+        self.assertEqual(terceira['X-Cache'], 'MISS')
+        self.assertContains(terceira, 'Título novo')
+
+
+# ========================================
+# NEWSLETTER
+# ========================================
+
+class ConexaoInstavel(EmailBackend):
+    """Backend em memória que levanta os erros da fila `erros` (None = envia)"""
+
+    def __init__(self, erros, **kwargs):
+        super().__init__(**kwargs)
+        self.erros = list(erros)
+
+    def send_messages(self, messages):
+        erro = self.erros.pop(0) if self.erros else None
+        if erro:
+            raise erro
+        return super().send_messages(messages)
+
+
+class NewsletterTests(TestCase):
+
+    def setUp(self):
+        noticia = Noticia.objects.create(titulo='Notícia', conteudo='Texto', publicado=True)
+        self.campanha = CampanhaNewsletter.objects.create(noticia=noticia)
+        for i in range(3):
+            NewsletterSubscriber.objects.create(email=f'inscrito{i}@example.com')
+
+    def _status(self):
+        return list(EnvioNewsletter.objects.order_by('id').values_list('status', flat=True))
+
+    def test_envia_todos_e_conclui(self):
+        enviados, falhas = processar_campanha(self.campanha, connection=ConexaoInstavel([]))
+
+        self.assertEqual((enviados, falhas), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.campanha.refresh_from_db()
+        self.assertEqual(self.campanha.status, 'concluida')
+
+    def test_queda_de_conexao_adia_e_interrompe_o_lote(self):
+        conexao = ConexaoInstavel([None, smtplib.SMTPServerDisconnected('caiu')])
+        enviados, falhas = processar_campanha(self.campanha, connection=conexao)
+
+        self.assertEqual((enviados, falhas), (1, 0))
+        self.assertEqual(self._status(), ['enviado', 'pendente', 'pendente'])
+        adiado = EnvioNewsletter.objects.order_by('id')[1]
+        self.assertEqual(adiado.tentativas, 1)
+        self.assertGreater(adiado.proxima_tentativa_em, timezone.now())
+        # O restante do lote não fica preso na reserva
+        self.assertIsNone(EnvioNewsletter.objects.order_by('id')[2].reservado_em)
+        self.campanha.refresh_from_db()
+        self.assertEqual(self.campanha.status, 'enviando')
+
+        # Antes do backoff só sai quem não estava adiado
+        processar_campanha(self.campanha, connection=ConexaoInstavel([]))
+        self.assertEqual(self._status(), ['enviado', 'pendente', 'enviado'])
+
+        EnvioNewsletter.objects.filter(status='pendente').update(proxima_tentativa_em=timezone.now())
+        processar_campanha(self.campanha, connection=ConexaoInstavel([]))
+        self.assertEqual(self._status(), ['enviado', 'enviado', 'enviado'])
+        self.campanha.refresh_from_db()
+        self.assertEqual(self.campanha.status, 'concluida')
+
+    def test_recusa_do_destinatario_falha_e_reenviar_falhas_reabre(self):
+        recusa = smtplib.SMTPRecipientsRefused({'inscrito0@example.com': (550, b'nao existe')})
+        enviados, falhas = processar_campanha(self.campanha, connection=ConexaoInstavel([recusa]))
+
+        self.assertEqual((enviados, falhas), (2, 1))
+        self.assertEqual(self._status(), ['falhou', 'enviado', 'enviado'])
+        self.campanha.refresh_from_db()
+        self.assertEqual(self.campanha.status, 'concluida')
+
+        self.assertEqual(reenviar_falhas(CampanhaNewsletter.objects.all()), 1)
+        self.campanha.refresh_from_db()
+        self.assertEqual((self.campanha.status, self.campanha.total_falhas), ('enviando', 0))
+
+        processar_campanha(self.campanha, connection=ConexaoInstavel([]))
+        self.campanha.refresh_from_db()
+        self.assertEqual(self._status(), ['enviado', 'enviado', 'enviado'])
+        self.assertEqual((self.campanha.status, self.campanha.total_enviados), ('concluida', 3))
+
+
+# ========================================
+# VISUALIZAÇÕES
+# ========================================
+
+class VisualizacoesTests(TestCase):
+
+    def setUp(self):
+        self.noticia = Noticia.objects.create(titulo='Notícia', conteudo='Texto', publicado=True)
+        visualizacoes.descarregar_visualizacoes()
+
+    def tearDown(self):
+        visualizacoes._retirar_buffer()
+
+    def test_fim_da_requisicao_descarrega_apos_o_intervalo(self):
+        visualizacoes.registrar_visualizacao(self.noticia.id)
+        visualizacoes.registrar_visualizacao(self.noticia.id)
+
+        visualizacoes._descarregar_ao_fim_da_requisicao(sender=None)
+        self.noticia.refresh_from_db()
+        self.assertEqual(self.noticia.visualizacoes, 0)
+
+        with mock.patch.object(visualizacoes, '_ultima_descarga', visualizacoes._ultima_descarga - visualizacoes.INTERVALO_DESCARGA):
+            visualizacoes._descarregar_ao_fim_da_requisicao(sender=None)
+        self.noticia.refresh_from_db()
+        self.assertEqual(self.noticia.visualizacoes, 2)
+        self.assertEqual(VisualizacaoDiaria.objects.get(noticia=self.noticia).total, 2)
+
+    def test_buffer_cheio_descarrega_na_hora(self):
+        with mock.patch.object(visualizacoes, 'LIMITE_BUFFER', 3):
+            for _ in range(3):
+                visualizacoes.registrar_visualizacao(self.noticia.id)
+        self.noticia.refresh_from_db()
+        self.assertEqual(self.noticia.visualizacoes, 3)
+
+
+# ========================================
+# BUSCA
+# ========================================
+
+class BuscaTests(TestCase):
+
+    def setUp(self):
+        self.titulo = Noticia.objects.create(titulo='Formação de lideranças', conteudo='Encontro anual', publicado=True)
+        self.conteudo = Noticia.objects.create(titulo='Encontro', conteudo='Sobre a formação de jovens', publicado=True)
+        Noticia.objects.create(titulo='Parceria', conteudo='Nada a ver', publicado=True)
+
+    def _ids(self, busca):
+        return list(
+            buscar_noticias(Noticia.objects.all(), busca).order_by('-relevancia', '-id').values_list('id', flat=True)
+        )
+
+    def test_radical_sem_acento_e_peso_do_titulo(self):
+        # "formacoes" casa com "Formação"; o título pesa mais que o conteúdo
+        self.assertEqual(self._ids('formacoes'), [self.titulo.id, self.conteudo.id])
+
+    def test_todos_os_termos_sao_obrigatorios(self):
+        self.assertEqual(self._ids('formação jovens'), [self.conteudo.id])
+        self.assertEqual(self._ids('inexistente'), [])
+        self.assertEqual(self._ids('  '), [])
+
+    def test_edicao_e_exclusao_atualizam_o_indice(self):
+        self.conteudo.conteudo = 'Sem o termo'
+        self.conteudo.save()
+        self.titulo.delete()
+        self.assertEqual(self._ids('formação'), [])
+
+
+# ========================================
+# ESTÁTICOS
+# ========================================
+
+class EstaticosTests(SimpleTestCase):
+
+    def test_referencia_ausente_fica_sem_hash_e_avisa_uma_vez(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            storage = EstaticosComHash(location=pasta, base_url='/static/')
+            storage.hashed_files = {'style.css': 'style.3f2a9c1b0d4e.css'}
+            with self.assertLogs('home.estaticos', 'WARNING') as avisos:
+                self.assertEqual(storage.url('nada.png'), '/static/nada.png')
+                self.assertEqual(storage.url('nada.png'), '/static/nada.png')
+        self.assertEqual(len(avisos.output), 1)
+        self.assertIn('nada.png', avisos.output[0])
@@ -0,0 +1,130 @@
+from django.db import transaction
+
+from .models import VagaVoluntariado, Workshop
+from .outbox import enfileirar_emails
+from .vagas import recalcular_vagas_voluntariado, recalcular_vagas_workshops
+
+
+# ========================================
+# MENSAGENS DE MUDANÇA DE STATUS
+# ========================================
+
+def mensagem_status_inscricao(nome, email, workshop_titulo, status):
+    """Retorna (assunto, mensagem, destinatarios) do aviso ao participante, ou None"""
+    if status == 'recusado':
+        return (
+            f'Atualização sobre sua inscrição - {workshop_titulo}',
+            f'''Olá {nome},
+
+Obrigado pelo seu interesse no workshop "{workshop_titulo}".
+
+Infelizmente, não poderemos confirmar sua inscrição neste momento.
+
+Atenciosamente,
+Instituto Mulheres do Sul Global
+''',
+            [email],
+        )
+    if status == 'confirmado':
+        return (
+            f'Inscrição confirmada - {workshop_titulo}',
+            f'''Olá {nome},
+
+Sua inscrição no workshop "{workshop_titulo}" foi confirmada!
+
+Aguarde mais informações em breve.
+
+Atenciosamente,
+Instituto Mulheres do Sul Global
+''',
+            [email],
+        )
+    return None
+
+
+def mensagem_status_candidatura(nome, email, vaga_titulo, status):
+    """Retorna (assunto, mensagem, destinatarios) do aviso ao candidato, ou None"""
+    if status == 'recusado':
+        return (
+            f'Atualização sobre sua candidatura - {vaga_titulo}',
+            f'''Olá {nome},
+
+Obrigado pelo seu interesse em ser voluntário(a) na vaga de "{vaga_titulo}".
+
+Infelizmente, não poderemos prosseguir com sua candidatura neste momento.
+
+Atenciosamente,
+Instituto Mulheres do Sul Global
+''',
+            [email],
+        )
+    if status == 'aprovado':
+        return (
+            f'Parabéns! Candidatura aprovada - {vaga_titulo}',
+            f'''Olá {nome},
+
+Temos o prazer de informar que sua candidatura para "{vaga_titulo}" foi aprovada!
+
+Entraremos em contato em breve com mais detalhes.
+
+Seja bem-vindo(a) ao nosso time!
+
+Atenciosamente,
+Instituto Mulheres do Sul Global
+''',
+            [email],
+        )
+    return None
+
+
+# ========================================
+# TRANSIÇÕES EM LOTE
+# ========================================
+
+def _transicionar(queryset, novo_status, campo_oferta, mensagem, recalcular, ofertas):
+    """
+    Aplica novo_status a todas as linhas do queryset com número constante de
+    queries: 1 SELECT, 1 UPDATE, 1 UPDATE agregado nos contadores e 1 INSERT
+    em lote na caixa de saída. Os signals de post_save não são disparados;
+    este serviço faz o trabalho deles para o conjunto inteiro.
+    """
+    with transaction.atomic():
+        linhas = list(
+            queryset.exclude(status=novo_status)
+            .select_for_update(of=('self',))
+            .order_by()
+            .values_list('id', f'{campo_oferta}_id', f'{campo_oferta}__titulo', 'nome', 'email')
+        )
+        if not linhas:
+            return 0
+
+        ids = [linha[0] for linha in linhas]
+        queryset.model.objects.filter(id__in=ids).update(status=novo_status)
+
+        recalcular(ofertas.filter(id__in={linha[1] for linha in linhas}))
+
+        emails = []
+        for _, _, titulo, nome, email in linhas:
+            conteudo = mensagem(nome, email, titulo, novo_status)
+            if conteudo:
+                emails.append(conteudo)
+        if emails:
+            enfileirar_emails(emails)
+
+    return len(linhas)
+
+
+def transicionar_inscricoes(queryset, novo_status):
+    """Muda o status de várias inscrições e ajusta as vagas dos workshops afetados"""
+    return _transicionar(
+        queryset, novo_status, 'workshop', mensagem_status_inscricao,
+        recalcular_vagas_workshops, Workshop.objects.all(),
+    )
+
+
+def transicionar_candidaturas(queryset, novo_status):
+    """Muda o status de várias candidaturas e ajusta as vagas de voluntariado afetadas"""
+    return _transicionar(
+        queryset, novo_status, 'vaga', mensagem_status_candidatura,
+        recalcular_vagas_voluntariado, VagaVoluntariado.objects.all(),
+    )
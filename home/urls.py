@@ -11,5 +11,6 @@ urlpatterns = [
     path('voluntariado/candidatura/', views.voluntariado_candidatura, name='voluntariado_candidatura'),
     path('contato/', views.contato, name='contato'),
     path('doacao/', views.doacao, name='doacao'),
+    path('csrf/', views.csrf_token, name='csrf_token'),
     path('newsletter/cancelar/<str:token>/', views.cancelar_newsletter, name='cancelar_newsletter'),
 ]
\ No newline at end of file
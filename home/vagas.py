@@ -0,0 +1,243 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from .cache import TAG_VOLUNTARIADO, TAG_WORKSHOPS, invalidar
+from .models import CandidaturaVoluntariado, InscricaoWorkshop, VagaVoluntariado, Workshop
+
+
+class VagasEsgotadas(Exception):
+    """Não há mais vagas (ou a oferta não está aberta)"""
+
+
+class InscricaoDuplicada(Exception):
+    """O email já está inscrito/candidatado nesta oferta"""
+
+
+# ========================================
+# WORKSHOPS
+# ========================================
+
+def reservar_vaga_workshop(workshop_id, **dados):
+    """
+    Ocupa uma vaga e cria a inscrição na mesma transação.
+
+    A vaga é tomada com um UPDATE condicional (vagas_ocupadas < vagas_totais),
+    que o banco executa de forma atômica: requisições concorrentes nunca
+    ultrapassam o total. Se a inscrição falhar, o incremento é desfeito.
+    """
+    try:
+        with transaction.atomic():
+            reservadas = Workshop.objects.filter(
+                pk=workshop_id,
+                status='disponivel',
+                vagas_ocupadas__lt=F('vagas_totais'),
+            ).update(vagas_ocupadas=F('vagas_ocupadas') + 1, atualizado_em=Now())
+
+            if not reservadas:
+                raise VagasEsgotadas()
+
+            inscricao = InscricaoWorkshop.objects.create(workshop_id=workshop_id, **dados)
+
+            Workshop.objects.filter(
+                pk=workshop_id, vagas_ocupadas__gte=F('vagas_totais')
+            ).update(status='esgotado', atualizado_em=Now())
+    except IntegrityError:
+        # Só o unique_together (workshop, email) vira InscricaoDuplicada; NOT NULL, FK etc. sobem como estão
+        if InscricaoWorkshop.objects.filter(workshop_id=workshop_id, email=dados.get('email')).exists():
+            raise InscricaoDuplicada()
+        raise
+
+    return inscricao
+
+
+# ========================================
+# VOLUNTARIADO
+# ========================================
+
+def reservar_vaga_voluntariado(vaga_id, **dados):
+    """Mesma estratégia de reservar_vaga_workshop, decrementando vagas_disponiveis"""
+    with transaction.atomic():
+        reservadas = VagaVoluntariado.objects.filter(
+            pk=vaga_id,
+            status='aberta',
+            vagas_disponiveis__gt=0,
+        ).update(
+            vagas_disponiveis=F('vagas_disponiveis') - 1,
+            vagas_ocupadas=F('vagas_ocupadas') + 1,
+            atualizada_em=Now(),
+        )
+
+        if not reservadas:
+            raise VagasEsgotadas()
+
+        # O UPDATE acima trava a linha da vaga até o commit, então esta
+        # verificação não corre contra outra candidatura do mesmo email
+        if CandidaturaVoluntariado.objects.filter(vaga_id=vaga_id, email=dados.get('email')).exists():
+            raise InscricaoDuplicada()
+
+        candidatura = CandidaturaVoluntariado.objects.create(vaga_id=vaga_id, **dados)
+
+        VagaVoluntariado.objects.filter(
+            pk=vaga_id, vagas_disponiveis__lte=0
+        ).update(status='fechada', atualizada_em=Now())
+
+    return candidatura
+
+
+# ========================================
+# AJUSTE UNITÁRIO DOS CONTADORES
+# ========================================
+# Usados pelos signals quando uma inscrição/candidatura muda de status ou é
+# excluída. Cada função é um único UPDATE com F(): o banco aplica o ajuste
+# sobre o valor atual, sem precisar recarregar o objeto pai. No SET, os F()
+# se referem aos valores anteriores ao UPDATE.
+
+def liberar_vaga_workshop(workshop_id):
+    """Devolve uma vaga e reabre o workshop se estava esgotado"""
+    return Workshop.objects.filter(pk=workshop_id, vagas_ocupadas__gt=0).update(
+        vagas_ocupadas=F('vagas_ocupadas') - 1,
+        atualizado_em=Now(),
+        status=Case(
+            When(status='esgotado', vagas_totais__gt=F('vagas_ocupadas') - 1, then=Value('disponivel')),
+            default=F('status'),
+        ),
+    )
+
+
+def ocupar_vaga_workshop(workshop_id):
+    """Ocupa uma vaga e esgota o workshop ao atingir o total"""
+    return Workshop.objects.filter(pk=workshop_id, vagas_ocupadas__lt=F('vagas_totais')).update(
+        vagas_ocupadas=F('vagas_ocupadas') + 1,
+        atualizado_em=Now(),
+        status=Case(
+            When(status='disponivel', vagas_totais__lte=F('vagas_ocupadas') + 1, then=Value('esgotado')),
+            default=F('status'),
+        ),
+    )
+
+
+def liberar_vaga_voluntariado(vaga_id):
+    """Devolve uma vaga e reabre a vaga de voluntariado se estava fechada"""
+    return VagaVoluntariado.objects.filter(pk=vaga_id, vagas_disponiveis__lt=F('vagas_totais')).update(
+        vagas_disponiveis=F('vagas_disponiveis') + 1,
+        vagas_ocupadas=F('vagas_ocupadas') - 1,
+        atualizada_em=Now(),
+        status=Case(
+            When(status='fechada', then=Value('aberta')),
+            default=F('status'),
+        ),
+    )
+
+
+def ocupar_vaga_voluntariado(vaga_id):
+    """Ocupa uma vaga e fecha a vaga de voluntariado quando acabam as vagas"""
+    return VagaVoluntariado.objects.filter(pk=vaga_id, vagas_disponiveis__gt=0).update(
+        vagas_disponiveis=F('vagas_disponiveis') - 1,
+        vagas_ocupadas=F('vagas_ocupadas') + 1,
+        atualizada_em=Now(),
+        status=Case(
+            When(vagas_disponiveis__lte=1, then=Value('fechada')),
+            default=F('status'),
+        ),
+    )
+
+
+# ========================================
+# RECÁLCULO EM LOTE DOS CONTADORES
+# ========================================
+
+def _ativas_subquery(model, campo):
+    """COUNT agrupado das linhas que ocupam vaga, correlacionado com a oferta externa"""
+    contagem = (
+        model.objects.filter(**{campo: OuterRef('pk')})
+        .exclude(status='recusado')
+        .order_by()
+        .values(campo)
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(contagem), 0)
+
+
+def _status_workshop_esperado(ativas):
+    """Status que o workshop deveria ter dado o número de inscrições ativas"""
+    return Case(
+        When(status='disponivel', vagas_totais__lte=ativas, then=Value('esgotado')),
+        When(status='esgotado', vagas_totais__gt=ativas, then=Value('disponivel')),
+        default=F('status'),
+    )
+
+
+def _status_vaga_esperado(ativas):
+    """Status que a vaga de voluntariado deveria ter dado o número de candidaturas ativas"""
+    return Case(
+        When(status='aberta', vagas_totais__lte=ativas, then=Value('fechada')),
+        When(status='fechada', vagas_totais__gt=ativas, then=Value('aberta')),
+        default=F('status'),
+    )
+
+
+def recalcular_vagas_workshops(workshops):
+    """Recalcula vagas_ocupadas e status dos workshops com um único UPDATE"""
+    ativas = _ativas_subquery(InscricaoWorkshop, 'workshop')
+    atualizados = workshops.order_by().update(
+        vagas_ocupadas=ativas,
+        status=_status_workshop_esperado(ativas),
+        atualizado_em=Now(),
+    )
+    # UPDATE em lote não dispara signals
+    transaction.on_commit(lambda: invalidar(TAG_WORKSHOPS))
+    return atualizados
+
+
+def recalcular_vagas_voluntariado(vagas):
+    """Recalcula vagas_disponiveis/vagas_ocupadas e status das vagas com um único UPDATE"""
+    ativas = _ativas_subquery(CandidaturaVoluntariado, 'vaga')
+    atualizadas = vagas.order_by().update(
+        vagas_ocupadas=ativas,
+        vagas_disponiveis=Greatest(F('vagas_totais') - ativas, Value(0)),
+        status=_status_vaga_esperado(ativas),
+        atualizada_em=Now(),
+    )
+    transaction.on_commit(lambda: invalidar(TAG_VOLUNTARIADO))
+    return atualizadas
+
+
+# ========================================
+# DIVERGÊNCIAS
+# ========================================
+# Um GROUP BY por modelo compara os contadores gravados com a contagem real;
+# só as linhas divergentes voltam para o Python.
+
+def divergencias_workshops():
+    """Workshops cujo vagas_ocupadas/status não batem com as inscrições ativas"""
+    return (
+        Workshop.objects.com_ocupacao()
+        .annotate(status_esperado=_status_workshop_esperado(F('inscricoes_ativas')))
+        .filter(~Q(vagas_ocupadas=F('inscricoes_ativas')) | ~Q(status=F('status_esperado')))
+        .order_by('id')
+        .values('id', 'titulo', 'vagas_totais', 'vagas_ocupadas', 'inscricoes_ativas', 'status', 'status_esperado')
+    )
+
+
+def divergencias_voluntariado():
+    """Vagas cujo vagas_disponiveis/vagas_ocupadas/status não batem com as candidaturas ativas"""
+    return (
+        VagaVoluntariado.objects
+        .annotate(candidaturas_ativas=Count('candidaturas', filter=~Q(candidaturas__status='recusado')))
+        .annotate(
+            disponiveis_esperado=Greatest(F('vagas_totais') - F('candidaturas_ativas'), Value(0)),
+            status_esperado=_status_vaga_esperado(F('candidaturas_ativas')),
+        )
+        .filter(
+            ~Q(vagas_disponiveis=F('disponiveis_esperado'))
+            | ~Q(vagas_ocupadas=F('candidaturas_ativas'))
+            | ~Q(status=F('status_esperado'))
+        )
+        .order_by('id')
+        .values(
+            'id', 'titulo', 'vagas_totais', 'vagas_disponiveis', 'disponiveis_esperado',
+            'vagas_ocupadas', 'candidaturas_ativas', 'status', 'status_esperado',
+        )
+    )
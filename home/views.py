@@ -1,13 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, JsonResponse
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import Workshop, InscricaoWorkshop, VagaVoluntariado, CandidaturaVoluntariado, NewsletterSubscriber, Noticia
-from django.core.validators import validate_email
-from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import Workshop, VagaVoluntariado, NewsletterSubscriber, Noticia
 from django.core.paginator import Paginator
-
-
+from django.conf import settings
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from .busca import buscar_noticias
+from .paginacao import NOTICIAS_POR_PAGINA, paginar_por_cursor
+from .emails import email_boas_vindas
+from .cache import TAG_NOTICIAS, TAG_VOLUNTARIADO, TAG_WORKSHOPS, esta_publicada, feed_home, ids_publicadas, ids_relacionadas
+from .cache_paginas import cache_pagina, em_prerenderizacao
+from .respostas_publicas import (
+    pagina_publica,
+    ultima_alteracao_noticia,
+    ultima_alteracao_noticias,
+    ultima_alteracao_voluntariado,
+    ultima_alteracao_workshops,
+)
+from .facetas import facetas_noticias, meses_com_contagem
+from .outbox import enfileirar_email
+from .visualizacoes import registrar_visualizacao
+from .vagas import InscricaoDuplicada, VagasEsgotadas, reservar_vaga_voluntariado, reservar_vaga_workshop
+
+
+@pagina_publica(TAG_NOTICIAS, ultima_alteracao=ultima_alteracao_noticias)
+@cache_pagina(TAG_NOTICIAS, horizonte=Noticia.objects.proxima_publicacao)
 def home(request):
     """View para página inicial"""
     
@@ -15,19 +34,18 @@ def home(request):
         email = request.POST.get('email')
         
         if email:
-            subscriber, created = NewsletterSubscriber.objects.get_or_create(
-                email=email,
-                defaults={'ativo': True}
-            )
+            with transaction.atomic():
+                subscriber, created = NewsletterSubscriber.objects.get_or_create(
+                    email=email,
+                    defaults={'ativo': True}
+                )
+                
+                # Email de boas-vindas (vai para a caixa de saída junto com a inscrição)
+                if created:
+                    enviar_email_boas_vindas(email)
             
             if created:
                 messages.success(request, f'✅ Obrigado! Você foi inscrito na newsletter com sucesso!')
-                
-                # Email de boas-vindas
-                try:
-                    enviar_email_boas_vindas(email)
-                except Exception as e:
-                    print(f"Erro ao enviar email: {e}")
             else:
                 if subscriber.ativo:
                     messages.info(request, 'ℹ️ Este e-mail já está cadastrado na nossa newsletter.')
@@ -40,179 +58,17 @@ def home(request):
         
         return redirect('home')
     
-    noticias = Noticia.objects.filter(destaque=True).order_by('-data_publicacao')[:3]
-    
+    # Destaques primeiro, completando com as mais recentes (consulta única e limitada, em cache)
     context = {
-        'noticias': noticias,
-    }
-
-    # Processar newsletter
-    if request.method == 'POST':
-        email = request.POST.get('email', '').strip()
-        
-        if not email:
-            messages.error(request, 'Por favor, informe seu e-mail.')
-            return redirect('home')
-        
-        try:
-            validate_email(email)
-        except ValidationError:
-            messages.error(request, 'E-mail inválido. Por favor, verifique.')
-            return redirect('home')
-        
-        if Newsletter.objects.filter(email=email).exists():
-            messages.warning(request, 'Este e-mail já está cadastrado!')
-            return redirect('home')
-        
-        try:
-            Newsletter.objects.create(email=email)
-            messages.success(request, '🎉 Inscrição realizada com sucesso!')
-        except Exception as e:
-            messages.error(request, 'Erro ao processar inscrição.')
-        
-        return redirect('home')
-    
-    # ✅ NOVA LÓGICA: Sempre priorizar notícias em DESTAQUE
-    # 1. Buscar todas as notícias em destaque primeiro (ordenadas por data)
-    noticias_destaque = list(Noticia.objects.publicadas().filter(destaque=True).order_by('-data_publicacao'))
-    
-    # 2. Se não tiver 4 notícias em destaque, completar com as mais recentes (que NÃO são destaque)
-    if len(noticias_destaque) < 4:
-        noticias_restantes = Noticia.objects.publicadas().filter(destaque=False).order_by('-data_publicacao')[:4 - len(noticias_destaque)]
-        noticias = noticias_destaque + list(noticias_restantes)
-    else:
-        # Se tiver 4 ou mais em destaque, pegar apenas as 4 primeiras
-        noticias = noticias_destaque[:4]
-    
-    context = {
-        'noticias': noticias,
+        'noticias': feed_home(),
     }
     
     return render(request, 'home/home.html', context)
 
 def enviar_email_boas_vindas(email):
-    """Envia email de boas-vindas para novo inscrito"""
-    subject = '🎉 Bem-vindo à Newsletter do Instituto Mulheres do Sul Global!'
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{ font-family: 'Arial', sans-serif; background-color: #f9fafb; margin: 0; padding: 0; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: white; }}
-            .header {{ background: linear-gradient(135deg, #e6004c, #c7003f); padding: 40px 20px; text-align: center; }}
-            .header h1 {{ color: white; margin: 0; font-size: 28px; }}
-            .content {{ padding: 40px 30px; }}
-            .content h2 {{ color: #1a1a1a; font-size: 24px; margin-bottom: 20px; }}
-            .content p {{ color: #4c4c4c; line-height: 1.6; font-size: 16px; }}
-            .button {{ display: inline-block; background: #e6004c; color: white; padding: 15px 30px; 
-                      text-decoration: none; border-radius: 8px; margin: 20px 0; font-weight: bold; }}
-            .footer {{ background: #1f2937; color: #d1d5db; padding: 30px; text-align: center; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎉 Bem-vindo!</h1>
-            </div>
-            <div class="content">
-                <h2>Obrigado por se inscrever!</h2>
-                <p>Olá! Estamos muito felizes em ter você conosco.</p>
-                <p>A partir de agora, você receberá em primeira mão todas as novidades sobre nossos projetos, 
-                   eventos e histórias inspiradoras de transformação.</p>
-                <p>Acompanhe nosso trabalho e faça parte dessa jornada de empoderamento!</p>
-                <a href="https://mulheresdosulglobal.com" class="button">Visite Nosso Site</a>
-            </div>
-            <div class="footer">
-                <p><strong>Instituto Mulheres do Sul Global</strong></p>
-                <p>Maricá, Rio de Janeiro, Brasil</p>
-                <p>contato@mulheresdosulglobal.com | +55 21 98355-1120</p>
-                <p style="font-size: 12px; margin-top: 20px;">
-                    Você está recebendo este email porque se inscreveu em nossa newsletter.
-                </p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
-    text_content = f"Bem-vindo à Newsletter do Instituto Mulheres do Sul Global!"
-    
-    msg = EmailMultiAlternatives(subject, text_content, settings.DEFAULT_FROM_EMAIL, [email])
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
-
-def enviar_newsletter_nova_noticia(noticia):
-    """Envia email para todos os inscritos quando uma nova notícia é publicada"""
-    inscritos = NewsletterSubscriber.objects.filter(ativo=True)
-    
-    if not inscritos.exists():
-        return
-    
-    subject = f'📰 Nova Notícia: {noticia.titulo}'
-    
-    # URL absoluta da notícia
-    noticia_url = f"https://mulheresdosulglobal.com/noticias/{noticia.id}/"
-    
-    for inscrito in inscritos:
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: 'Arial', sans-serif; background-color: #f9fafb; margin: 0; padding: 0; }}
-                .container {{ max-width: 600px; margin: 0 auto; background: white; }}
-                .header {{ background: linear-gradient(135deg, #e6004c, #c7003f); padding: 40px 20px; text-align: center; }}
-                .header h1 {{ color: white; margin: 0; font-size: 28px; }}
-                .content {{ padding: 40px 30px; }}
-                .content h2 {{ color: #1a1a1a; font-size: 24px; margin-bottom: 15px; }}
-                .content .subtitle {{ color: #e6004c; font-size: 18px; font-weight: bold; margin-bottom: 20px; }}
-                .content p {{ color: #4c4c4c; line-height: 1.6; font-size: 16px; }}
-                .content img {{ max-width: 100%; height: auto; border-radius: 8px; margin: 20px 0; }}
-                .button {{ display: inline-block; background: #e6004c; color: white; padding: 15px 30px; 
-                          text-decoration: none; border-radius: 8px; margin: 20px 0; font-weight: bold; }}
-                .footer {{ background: #1f2937; color: #d1d5db; padding: 30px; text-align: center; font-size: 14px; }}
-                .unsubscribe {{ color: #9ca3af; font-size: 12px; margin-top: 20px; }}
-                .unsubscribe a {{ color: #60a5fa; text-decoration: none; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>📰 Nova Notícia Publicada!</h1>
-                </div>
-                <div class="content">
-                    <h2>{noticia.titulo}</h2>
-                    {f'<p class="subtitle">{noticia.subtitulo}</p>' if noticia.subtitulo else ''}
-                    {f'<img src="https://mulheresdosulglobal.com{noticia.imagem.url}" alt="{noticia.titulo}">' if noticia.imagem else ''}
-                    <p>{noticia.conteudo[:300]}...</p>
-                    <a href="{noticia_url}" class="button">Ler Notícia Completa</a>
-                </div>
-                <div class="footer">
-                    <p><strong>Instituto Mulheres do Sul Global</strong></p>
-                    <p>Maricá, Rio de Janeiro, Brasil</p>
-                    <p>contato@mulheresdosulglobal.com | +55 21 98355-1120</p>
-                    <p class="unsubscribe">
-                        Não quer mais receber nossos emails? 
-                        <a href="https://mulheresdosulglobal.com/newsletter/cancelar/{inscrito.token}/">Cancelar inscrição</a>
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"{noticia.titulo}\n\n{noticia.conteudo[:200]}...\n\nLeia mais em: {noticia_url}"
-        
-        try:
-            msg = EmailMultiAlternatives(subject, text_content, settings.DEFAULT_FROM_EMAIL, [inscrito.email])
-            msg.attach_alternative(html_content, "text/html")
-            msg.send()
-        except Exception as e:
-            print(f"Erro ao enviar email para {inscrito.email}: {e}")
+    """Coloca o email de boas-vindas na caixa de saída"""
+    html, texto = email_boas_vindas().renderizar()
+    enfileirar_email(email_boas_vindas().assunto, texto, [email], html=html)
 
 def cancelar_newsletter(request, token):
     try:
@@ -225,25 +81,38 @@ def cancelar_newsletter(request, token):
     
     return redirect('home')
 
+@pagina_publica(TAG_NOTICIAS, ultima_alteracao=ultima_alteracao_noticia)
+@cache_pagina(
+    TAG_NOTICIAS,
+    horizonte=Noticia.objects.proxima_publicacao,
+    ao_servir=lambda request, id: registrar_visualizacao(id),
+)
 def noticia_detalhe(request, id):
     """View para exibir detalhes de uma notícia"""
-    # ✅ Usar .publicadas() para garantir que só notícias publicadas sejam acessíveis
-    noticia = get_object_or_404(Noticia.objects.publicadas(), id=id)
-    
-    # Buscar notícias relacionadas (mesma categoria, exceto a atual)
-    noticias_relacionadas = Noticia.objects.publicadas().filter(
-        categoria=noticia.categoria
-    ).exclude(id=noticia.id)[:3]
+    # ✅ Só notícias publicadas são acessíveis (conferido no índice em cache)
+    if not esta_publicada(id):
+        raise Http404('Notícia não encontrada')
+    
+    # Notícia e relacionadas (pré-calculadas em NoticiaRelacionada) em uma única query por id
+    relacionadas = ids_relacionadas(id)
+    noticias = Noticia.objects.in_bulk([id, *relacionadas])
+    noticia = noticias.get(id)
+    if noticia is None:
+        raise Http404('Notícia não encontrada')
+    if not em_prerenderizacao(request):
+        registrar_visualizacao(noticia.id)
     
     context = {
         'noticia': noticia,
-        'noticias_relacionadas': noticias_relacionadas,
+        'noticias_relacionadas': [noticias[i] for i in relacionadas if i in noticias],
     }
     
     return render(request, 'home/noticia_detalhe.html', context)
 
 from django.core.paginator import Paginator
 
+@pagina_publica(TAG_NOTICIAS, ultima_alteracao=ultima_alteracao_noticias)
+@cache_pagina(TAG_NOTICIAS, horizonte=Noticia.objects.proxima_publicacao)
 def noticias_lista(request):
     """View para listagem completa de notícias com filtros e paginação"""
     
@@ -265,38 +134,51 @@ def noticias_lista(request):
     if mes and ano:
         noticias = noticias.filter(data_publicacao__month=mes)
     
-    # Ordenar por data mais recente
-    noticias = noticias.order_by('-data_publicacao')
+    # Busca por texto (ordena por relevância)
+    busca = request.GET.get('q', '').strip()
+    if busca:
+        noticias = buscar_noticias(noticias, busca).order_by('-relevancia', '-data_publicacao')
+    else:
+        # Ordenar por data mais recente
+        noticias = noticias.order_by('-data_publicacao')
     
     # ✅ PAGINAÇÃO: 9 notícias por página (grid 3x3)
-    paginator = Paginator(noticias, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Obter anos disponíveis para os filtros
-    from django.db.models.functions import ExtractYear
-    anos_disponiveis = Noticia.objects.publicadas().annotate(
-        ano=ExtractYear('data_publicacao')
-    ).values_list('ano', flat=True).distinct().order_by('-ano')
+    # Por cursor (sem COUNT/OFFSET) quando habilitada ou quando o link já traz um cursor;
+    # a busca ordena por relevância, então continua com a paginação numerada
+    cursor = request.GET.get('cursor')
+    usar_cursor = not busca and (cursor or settings.NOTICIAS_PAGINACAO_CURSOR)
+    if usar_cursor:
+        page_obj = paginar_por_cursor(noticias, cursor, por_pagina=NOTICIAS_POR_PAGINA)
+    elif busca:
+        paginator = Paginator(noticias, NOTICIAS_POR_PAGINA)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+    else:
+        # Sem busca, pagina sobre os ids em cache: nada de COUNT, só a página é carregada
+        paginator = Paginator(ids_publicadas(categoria, ano, mes if ano else None), NOTICIAS_POR_PAGINA)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+        page_obj.object_list = Noticia.objects.por_ids(page_obj.object_list)
     
-    # Categorias disponíveis
-    categorias = Noticia.CATEGORIA_CHOICES
+    # Filtros atuais, para os links de paginação por cursor
+    filtros = request.GET.copy()
+    filtros.pop('cursor', None)
+    filtros.pop('page', None)
     
-    # Meses para o select
-    meses = [
-        (1, 'Janeiro'), (2, 'Fevereiro'), (3, 'Março'),
-        (4, 'Abril'), (5, 'Maio'), (6, 'Junho'),
-        (7, 'Julho'), (8, 'Agosto'), (9, 'Setembro'),
-        (10, 'Outubro'), (11, 'Novembro'), (12, 'Dezembro')
-    ]
+    # Filtros com contagens (em cache; sem queries na maioria das requisições)
+    facetas = facetas_noticias()
     
     context = {
         'noticias': page_obj,  # ✅ MUDOU: agora usa page_obj
         'page_obj': page_obj,  # ✅ NOVO: para navegação de páginas
-        'categorias': categorias,
-        'anos_disponiveis': anos_disponiveis,
-        'meses': meses,
+        'paginacao_cursor': bool(usar_cursor),
+        'filtros_query': filtros.urlencode(),
+        'categorias': facetas['categorias'],
+        'anos_disponiveis': facetas['anos'],
+        'meses': meses_com_contagem(facetas, ano),
+        'total_noticias': facetas['total'],
         'categoria_selecionada': categoria,
+        'busca': busca,
         'ano_selecionado': ano,
         'mes_selecionado': int(mes) if mes else None,
     }
@@ -304,6 +186,8 @@ def noticias_lista(request):
     return render(request, 'home/noticias_lista.html', context)
 
 
+@pagina_publica(TAG_WORKSHOPS, ultima_alteracao=ultima_alteracao_workshops)
+@cache_pagina(TAG_WORKSHOPS)
 def workshops(request):
     """View da página de workshops com filtros"""
     
@@ -314,51 +198,10 @@ def workshops(request):
     
     if mostrar_todos:
         # Mostrar todos os workshops (incluindo esgotados e encerrados)
-        workshops_list = Workshop.objects.all()
+        workshops_list = Workshop.objects.com_ocupacao()
     else:
         # Mostrar apenas disponíveis e em breve
-        workshops_list = Workshop.objects.filter(status__in=['disponivel', 'em_breve'])
-    
-    # Filtro por nível
-    if nivel:
-        workshops_list = workshops_list.filter(nivel=nivel)
-    
-    # Filtro por status
-    if status:
-        workshops_list = workshops_list.filter(status=status)
-    
-    # Ordenar por data de início (mais recentes primeiro)
-    workshops_list = workshops_list.order_by('-data_inicio')
-    
-    # Dados para os filtros
-    niveis = Workshop.NIVEL_CHOICES
-    status_choices = Workshop.STATUS_CHOICES
-    
-    context = {
-        'workshops': workshops_list,
-        'niveis': niveis,
-        'status_choices': status_choices,
-        'mostrar_todos': mostrar_todos,
-        'nivel_selecionado': nivel,
-        'status_selecionado': status,
-    }
-    
-    return render(request, 'home/workshops.html', context)
-
-def workshops(request):
-    """View da página de workshops com filtros"""
-    
-    # Por padrão, mostrar apenas workshops disponíveis
-    mostrar_todos = request.GET.get('todos', 'false') == 'true'
-    nivel = request.GET.get('nivel')
-    status = request.GET.get('status')
-    
-    if mostrar_todos:
-        # Mostrar todos os workshops (incluindo esgotados e encerrados)
-        workshops_list = Workshop.objects.all()
-    else:
-        # Mostrar apenas disponíveis e em breve
-        workshops_list = Workshop.objects.filter(status__in=['disponivel', 'em_breve'])
+        workshops_list = Workshop.objects.com_ocupacao().filter(status__in=['disponivel', 'em_breve'])
     
     # Filtro por nível
     if nivel:
@@ -392,36 +235,24 @@ def workshop_inscricao(request):
     if request.method == 'POST':
         workshop_id = request.POST.get('workshop_id')
         workshop = get_object_or_404(Workshop, id=workshop_id)
-        
-        if not workshop.esta_disponivel():
-            messages.error(request, 'Desculpe, este workshop não está mais disponível.')
-            return redirect('workshops')
-        
         email = request.POST.get('email')
-        if InscricaoWorkshop.objects.filter(workshop=workshop, email=email).exists():
-            messages.warning(request, 'Você já está inscrito neste workshop.')
-            return redirect('workshops')
-        
-        inscricao = InscricaoWorkshop(
-            workshop=workshop,
-            nome=request.POST.get('nome'),
-            email=email,
-            telefone=request.POST.get('telefone'),
-            idade=request.POST.get('idade') or None,
-            experiencia=request.POST.get('experiencia'),
-            motivacao=request.POST.get('motivacao', ''),
-        )
-        inscricao.save()
-        
-        workshop.vagas_ocupadas += 1
-        if workshop.vagas_ocupadas >= workshop.vagas_totais:
-            workshop.status = 'esgotado'
-        workshop.save()
         
         try:
-            send_mail(
-                subject=f'Inscrição confirmada - {workshop.titulo}',
-                message=f'''Olá {inscricao.nome},
+            with transaction.atomic():
+                # ✅ Reserva atômica: nunca vende mais vagas que o total
+                inscricao = reservar_vaga_workshop(
+                    workshop.id,
+                    nome=request.POST.get('nome'),
+                    email=email,
+                    telefone=request.POST.get('telefone'),
+                    idade=request.POST.get('idade') or None,
+                    experiencia=request.POST.get('experiencia'),
+                    motivacao=request.POST.get('motivacao', ''),
+                )
+                
+                enfileirar_email(
+                    assunto=f'Inscrição confirmada - {workshop.titulo}',
+                    mensagem=f'''Olá {inscricao.nome},
 
 Sua inscrição no workshop "{workshop.titulo}" foi confirmada com sucesso!
 
@@ -436,12 +267,14 @@ Em breve entraremos em contato com mais informações.
 Atenciosamente,
 Instituto Mulheres do Sul Global
 ''',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=True,
-            )
-        except:
-            pass
+                    destinatarios=[email],
+                )
+        except VagasEsgotadas:
+            messages.error(request, 'Desculpe, este workshop não está mais disponível.')
+            return redirect('workshops')
+        except InscricaoDuplicada:
+            messages.warning(request, 'Você já está inscrito neste workshop.')
+            return redirect('workshops')
         
         messages.success(request, f'Inscrição realizada com sucesso no workshop "{workshop.titulo}"! Verifique seu e-mail.')
         return redirect('workshops')
@@ -449,6 +282,8 @@ Instituto Mulheres do Sul Global
     return redirect('workshops')
 
 
+@pagina_publica(TAG_VOLUNTARIADO, ultima_alteracao=ultima_alteracao_voluntariado)
+@cache_pagina(TAG_VOLUNTARIADO)
 def voluntariado(request):
     """View da página de voluntariado"""
     vagas_list = VagaVoluntariado.objects.filter(status='aberta').order_by('-criada_em')
@@ -470,41 +305,25 @@ def voluntariado_candidatura(request):
             messages.error(request, 'Vaga não encontrada.')
             return redirect('voluntariado')
         
-        if not vaga.esta_aberta():
-            messages.error(request, 'Desculpe, esta vaga não está mais disponível.')
-            return redirect('voluntariado')
-        
-        email = request.POST.get('email')
-        if CandidaturaVoluntariado.objects.filter(vaga=vaga, email=email).exists():
-            messages.warning(request, 'Você já se candidatou para esta vaga.')
-            return redirect('voluntariado')
-        
-        candidatura = CandidaturaVoluntariado(
-            vaga=vaga,
-            nome=request.POST.get('nome'),
-            email=email,
-            telefone=request.POST.get('telefone'),
-            idade=request.POST.get('idade') or None,
-            profissao=request.POST.get('profissao', ''),
-            experiencia=request.POST.get('experiencia', ''),
-            motivacao=request.POST.get('motivacao'),
-            disponibilidade=request.POST.get('disponibilidade', ''),
-            status='pendente'
-        )
-        candidatura.save()
-        
-        vaga.vagas_disponiveis -= 1
-        
-        if vaga.vagas_disponiveis <= 0:
-            vaga.status = 'pausada'
-            vaga.vagas_disponiveis = 0
-        
-        vaga.save()
-        
         try:
-            send_mail(
-                subject=f'Candidatura recebida - {vaga.titulo}',
-                message=f'''Olá {candidatura.nome},
+            with transaction.atomic():
+                # ✅ Reserva atômica: nunca aceita mais candidaturas que vagas
+                candidatura = reservar_vaga_voluntariado(
+                    vaga.id,
+                    nome=request.POST.get('nome'),
+                    email=request.POST.get('email'),
+                    telefone=request.POST.get('telefone'),
+                    idade=request.POST.get('idade') or None,
+                    profissao=request.POST.get('profissao', ''),
+                    experiencia=request.POST.get('experiencia', ''),
+                    motivacao=request.POST.get('motivacao'),
+                    disponibilidade=request.POST.get('disponibilidade', ''),
+                    status='pendente'
+                )
+                
+                enfileirar_email(
+                    assunto=f'Candidatura recebida - {vaga.titulo}',
+                    mensagem=f'''Olá {candidatura.nome},
 
 Recebemos sua candidatura para a vaga de "{vaga.titulo}"!
 
@@ -515,12 +334,14 @@ Obrigado pelo interesse em fazer parte do nosso time de voluntários!
 Atenciosamente,
 Instituto Mulheres do Sul Global
 ''',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[candidatura.email],
-                fail_silently=True,
-            )
-        except:
-            pass
+                    destinatarios=[candidatura.email],
+                )
+        except VagasEsgotadas:
+            messages.error(request, 'Desculpe, esta vaga não está mais disponível.')
+            return redirect('voluntariado')
+        except InscricaoDuplicada:
+            messages.warning(request, 'Você já se candidatou para esta vaga.')
+            return redirect('voluntariado')
         
         messages.success(request, f'Candidatura enviada com sucesso para a vaga de "{vaga.titulo}"! Entraremos em contato em breve.')
         return redirect('voluntariado')
@@ -538,9 +359,9 @@ def contato(request):
         mensagem = request.POST.get('mensagem')
         
         try:
-            send_mail(
-                subject=f'[CONTATO] {assunto} - {nome}',
-                message=f'''
+            enfileirar_email(
+                assunto=f'[CONTATO] {assunto} - {nome}',
+                mensagem=f'''
 Nova mensagem de contato recebida:
 
 Nome: {nome}
@@ -551,9 +372,7 @@ Assunto: {assunto}
 Mensagem:
 {mensagem}
                 ''',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=['contato@mulheresdosulglobal.com'],
-                fail_silently=False,
+                destinatarios=['contato@mulheresdosulglobal.com'],
             )
             
             messages.success(request, '✅ Mensagem enviada com sucesso! Entraremos em contato em breve.')
@@ -565,6 +384,14 @@ Mensagem:
     return render(request, 'home/contato.html')
 
 
+@pagina_publica()
+@cache_pagina()
 def doacao(request):
     """View para página de doação"""
-    return render(request, 'home/doacao.html')
\ No newline at end of file
+    return render(request, 'home/doacao.html')
+
+
+@never_cache
+def csrf_token(request):
+    """Token CSRF para os formulários das páginas públicas (preenchido pelo JS no envio)"""
+    return JsonResponse({'token': get_token(request)})
@@ -0,0 +1,139 @@
+import atexit
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Noticia, VisualizacaoDiaria
+
+
+# Segundos entre descargas do buffer para o banco
+INTERVALO_DESCARGA = getattr(settings, 'VISUALIZACOES_INTERVALO_DESCARGA', 30)
+
+# Descarrega antes do intervalo se acumular esse número de visualizações
+LIMITE_BUFFER = getattr(settings, 'VISUALIZACOES_LIMITE_BUFFER', 500)
+
+
+# ========================================
+# BUFFER POR PROCESSO
+# ========================================
+# Cada worker do gunicorn acumula as próprias visualizações e as descarrega
+# com UPDATEs de incremento (F() + n). Como os incrementos são somados pelo
+# banco, workers diferentes nunca sobrescrevem a contagem uns dos outros.
+#
+# O buffer é descarregado quando passa de LIMITE_BUFFER visualizações ou
+# quando a última descarga tem mais de INTERVALO_DESCARGA segundos. O prazo
+# é verificado ao fim de qualquer requisição do worker (não só das páginas
+# de notícia), depois que a resposta já foi entregue.
+
+_lock = threading.Lock()
+_buffer = Counter()  # (noticia_id, data) -> visualizações ainda não gravadas
+_pendentes = 0
+_ultima_descarga = time.monotonic()
+
+
+def _descarga_vencida():
+    """Buffer não vazio que atingiu o limite de tamanho ou de tempo (chamar com _lock)"""
+    return _pendentes > 0 and (
+        _pendentes >= LIMITE_BUFFER or time.monotonic() - _ultima_descarga >= INTERVALO_DESCARGA
+    )
+
+
+def registrar_visualizacao(noticia_id):
+    """Conta uma visualização; o banco só é tocado quando o buffer é descarregado"""
+    global _pendentes
+    with _lock:
+        _buffer[(noticia_id, timezone.localdate())] += 1
+        _pendentes += 1
+        cheio = _pendentes >= LIMITE_BUFFER
+
+    # Dentro de uma requisição o prazo é tratado em request_finished, sem atrasar a resposta
+    if cheio:
+        descarregar_visualizacoes()
+
+
+@receiver(request_finished)
+def _descarregar_ao_fim_da_requisicao(sender, **kwargs):
+    with _lock:
+        vencido = _descarga_vencida()
+    if vencido:
+        descarregar_visualizacoes()
+
+
+def _retirar_buffer():
+    """Troca o buffer por um vazio e devolve o conteúdo anterior"""
+    global _buffer, _pendentes, _ultima_descarga
+    with _lock:
+        conteudo, _buffer = _buffer, Counter()
+        _pendentes = 0
+        _ultima_descarga = time.monotonic()
+    return conteudo
+
+
+def _devolver_buffer(conteudo):
+    """Recoloca contagens que não puderam ser gravadas, para a próxima descarga"""
+    global _pendentes
+    with _lock:
+        _buffer.update(conteudo)
+        _pendentes += sum(conteudo.values())
+
+
+def descarregar_visualizacoes():
+    """
+    Grava o buffer no banco. Notícias com o mesmo número de visualizações
+    são agrupadas em um único UPDATE, assim a descarga custa poucas queries
+    mesmo com muitas notícias acessadas.
+    """
+    conteudo = _retirar_buffer()
+    if not conteudo:
+        return 0
+
+    try:
+        with transaction.atomic():
+            # Notícias excluídas desde a visualização são descartadas
+            existentes = set(
+                Noticia.objects.filter(id__in={noticia_id for noticia_id, _ in conteudo}).values_list('id', flat=True)
+            )
+            conteudo = Counter({chave: n for chave, n in conteudo.items() if chave[0] in existentes})
+
+            por_noticia = Counter()
+            for (noticia_id, _), n in conteudo.items():
+                por_noticia[noticia_id] += n
+
+            for n, ids in _agrupar_por_incremento(por_noticia.items()).items():
+                Noticia.objects.filter(id__in=ids).update(visualizacoes=F('visualizacoes') + n)
+
+            VisualizacaoDiaria.objects.bulk_create(
+                [VisualizacaoDiaria(noticia_id=noticia_id, data=data) for noticia_id, data in conteudo],
+                ignore_conflicts=True,
+            )
+            por_dia = defaultdict(list)
+            for (noticia_id, data), n in conteudo.items():
+                por_dia[data].append((noticia_id, n))
+            for data, itens in por_dia.items():
+                for n, ids in _agrupar_por_incremento(itens).items():
+                    VisualizacaoDiaria.objects.filter(data=data, noticia_id__in=ids).update(total=F('total') + n)
+    except Exception as e:
+        print(f"❌ Erro ao gravar visualizações: {e}")
+        _devolver_buffer(conteudo)
+        return 0
+
+    return sum(conteudo.values())
+
+
+def _agrupar_por_incremento(itens):
+    """[(id, n), ...] -> {n: [ids]}"""
+    grupos = defaultdict(list)
+    for objeto_id, n in itens:
+        grupos[n].append(objeto_id)
+    return grupos
+
+
+# Desligamento normal do worker (ex.: reload do gunicorn) não perde o que está no buffer
+atexit.register(descarregar_visualizacoes)